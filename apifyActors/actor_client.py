@@ -0,0 +1,132 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from apifyActors.metrics import observe, span
+from apifyActors.replay import active_replay, replay_items
+from apifyActors.run_stats import input_size, plan_run, record_run
+
+
+_run_warnings = ContextVar("actor_run_warnings", default=None)
+
+
+@contextmanager
+def collect_run_warnings():
+    """
+    Collect warnings about incomplete actor runs started inside the block (also from
+    run_shards workers); yields the list they are appended to.
+    """
+    warnings = []
+    token = _run_warnings.set(warnings)
+    try:
+        yield warnings
+    finally:
+        _run_warnings.reset(token)
+
+
+def _timed_call(client, actor_id, run_input, plan, options, source):
+    start = time.perf_counter()
+    run = client.actor(actor_id).call(run_input=run_input, **options)
+    elapsed = time.perf_counter() - start
+    if run:
+        try:
+            actual = record_run(actor_id, run, plan, elapsed, source)
+            if plan["predicted_s"] is not None:
+                observe("actor_prediction_error", abs(actual - plan["predicted_s"]), source)
+        except (sqlite3.Error, OSError):
+            pass
+    run_secs = ((run or {}).get("stats") or {}).get("runTimeSecs")
+    if isinstance(run_secs, (int, float)) and 0 <= run_secs <= elapsed:
+        observe("actor_queue", elapsed - run_secs, source)
+        observe("actor_run", run_secs, source)
+    else:
+        observe("actor_run", elapsed, source)
+    return run
+
+
+def call_actor(client, actor_id, run_input, source=""):
+    """
+    Start an actor run, wait for it to finish and record its timings.
+    The wall time is split into "actor_queue" and "actor_run" using the run's
+    own runTimeSecs when Apify reports it.
+    Memory and timeout come from run_stats.plan_run once the actor has enough recorded
+    runs; every finished run is recorded with its predicted and actual run time.
+    A run that hits the tuned timeout is started once more with the actor's own timeout;
+    a run that still times out is returned (its dataset holds what it scraped so far) and
+    reported to the active collect_run_warnings block.
+    Inside a replay.replay_from block no actor is started; the run is served from the
+    saved dataset instead.
+    Returns: the run dict (or None if the run could not be started)
+    """
+    replay = active_replay()
+    if replay is not None:
+        return replay.start_run(actor_id, run_input)
+    try:
+        plan = plan_run(actor_id, run_input)
+    except (sqlite3.Error, OSError):
+        # Tuning is best effort; a broken stats store must not stop scraping
+        plan = dict(zip(("result_limit", "input_lists", "input_size"), input_size(run_input)),
+                    memory_mbytes=None, timeout_secs=None, predicted_s=None, tuned=False)
+    options = {key: plan[key] for key in ("memory_mbytes", "timeout_secs") if plan[key]}
+    run = _timed_call(client, actor_id, run_input, plan, options, source)
+    if run and run.get("status") == "TIMED-OUT" and "timeout_secs" in options:
+        # The timed-out run is recorded as a lower bound, so the next plan allows more time
+        del options["timeout_secs"]
+        run = _timed_call(client, actor_id, run_input, dict(plan, timeout_secs=None), options, source)
+    if run and run.get("status") == "TIMED-OUT":
+        warnings = _run_warnings.get()
+        if warnings is not None:
+            warnings.append(f"{source or actor_id} run {run.get('id')} timed out; its results may be incomplete")
+    return run
+
+
+def download_items(client, run, source=""):
+    """
+    Fetch all items of a run's default dataset.
+    The whole dataset is held in memory, replayed or not; use iter_items to stream it.
+    """
+    with span("dataset_download", source):
+        if "replay" in run:
+            return list(replay_items(run))
+        return list(client.dataset(run["defaultDatasetId"]).iterate_items())
+
+
+def iter_items(client, run, source=""):
+    """
+    Yield the items of a run's default dataset as its pages are downloaded.
+    Only the time spent waiting for items counts as "dataset_download", not the
+    time the consumer spends on each item.
+    """
+    if "replay" in run:
+        iterator = iter(replay_items(run))
+    else:
+        iterator = iter(client.dataset(run["defaultDatasetId"]).iterate_items())
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        observe("dataset_download", elapsed, source)
+
+
+def iter_records(client, run, format_item, source="", start_index=1):
+    """
+    Yield format_item(item, idx) for every dataset item as it is downloaded.
+    The formatting time of the whole stream is recorded once as "formatting".
+    """
+    elapsed = 0.0
+    try:
+        for idx, item in enumerate(iter_items(client, run, source), start_index):
+            start = time.perf_counter()
+            record = format_item(item, idx)
+            elapsed += time.perf_counter() - start
+            yield record
+    finally:
+        observe("formatting", elapsed, source)
@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+load_dotenv()
+from apify_client import ApifyClient
+from apifyActors.actor_client import call_actor, iter_items
+from apifyActors.blob_store import item_body, put_text
+from apifyActors.parallel import DEFAULT_MAX_CONCURRENCY, run_shards
+
+ARTICLE_DB = os.environ.get("SCRAPER_ARTICLE_DB", os.path.join(".scraper_data", "article_details.sqlite"))
+ARTICLE_BATCH_SIZE = int(os.environ.get("SCRAPER_ARTICLE_BATCH_SIZE", "10"))
+# Article pages are opened with the same crawler as the Website Content scraper, one level deep
+ARTICLE_ACTOR_ID = "aYG0l9s7dbB7j3gbS"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS article_details (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    description TEXT,
+    author TEXT,
+    language TEXT,
+    loaded_url TEXT,
+    text_hash TEXT,
+    fetched_at TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+COLUMNS = ("url", "title", "description", "author", "language", "loaded_url", "text_hash", "fetched_at")
+
+
+def connect(db_path=None):
+    db_path = db_path or ARTICLE_DB
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _normalize_url(url):
+    return (url or "").strip().rstrip("/")
+
+
+def cached_details(urls, db_path=None):
+    """
+    Return the cached details of the given article URLs.
+    Returns: dict url -> {title, description, author, language, loaded_url, text_hash, fetched_at}
+    """
+    urls = [url for url in dict.fromkeys(urls) if url]
+    if not urls or not os.path.exists(db_path or ARTICLE_DB):
+        return {}
+    conn = connect(db_path)
+    try:
+        details = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM article_details WHERE url IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            details.update({row[0]: dict(zip(COLUMNS, row)) for row in rows})
+        return details
+    finally:
+        conn.close()
+
+
+def _detail_from_item(url, item, fetched_at):
+    metadata = item.get("metadata") or {}
+    return {
+        "url": url,
+        "title": metadata.get("title") or item.get("title"),
+        "description": metadata.get("description"),
+        "author": metadata.get("author"),
+        "language": metadata.get("languageCode"),
+        "loaded_url": (item.get("crawl") or {}).get("loadedUrl") or item.get("url"),
+        "text_hash": put_text(item_body(item, "text") or item_body(item, "markdown")),
+        "fetched_at": fetched_at,
+    }
+
+
+def _fetch_batch(urls, api_token):
+    """Crawl one batch of article URLs; returns dict requested url -> detail"""
+    client = ApifyClient(api_token)
+    run_input = {
+        "startUrls": [{"url": url} for url in urls],
+        "maxCrawlDepth": 0,
+        "maxCrawlPages": len(urls),
+        "saveMarkdown": False,
+    }
+    run = call_actor(client, ARTICLE_ACTOR_ID, run_input, "google_news_details")
+    if run is None:
+        raise RuntimeError("Failed to start the article crawler. Please check your API token.")
+    # Crawled items can carry the requested, the redirected or the canonical URL
+    wanted = {_normalize_url(url): url for url in urls}
+    fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    details = {}
+    for item in iter_items(client, run, "google_news_details"):
+        candidates = (
+            item.get("url"),
+            (item.get("crawl") or {}).get("loadedUrl"),
+            (item.get("metadata") or {}).get("canonicalUrl"),
+        )
+        for candidate in candidates:
+            url = wanted.get(_normalize_url(candidate))
+            if url and url not in details:
+                details[url] = _detail_from_item(url, item, fetched_at)
+                break
+    return details
+
+
+def fetch_article_details(urls, api_token=None, batch_size=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, db_path=None):
+    """
+    Fetch full article details for a handful of article URLs, cached per URL.
+    Only URLs missing from the cache are crawled, in batches of batch_size URLs per
+    actor run (batches run concurrently). Article text goes to the blob store.
+    Args:
+        urls (list): Article URLs (e.g. the 'url' of Google News records)
+        api_token (str): Apify API token
+        batch_size (int): URLs per crawler run
+        max_concurrency (int): Maximum number of crawler runs at the same time
+    Returns:
+        dict: {success, details, summary} or {error}
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    try:
+        urls = [url for url in dict.fromkeys(urls) if url]
+        details = cached_details(urls, db_path)
+        missing = [url for url in urls if url not in details]
+        batch_size = max(1, batch_size or ARTICLE_BATCH_SIZE)
+        batches = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+        errors = []
+        fetched = {}
+        start = time.perf_counter()
+        if batches:
+            for outcome in run_shards(lambda batch: _fetch_batch(batch, api_token), batches, max_concurrency):
+                if outcome["error"]:
+                    errors.append(outcome["error"])
+                else:
+                    fetched.update(outcome["result"])
+        if fetched:
+            conn = connect(db_path)
+            try:
+                with conn:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO article_details ({', '.join(COLUMNS)}) VALUES ({', '.join(':' + c for c in COLUMNS)})",
+                        list(fetched.values()),
+                    )
+            finally:
+                conn.close()
+        if batches and not fetched and errors:
+            return {"error": f"Could not fetch article details: {errors[0]}"}
+        details.update(fetched)
+        summary = {
+            "requested": len(urls),
+            "cached": len(urls) - len(missing),
+            "fetched": len(fetched),
+            "not_found": len(missing) - len(fetched),
+            "batches": len(batches),
+            "errors": errors,
+            "elapsed_s": round(time.perf_counter() - start, 2)
+        }
+        return {"success": True, "details": details, "summary": summary}
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+# For testing
+if __name__ == "__main__":
+    results = fetch_article_details(["https://blog.apify.com/what-is-web-scraping/"])
+    if results.get("success"):
+        print(results["summary"])
+        for url, detail in results["details"].items():
+            print(f"{url}: {detail['title']} ({detail['author']})")
+    else:
+        print(results.get("error"))
@@ -0,0 +1,340 @@
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+load_dotenv()
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+    yaml = None
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+    pa = pq = None
+from apifyActors.actor_client import collect_run_warnings
+from apifyActors.export import write_export
+from apifyActors.intents import RESULT_KEYS, result_items, run_scraper_from_intent
+from apifyActors.parallel import DEFAULT_MAX_CONCURRENCY, run_shards
+
+BATCH_OUTPUT_DIR = os.environ.get("SCRAPER_BATCH_OUTPUT_DIR", "batch_output")
+BATCH_RETRIES = int(os.environ.get("SCRAPER_BATCH_RETRIES", "2"))
+# Wait before the first retry of a failed job; doubles with every further attempt
+BATCH_RETRY_BACKOFF_S = float(os.environ.get("SCRAPER_BATCH_RETRY_BACKOFF_S", "5"))
+
+CHECKPOINT_FILE = "_checkpoint.ndjson"
+OUTPUT_FORMATS = ("ndjson", "parquet")
+
+
+def _slug(value):
+    text = "-".join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-").lower()[:40] or "job"
+
+
+def _expand(job):
+    """
+    Expand a job with an 'each' mapping into one job per combination of values.
+    {"scraper": "booking", "each": {"search": ["Paris", "Rome"]}} becomes two booking jobs.
+    """
+    each = job.get("each")
+    if not each:
+        return [job]
+    names = list(each)
+    expanded = []
+    for values in itertools.product(*(each[name] for name in names)):
+        parameters = dict(job.get("parameters") or {}, **dict(zip(names, values)))
+        suffix = "-".join(_slug(value) for value in values)
+        child = {key: value for key, value in job.items() if key != "each"}
+        child["parameters"] = parameters
+        if job.get("id"):
+            child["id"] = f"{job['id']}-{suffix}"
+        else:
+            child["suffix"] = suffix
+        expanded.append(child)
+    return expanded
+
+
+def parse_jobs(spec):
+    """
+    Turn a job file document into a flat list of jobs.
+    Args:
+        spec: A list of jobs, or {"defaults": {...}, "jobs": [...]}. Each job has a
+            'scraper' (as in chat intents), 'parameters', and optionally 'id', 'retries'
+            and 'each' ({parameter: [values]}, one job per combination).
+    Returns:
+        list: Job dicts with unique 'id', 'scraper', 'parameters' and 'retries'
+    """
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    defaults = spec.get("defaults") or {}
+    jobs = []
+    for job in spec.get("jobs") or []:
+        parameters = dict(defaults.get("parameters") or {}, **(job.get("parameters") or {}))
+        job = dict(defaults, **job)
+        job["parameters"] = parameters
+        if job.get("scraper") not in RESULT_KEYS:
+            raise ValueError(f"Unknown scraper {job.get('scraper')!r}; expected one of {', '.join(RESULT_KEYS)}")
+        jobs.extend(_expand(job))
+    seen = set()
+    for idx, job in enumerate(jobs, 1):
+        if not job.get("id"):
+            job["id"] = f"{idx:04d}-{job['scraper']}" + (f"-{job.pop('suffix')}" if job.get("suffix") else "")
+        job.pop("suffix", None)
+        # Ids name the output files
+        job["id"] = re.sub(r"[^\w.-]+", "_", str(job["id"])).lstrip(".") or f"{idx:04d}"
+        if job["id"] in seen:
+            raise ValueError(f"Duplicate job id {job['id']!r}")
+        seen.add(job["id"])
+        job.setdefault("retries", BATCH_RETRIES)
+    return jobs
+
+
+def load_job_file(path):
+    """Read jobs from a JSON or (with PyYAML installed) YAML job file"""
+    with open(path, encoding="utf-8") as fh:
+        if path.endswith((".yaml", ".yml")):
+            if not YAML_AVAILABLE:
+                raise RuntimeError("Install pyyaml to read YAML job files, or use JSON")
+            spec = yaml.safe_load(fh)
+        else:
+            spec = json.load(fh)
+    return parse_jobs(spec)
+
+
+def read_checkpoint(out_dir):
+    """Last checkpoint entry of every job in an output directory: dict id -> entry"""
+    path = os.path.join(out_dir, CHECKPOINT_FILE)
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut off by a crash; the job simply runs again
+                continue
+            entries[entry["id"]] = entry
+    return entries
+
+
+def _parquet_value(value):
+    # Nested objects vary between items, which Arrow cannot infer one schema for
+    if isinstance(value, Mapping) or (isinstance(value, list) and any(isinstance(v, (Mapping, list)) for v in value)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def _parquet_column(values):
+    """Arrow array of one column; columns mixing types (e.g. 4 and "N/A" stars) become strings"""
+    values = [_parquet_value(value) for value in values]
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(
+            [None if value is None else value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str) for value in values],
+            pa.string(),
+        )
+
+
+def parquet_table(items):
+    """Arrow table of items, with the columns of every item in first-seen order"""
+    columns = list(dict.fromkeys(key for item in items for key in item.keys()))
+    return pa.table({column: _parquet_column([item.get(column) for item in items]) for column in columns})
+
+
+def _output_path(out_dir, job, fmt):
+    return os.path.join(out_dir, f"{job['id']}.{fmt}")
+
+
+def write_output(items, path, fmt="ndjson"):
+    """Write items to path atomically (via a temporary file); returns the item count"""
+    tmp_path = f"{path}.tmp"
+    if fmt == "parquet":
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Install pyarrow to write Parquet output")
+        pq.write_table(parquet_table(items), tmp_path)
+    else:
+        with open(tmp_path, "wb") as fh:
+            write_export(items, fh, "ndjson")
+    os.replace(tmp_path, path)
+    return len(items)
+
+
+def run_job(job, api_token, out_dir, fmt="ndjson", raw=False, backoff_s=None):
+    """
+    Run one job with retries and write its output file.
+    Returns: checkpoint entry {id, scraper, status, records, attempts, output, error, elapsed_s, summary, finished_at},
+    plus raw_output when the scrape succeeded but its output could not be written and
+    warnings when an actor run timed out (the output may then be incomplete)
+    """
+    backoff_s = BATCH_RETRY_BACKOFF_S if backoff_s is None else backoff_s
+    start = time.perf_counter()
+    error = raw_output = None
+    warnings = []
+    attempts = 0
+    for attempts in range(1, int(job["retries"]) + 2):
+        if attempts > 1:
+            time.sleep(backoff_s * 2 ** (attempts - 2))
+        try:
+            with collect_run_warnings() as warnings:
+                results = run_scraper_from_intent(job, api_token)
+        except Exception as e:
+            results = {"error": f"An error occurred: {str(e)}"}
+        if results.get("success"):
+            output = _output_path(out_dir, job, fmt)
+            summary = {key: value for key, value in (results.get("summary") or {}).items() if key != "shards"}
+            try:
+                records = write_output(result_items(results, job["scraper"], raw), output, fmt)
+            except Exception as e:
+                # The actor run is paid for; keep its items even when the output cannot be written
+                output, records = None, 0
+                error = f"Could not write {fmt} output: {str(e)}"
+                try:
+                    raw_output = _output_path(out_dir, job, "raw.ndjson")
+                    write_output(results.get("raw_results") or [], raw_output)
+                    error += f"; the raw items are in {raw_output}"
+                except Exception:
+                    raw_output = None
+            break
+        error = results.get("error", "Unknown error")
+    else:
+        output, records, summary, raw_output = None, 0, None, None
+    entry = {
+        "id": job["id"],
+        "scraper": job["scraper"],
+        "status": "done" if output else "failed",
+        "records": records,
+        "attempts": attempts,
+        "output": output,
+        "error": None if output else error,
+        "elapsed_s": round(time.perf_counter() - start, 2),
+        "summary": summary,
+        "finished_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    if raw_output:
+        entry["raw_output"] = raw_output
+    if output and warnings:
+        entry["warnings"] = warnings
+    return entry
+
+
+def run_batch(jobs, out_dir=None, api_token=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, fmt="ndjson", raw=False, resume=True, backoff_s=None, on_progress=None):
+    """
+    Run scraping jobs unattended on a bounded worker pool.
+    Each finished job writes <out_dir>/<id>.<fmt> and appends a line to the checkpoint file
+    in the output directory; with resume, jobs already marked done there are skipped, so
+    an interrupted batch picks up where it stopped. Failed jobs are retried with
+    exponential backoff and run again on the next resume.
+    Args:
+        jobs (list): Jobs from parse_jobs / load_job_file
+        out_dir (str): Output directory
+        api_token (str): Apify API token
+        max_concurrency (int): Maximum number of jobs running at the same time
+        fmt (str): 'ndjson' or 'parquet'
+        raw (bool): Write raw actor items instead of formatted records
+        resume (bool): Skip jobs the checkpoint marks as done
+        on_progress (callable): Optional callback(entry, finished_count, total) per finished job
+    Returns:
+        dict: {success, jobs, summary} or {error}
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    out_dir = out_dir or BATCH_OUTPUT_DIR
+    if fmt not in OUTPUT_FORMATS:
+        return {"error": f"Unknown output format {fmt!r}; expected one of {', '.join(OUTPUT_FORMATS)}"}
+    if fmt == "parquet" and not PARQUET_AVAILABLE:
+        return {"error": "Install pyarrow to write Parquet output"}
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint = read_checkpoint(out_dir) if resume else {}
+    # A job counts as done only while its output in the requested format is still there
+    entries = {
+        job["id"]: checkpoint[job["id"]] for job in jobs
+        if checkpoint.get(job["id"], {}).get("status") == "done" and os.path.exists(_output_path(out_dir, job, fmt))
+    }
+    pending = [job for job in jobs if job["id"] not in entries]
+    finished = [0]
+    wall_start = time.perf_counter()
+    with open(os.path.join(out_dir, CHECKPOINT_FILE), "a", encoding="utf-8") as checkpoint_fh:
+
+        def record(job, outcome):
+            # Runs in this thread, so checkpoint lines never interleave
+            entry = outcome["result"] or {
+                "id": job["id"], "scraper": job["scraper"], "status": "failed", "records": 0,
+                "attempts": 0, "output": None, "error": outcome["error"], "elapsed_s": round(outcome["elapsed_s"], 2),
+                "summary": None, "finished_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            checkpoint_fh.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            checkpoint_fh.flush()
+            os.fsync(checkpoint_fh.fileno())
+            entries[job["id"]] = entry
+            finished[0] += 1
+            if on_progress is not None:
+                on_progress(entry, finished[0], len(pending))
+
+        if pending:
+            run_shards(lambda job: run_job(job, api_token, out_dir, fmt, raw, backoff_s), pending, max_concurrency, on_done=record)
+    ordered = [entries[job["id"]] for job in jobs if job["id"] in entries]
+    summary = {
+        "total_jobs": len(jobs),
+        "skipped": len(jobs) - len(pending),
+        "done": sum(1 for entry in ordered if entry["status"] == "done"),
+        "failed": sum(1 for entry in ordered if entry["status"] != "done"),
+        "records": sum(entry["records"] for entry in ordered if entry["status"] == "done"),
+        "output_dir": out_dir,
+        "wall_time_s": round(time.perf_counter() - wall_start, 2),
+    }
+    return {"success": True, "jobs": ordered, "summary": summary}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m apifyActors.batch_runner",
+        description="Run a file of scraping jobs without the dashboard.",
+    )
+    parser.add_argument("job_file", help="JSON (or YAML) job file")
+    parser.add_argument("-o", "--output", default=BATCH_OUTPUT_DIR, help="Output directory (default: %(default)s)")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Jobs running at the same time (default: %(default)s)")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="ndjson", help="Output file format (default: %(default)s)")
+    parser.add_argument("--retries", type=int, help="Retries per failed job (overrides the job file)")
+    parser.add_argument("--raw", action="store_true", help="Write raw actor items instead of formatted records")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and run every job again")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_job_file(args.job_file)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+    if args.retries is not None:
+        for job in jobs:
+            job["retries"] = args.retries
+
+    def progress(entry, finished, total):
+        detail = f"{entry['records']} records" if entry["status"] == "done" else entry["error"]
+        print(f"[{finished}/{total}] {entry['id']} {entry['status']}: {detail} "
+              f"({entry['elapsed_s']} s, {entry['attempts']} attempts)", file=sys.stderr)
+        for warning in entry.get("warnings", []):
+            print(f"    warning: {warning}", file=sys.stderr)
+
+    results = run_batch(jobs, args.output, max_concurrency=args.concurrency, fmt=args.format, raw=args.raw, resume=not args.restart, on_progress=progress)
+    if not results.get("success"):
+        print(results.get("error"), file=sys.stderr)
+        return 2
+    summary = results["summary"]
+    print(f"{summary['done']}/{summary['total_jobs']} jobs done ({summary['skipped']} from checkpoint), "
+          f"{summary['failed']} failed, {summary['records']} records in {summary['wall_time_s']} s -> {summary['output_dir']}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
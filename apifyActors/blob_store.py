@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+BLOB_DIR = os.environ.get("SCRAPER_BLOB_DIR", os.path.join(".scraper_data", "blobs"))
+# zstd when installed, gzip otherwise; blobs written with either codec stay readable
+BLOB_CODEC = os.environ.get("SCRAPER_BLOB_CODEC", "zstd") if ZSTD_AVAILABLE else "gzip"
+
+# Large text fields of raw items that are moved into the blob store
+BODY_FIELDS = ("markdown", "text", "html")
+
+EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def _compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _blob_path(digest, codec, blob_dir):
+    return os.path.join(blob_dir, digest[:2], digest + EXTENSIONS[codec])
+
+
+def _readable_codecs():
+    return [codec for codec in EXTENSIONS if codec != "zstd" or ZSTD_AVAILABLE]
+
+
+def put_text(text, blob_dir=None):
+    """
+    Store a text body once, compressed, under the SHA-256 of its content.
+    Returns: hex digest (None for empty text)
+    """
+    if not text:
+        return None
+    blob_dir = blob_dir or BLOB_DIR
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    if any(os.path.exists(_blob_path(digest, codec, blob_dir)) for codec in _readable_codecs()):
+        return digest
+    path = _blob_path(digest, BLOB_CODEC, blob_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file first so concurrent writers never expose a partial blob
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(_compress(data, BLOB_CODEC))
+    os.replace(tmp_path, path)
+    return digest
+
+
+# Only found blobs are cached: a miss raises, so a blob written later by another process is read
+@lru_cache(maxsize=64)
+def _read_blob(digest, blob_dir):
+    for codec in _readable_codecs():
+        path = _blob_path(digest, codec, blob_dir)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return _decompress(f.read(), codec).decode("utf-8")
+    if os.path.exists(_blob_path(digest, "zstd", blob_dir)):
+        raise RuntimeError(f"Blob {digest} is zstd-compressed; install zstandard to read it")
+    raise FileNotFoundError(digest)
+
+
+def get_text(digest, blob_dir=None):
+    """Decompress a stored body (None if the digest is empty or unknown)"""
+    if not digest:
+        return None
+    try:
+        return _read_blob(digest, blob_dir or BLOB_DIR)
+    except FileNotFoundError:
+        return None
+
+
+def compact_item(item, blob_dir=None):
+    """
+    Return a copy of a raw item whose body fields are replaced by '<field>_blob' digests.
+    Identical bodies across pages, runs and sites are stored only once.
+    """
+    compact = dict(item)
+    for field in BODY_FIELDS:
+        if isinstance(compact.get(field), str):
+            compact[f"{field}_blob"] = put_text(compact.pop(field), blob_dir)
+    return compact
+
+
+def hydrate_item(item, blob_dir=None):
+    """Return a copy of a compacted item with its body fields decompressed again"""
+    if not any(f"{field}_blob" in item for field in BODY_FIELDS):
+        return item
+    full = dict(item)
+    for field in BODY_FIELDS:
+        if f"{field}_blob" in full:
+            full[field] = get_text(full.pop(f"{field}_blob"), blob_dir) or ""
+    return full
+
+
+def item_body(item, field, blob_dir=None):
+    """One body field of a raw item, whether it is compacted or not"""
+    if f"{field}_blob" in item:
+        return get_text(item[f"{field}_blob"], blob_dir) or ""
+    return item.get(field) or ""
+
+
+def blob_stats(blob_dir=None):
+    """Return the number of stored blobs and their compressed size on disk"""
+    blob_dir = blob_dir or BLOB_DIR
+    count = size = 0
+    for root, _, files in os.walk(blob_dir):
+        for name in files:
+            if name.endswith(tuple(EXTENSIONS.values())):
+                count += 1
+                size += os.path.getsize(os.path.join(root, name))
+    return {"blobs": count, "bytes": size}
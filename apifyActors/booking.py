@@ -1,9 +1,97 @@
 import os
 from dotenv import load_dotenv
 load_dotenv()
+import pandas as pd
 from apify_client import ApifyClient
+from apifyActors.actor_client import call_actor, download_items
+from apifyActors.metrics import span
+from apifyActors.parallel import DEFAULT_MAX_CONCURRENCY, run_actor_shards
+from apifyActors.records import Hotel
 from datetime import datetime
 
+BOOKING_ACTOR_ID = "oeiQgfg5fsmIJB7Cn"
+
+# Columns of the combined hotel table, in display order
+HOTEL_COLUMNS = [
+    "search", "check_in", "check_out", "adults", "children", "rooms",
+    "name", "city", "country", "price_value", "price_currency", "stars",
+    "review_score", "review_count", "url", "image",
+]
+
+def build_booking_run_input(search="New York", max_items=10, property_type="none", sort_by="distance_from_search", stars_count_filter="any", currency="USD", language="en-gb", rooms=1, adults=2, children=0, min_max_price="0-999999", check_in=None, check_out=None):
+    """Build the Booking.com actor input (check-in/out dates as YYYY-MM-DD, optional)"""
+    run_input = {
+        "search": search,
+        "maxItems": max_items,
+        "propertyType": property_type,
+        "sortBy": sort_by,
+        "starsCountFilter": stars_count_filter,
+        "currency": currency,
+        "language": language,
+        "rooms": rooms,
+        "adults": adults,
+        "children": children,
+        "minMaxPrice": min_max_price,
+    }
+    if check_in:
+        run_input["checkIn"] = check_in
+    if check_out:
+        run_input["checkOut"] = check_out
+    return run_input
+
+def format_hotels(raw_results, currency="USD", search=""):
+    """
+    Turn raw Booking.com items into hotel records.
+    'price' is kept as scraped for display; 'price_value' / 'price_currency' hold the
+    parsed amount and ISO currency (falling back to the requested currency).
+    """
+    return [Hotel.from_raw(item, idx, currency, search) for idx, item in enumerate(raw_results, 1)]
+
+def _price_range(hotels, currency):
+    """Min/max parsed price of the hotels priced in the requested currency"""
+    currency = (currency or "").upper()
+    prices = [h["price_value"] for h in hotels if h["price_value"] is not None and h["price_currency"] in (currency, None)]
+    return min(prices, default="N/A"), max(prices, default="N/A")
+
+def hotels_frame(hotels):
+    """
+    Typed DataFrame of hotel records for sorting and cross-search comparison.
+    Prices are float64 (NaN when missing), ratings numeric; rows are sorted by price.
+    """
+    frame = pd.DataFrame(hotels, columns=HOTEL_COLUMNS)
+    for column in ("price_value", "stars", "review_score"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+    for column in ("review_count", "adults", "children", "rooms"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("Int64")
+    return frame.sort_values("price_value", kind="stable", na_position="last").reset_index(drop=True)
+
+def price_table(frame):
+    """Per search / dates / guests price statistics of a hotels_frame, one row per currency"""
+    keys = ["search", "check_in", "check_out", "adults", "children", "rooms", "price_currency"]
+    grouped = frame.groupby(keys, dropna=False, sort=False)["price_value"]
+    table = grouped.agg(hotels="size", priced="count", min_price="min", median_price="median", max_price="max")
+    return table.reset_index().sort_values("median_price", na_position="last").reset_index(drop=True)
+
+def plan_booking_searches(destinations, date_ranges=None, guest_options=None):
+    """
+    Plan one run per destination x date range x guest combination.
+    Args:
+        destinations (list): Search cities/locations
+        date_ranges (list): (check_in, check_out) date string pairs; None for no dates
+        guest_options (list): {"adults", "children", "rooms"} dicts; None for the defaults
+    """
+    plans = []
+    for search in destinations:
+        for check_in, check_out in (date_ranges or [(None, None)]):
+            for guests in (guest_options or [{}]):
+                guests = {"adults": guests.get("adults", 2), "children": guests.get("children", 0), "rooms": guests.get("rooms", 1)}
+                label = search
+                if check_in:
+                    label += f" {check_in}→{check_out}"
+                label += f" ({guests['adults']}A/{guests['children']}C/{guests['rooms']}R)"
+                plans.append(dict(guests, search=search, check_in=check_in, check_out=check_out, label=label))
+    return plans
+
 def scrape_booking(search="New York", max_items=10, property_type="none", sort_by="distance_from_search", stars_count_filter="any", currency="USD", language="en-gb", rooms=1, adults=2, children=0, min_max_price="0-999999", api_token=None):
     """
     Scrape Booking.com for hotels and return formatted data.
@@ -13,48 +101,104 @@ def scrape_booking(search="New York", max_items=10, property_type="none", sort_b
         api_token = os.environ.get("APIFY_API_TOKEN")
     try:
         client = ApifyClient(api_token)
-        run_input = {
-            "search": search,
-            "maxItems": max_items,
-            "propertyType": property_type,
-            "sortBy": sort_by,
-            "starsCountFilter": stars_count_filter,
-            "currency": currency,
-            "language": language,
-            "rooms": rooms,
-            "adults": adults,
-            "children": children,
-            "minMaxPrice": min_max_price,
-        }
-        run = client.actor("oeiQgfg5fsmIJB7Cn").call(run_input=run_input)
+        run_input = build_booking_run_input(search, max_items, property_type, sort_by, stars_count_filter, currency, language, rooms, adults, children, min_max_price)
+        run = call_actor(client, BOOKING_ACTOR_ID, run_input, "booking")
         if run is None:
             return {"error": "Failed to start the scraper. Please check your API token."}
-        raw_results = list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        raw_results = download_items(client, run, "booking")
         if not raw_results:
             return {"error": "No results found. Please try with different search parameters."}
-        hotels = []
-        for idx, item in enumerate(raw_results, 1):
-            hotels.append({
-                "hotel_number": idx,
-                "name": item.get("name", "Unknown"),
-                "address": item.get("address", ""),
-                "city": item.get("city", ""),
-                "country": item.get("country", ""),
-                "price": item.get("price", "N/A"),
-                "currency": item.get("currency", ""),
-                "stars": item.get("stars", "N/A"),
-                "review_score": item.get("reviewScore", "N/A"),
-                "review_count": item.get("reviewCount", "N/A"),
-                "url": item.get("url", ""),
-                "image": item.get("mainPhotoUrl", ""),
-                "raw_data": item
-            })
+        with span("formatting", "booking"):
+            hotels = format_hotels(raw_results, currency, search)
+            min_price, max_price = _price_range(hotels, currency)
+            summary = {
+                "total_hotels": len(hotels),
+                "city": search,
+                "min_price": min_price,
+                "max_price": max_price,
+                "currency": currency,
+                "other_currencies": sorted({h["price_currency"] for h in hotels if h["price_currency"] not in (currency.upper(), None)})
+            }
+        return {
+            "success": True,
+            "hotels": hotels,
+            "summary": summary,
+            "raw_results": raw_results
+        }
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+def scrape_booking_batch(
+    destinations,
+    date_ranges=None,
+    guest_options=None,
+    max_items=10,
+    currency="USD",
+    property_type="none",
+    sort_by="distance_from_search",
+    stars_count_filter="any",
+    language="en-gb",
+    min_max_price="0-999999",
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    api_token=None
+):
+    """
+    Search many destinations / date ranges / guest combinations as concurrent actor runs
+    and return them as one combined hotel list.
+    Every run asks for the same currency; each raw item is tagged with the search, dates and
+    guests that found it, and prices are parsed once into 'price_value' / 'price_currency'.
+    Args:
+        destinations (list): Search cities/locations
+        date_ranges (list): (check_in, check_out) pairs as YYYY-MM-DD strings
+        guest_options (list): {"adults", "children", "rooms"} dicts
+        max_items (int): Maximum hotels per run
+        max_concurrency (int): Maximum number of actor runs at the same time
+    Returns:
+        dict: {success, hotels, summary, raw_results} or {error}; summary['by_search'] holds
+        per-search price statistics.
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    try:
+        plans = plan_booking_searches([d for d in destinations if d], date_ranges, guest_options)
+        if not plans:
+            return {"error": "Please enter at least one destination."}
+
+        def run_search(plan):
+            client = ApifyClient(api_token)
+            run_input = build_booking_run_input(
+                plan["search"], max_items, property_type, sort_by, stars_count_filter, currency, language,
+                plan["rooms"], plan["adults"], plan["children"], min_max_price, plan["check_in"], plan["check_out"]
+            )
+            run = call_actor(client, BOOKING_ACTOR_ID, run_input, "booking")
+            if run is None:
+                raise RuntimeError("Failed to start the scraper. Please check your API token.")
+            tags = {"search": plan["search"], "checkIn": plan["check_in"], "checkOut": plan["check_out"],
+                    "adults": plan["adults"], "children": plan["children"], "rooms": plan["rooms"]}
+            return run, [dict(item, **tags) for item in download_items(client, run, "booking")]
+
+        sharded = run_actor_shards(run_search, plans, max_concurrency, describe=lambda plan, items: {"shard": plan["label"]}, noun="searches")
+        if not sharded.get("success"):
+            return sharded
+        raw_results = sharded["items"]
+        if not raw_results:
+            return {"error": "No results found. Please try with different search parameters."}
+        with span("formatting", "booking"):
+            hotels = format_hotels(raw_results, currency)
+            min_price, max_price = _price_range(hotels, currency)
+            by_search = price_table(hotels_frame(hotels))
         summary = {
             "total_hotels": len(hotels),
-            "city": search,
-            "min_price": min([float(h["price"]) for h in hotels if h["price"] not in (None, "N/A", "")], default="N/A"),
-            "max_price": max([float(h["price"]) for h in hotels if h["price"] not in (None, "N/A", "")], default="N/A"),
-            "currency": currency
+            "city": ", ".join(dict.fromkeys(plan["search"] for plan in plans)),
+            "min_price": min_price,
+            "max_price": max_price,
+            "currency": currency,
+            "other_currencies": sorted({h["price_currency"] for h in hotels if h["price_currency"] not in (currency.upper(), None)}),
+            "by_search": by_search.astype(object).where(by_search.notna(), None).to_dict("records"),
+            "run_id": sharded["run_id"],
+            "shards": sharded["shards"],
+            "wall_time_s": sharded["wall_time_s"],
+            "total_shard_time_s": sharded["total_shard_time_s"]
         }
         return {
             "success": True,
@@ -73,4 +217,4 @@ if __name__ == "__main__":
         for h in results['hotels']:
             print(f"{h['hotel_number']}: {h['name']} - {h['price']} {h['currency']}")
     else:
-        print(results.get("error"))
\ No newline at end of file
+        print(results.get("error"))
@@ -0,0 +1,164 @@
+import os
+import numpy as np
+import pandas as pd
+from apifyActors.history_store import HISTORY_DB, connect
+
+# Latest version of every post/tweet in the history database, with its engagement counters
+ENGAGEMENT_SQL = {
+    "instagram": """
+SELECT id, author, posted_at AS time, likes, comments
+FROM (SELECT COALESCE(short_code, post_id, url) AS id, owner_username AS author, posted_at, likes, comments,
+             ROW_NUMBER() OVER (PARTITION BY COALESCE(short_code, post_id, url) ORDER BY scraped_at DESC) AS rn
+      FROM instagram_posts WHERE posted_at IS NOT NULL)
+WHERE rn = 1
+""",
+    "twitter": """
+SELECT id, author, created_at AS time, likes, retweets
+FROM (SELECT tweet_id AS id, author, created_at, likes, retweets,
+             ROW_NUMBER() OVER (PARTITION BY tweet_id ORDER BY scraped_at DESC) AS rn
+      FROM tweets WHERE created_at IS NOT NULL)
+WHERE rn = 1
+""",
+    "facebook": """
+SELECT id, author, posted_at AS time, likes, comments, shares
+FROM (SELECT post_id AS id, page_name AS author, posted_at, likes, comments, shares,
+             ROW_NUMBER() OVER (PARTITION BY post_id ORDER BY scraped_at DESC) AS rn
+      FROM facebook_posts WHERE posted_at IS NOT NULL)
+WHERE rn = 1
+""",
+}
+
+METRICS = {
+    "instagram": ["likes", "comments"],
+    "twitter": ["likes", "retweets"],
+    "facebook": ["likes", "comments", "shares"],
+}
+
+# Label -> pandas offset alias (None plots every record)
+BUCKETS = {
+    "Raw records": None,
+    "Hour": "h",
+    "Day": "D",
+    "Week": "W-MON",
+    "Month": "MS",
+}
+
+
+def load_engagement(source, db_path=None):
+    """
+    Load engagement of stored Instagram posts, tweets or Facebook posts as a typed, time-sorted DataFrame.
+    Args:
+        source (str): "instagram", "twitter" or "facebook"
+    Returns:
+        DataFrame: id, author, time (datetime64, UTC), and one Int64 column per metric
+    """
+    columns = ["id", "author", "time"] + METRICS[source]
+    db_path = db_path or HISTORY_DB
+    if not os.path.exists(db_path):
+        frame = pd.DataFrame(columns=columns)
+    else:
+        conn = connect(db_path, read_only=True)
+        try:
+            frame = pd.read_sql_query(ENGAGEMENT_SQL[source], conn)
+        finally:
+            conn.close()
+    frame["time"] = pd.to_datetime(frame["time"], utc=True, errors="coerce")
+    for metric in METRICS[source]:
+        frame[metric] = pd.to_numeric(frame[metric], errors="coerce").astype("Int64")
+    return frame.dropna(subset=["time"]).sort_values("time", kind="stable").reset_index(drop=True)
+
+
+def bucket_engagement(frame, metrics, freq, agg="sum"):
+    """
+    Aggregate metrics per time bucket.
+    Args:
+        frame (DataFrame): Output of load_engagement
+        metrics (list): Metric columns to aggregate
+        freq (str): Pandas offset alias (e.g. "D"), or None to keep every record
+        agg (str): "sum", "mean", "median" or "max"
+    Returns:
+        DataFrame: time plus one float64 column per metric, and a 'count' of records per bucket
+    """
+    values = frame[["time"] + metrics].astype({metric: "float64" for metric in metrics})
+    if freq is None:
+        return values.assign(count=1)
+    grouped = values.set_index("time").resample(freq)
+    result = grouped[metrics].agg(agg)
+    result["count"] = grouped.size()
+    return result[result["count"] > 0].reset_index()
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Keeps the first and last points and, for every bucket in between, the point forming the
+    largest triangle with the previously kept point and the next bucket's average, so peaks
+    and trends survive while only `threshold` points are plotted.
+    Args:
+        x (ndarray): Increasing x values (float)
+        y (ndarray): y values (float, no NaN)
+        threshold (int): Number of points to keep
+    Returns:
+        ndarray: Indices of the kept points
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    kept = np.empty(threshold, dtype="int64")
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean() if next_end > next_start else x[n - 1]
+        avg_y = y[next_start:next_end].mean() if next_end > next_start else y[n - 1]
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[i + 1] = previous
+    return kept
+
+
+def downsample(series_frame, metrics, max_points):
+    """
+    Downsample a bucketed frame to at most max_points rows with LTTB.
+    Each metric gets an equal share of the budget; the union of the points kept for each
+    metric is returned, in time order.
+    """
+    if len(series_frame) <= max_points:
+        return series_frame
+    x = (series_frame["time"] - series_frame["time"].iloc[0]).dt.total_seconds().to_numpy(dtype="float64")
+    kept = set()
+    for metric in metrics:
+        y = series_frame[metric].fillna(0).to_numpy(dtype="float64")
+        kept.update(lttb(x, y, max(3, max_points // len(metrics))).tolist())
+    return series_frame.iloc[sorted(kept)].reset_index(drop=True)
+
+
+def engagement_figure(frame, metrics, freq="D", agg="sum", max_points=2000):
+    """
+    Line chart of engagement over time, aggregated and downsampled before plotting.
+    Returns:
+        tuple: (plotly Figure, {'records', 'buckets', 'plotted'})
+    """
+    import plotly.graph_objects as go
+    series = bucket_engagement(frame, metrics, freq, agg)
+    plotted = downsample(series, metrics, max_points)
+    fig = go.Figure()
+    for metric in metrics:
+        fig.add_trace(go.Scattergl(
+            x=plotted["time"],
+            y=plotted[metric],
+            mode="lines+markers" if len(plotted) <= 200 else "lines",
+            name=metric,
+        ))
+    fig.update_layout(
+        height=450,
+        margin={"l": 0, "r": 0, "t": 30, "b": 0},
+        hovermode="x unified",
+        yaxis_title=metrics[0] if len(metrics) == 1 else f"{agg} per {'record' if freq is None else 'bucket'}",
+    )
+    return fig, {"records": len(frame), "buckets": len(series), "plotted": len(plotted)}
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timezone
+from apifyActors.records import to_iso
+from apifyActors.replay import active_replay
+from apifyActors.tweet_history import parse_tweet_time
+
+SEEN_DB = os.environ.get("SCRAPER_SEEN_DB", os.path.join(".scraper_data", "seen_index.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_items (
+    source TEXT NOT NULL,
+    key_hash BLOB NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (source, key_hash)
+) WITHOUT ROWID;
+"""
+
+# Raw item fields identifying the same post/tweet/place across runs, in order of preference
+ID_FIELDS = {
+    "instagram_hashtag": ("shortCode", "id", "url"),
+    "instagram_profile": ("shortCode", "id", "url"),
+    "twitter": ("id", "url"),
+    "google_maps": ("placeId", "url"),
+    "booking": ("hotelId", "id", "url"),
+    "website_content": ("url",),
+}
+# Raw item fields holding the item's own timestamp (used to keep the newest version)
+TIME_FIELDS = ("timestamp", "createdAt", "scrapedAt")
+# Items whose timestamp is missing or unparseable count as the oldest
+_NO_TIME = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def item_key(source, item):
+    """Return the stable id of a raw item, or None if it has none"""
+    for field in ID_FIELDS.get(source, ("id", "url")):
+        value = item.get(field)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def item_time(item):
+    """Return the item's own timestamp as aware UTC datetime (epochs, ISO 8601 and Twitter's format)"""
+    value = next((item[field] for field in TIME_FIELDS if item.get(field)), None)
+    if isinstance(value, (int, float)):
+        value = to_iso(value)
+    return parse_tweet_time(value) or _NO_TIME
+
+
+def _hash(value):
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+
+
+def dedupe_batch(source, items):
+    """
+    Collapse duplicates inside one result set, keeping the newest version of each item.
+    Items without an id are kept as they are. Order of first appearance is preserved.
+    """
+    positions = {}
+    unique = []
+    for item in items:
+        key = item_key(source, item)
+        if key is None:
+            unique.append(item)
+            continue
+        if key not in positions:
+            positions[key] = len(unique)
+            unique.append(item)
+            continue
+        if item_time(item) >= item_time(unique[positions[key]]):
+            unique[positions[key]] = item
+    return unique
+
+
+def connect(db_path=None):
+    db_path = db_path or SEEN_DB
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def mark_seen(source, items, db_path=None, record=True):
+    """
+    Look up items in the persistent seen-index and record them as seen.
+    With record=False the index is only read.
+    Returns:
+        list: One flag per item, True if the item was never seen before
+    """
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    keys = [item_key(source, item) for item in items]
+    hashes = [_hash(f"{source}:{key}") if key is not None else None for key in keys]
+    conn = connect(db_path)
+    try:
+        with conn:
+            known = set()
+            lookup = [h for h in hashes if h is not None]
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(lookup), 500):
+                chunk = lookup[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key_hash FROM seen_items WHERE source = ? AND key_hash IN ({', '.join('?' * len(chunk))})",
+                    [source, *chunk],
+                )
+                known.update(row[0] for row in rows)
+            if record:
+                conn.executemany(
+                    """INSERT INTO seen_items (source, key_hash, first_seen, last_seen)
+                       VALUES (?, ?, ?, ?)
+                       ON CONFLICT (source, key_hash) DO UPDATE SET
+                           last_seen = excluded.last_seen,
+                           seen_count = seen_items.seen_count + 1""",
+                    [(source, key_hash, now, now) for key_hash in set(hashes) if key_hash is not None],
+                )
+    finally:
+        conn.close()
+    return [key_hash is None or key_hash not in known for key_hash in hashes]
+
+
+def filter_seen(source, items, hide_seen=False, db_path=None):
+    """
+    Deduplicate a result set against itself and against all previous runs.
+    Args:
+        source (str): Scraper name (e.g. "twitter")
+        items (list): Raw items returned by the actor
+        hide_seen (bool): Drop items already seen in an earlier run
+    Returns:
+        tuple: (items, new_flags) where new_flags[i] tells whether items[i] is new
+    """
+    items = dedupe_batch(source, items)
+    # Replayed archives are compared with the index but do not count as sightings
+    flags = mark_seen(source, items, db_path, record=active_replay() is None)
+    if hide_seen:
+        items = [item for item, is_new in zip(items, flags) if is_new]
+        flags = [True] * len(items)
+    return items, flags
@@ -0,0 +1,146 @@
+import io
+import json
+import os
+from collections.abc import Mapping
+from datetime import date, datetime
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# Encoded bytes collected before a chunk is handed to the writer
+EXPORT_CHUNK_BYTES = int(os.environ.get("SCRAPER_EXPORT_CHUNK_BYTES", str(256 * 1024)))
+
+# Pretty JSON is indented by two spaces, the only indent orjson supports
+PRETTY_INDENT = 2
+
+EXPORT_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _default(value):
+    """Encode the values plain JSON has no type for (records, dates, sets)"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encoder(pretty):
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return "orjson", lambda item: orjson.dumps(item, default=_default, option=option)
+    if ujson is not None:
+        indent = PRETTY_INDENT if pretty else 0
+        return "ujson", lambda item: ujson.dumps(
+            item, ensure_ascii=False, escape_forward_slashes=False, indent=indent, default=_default
+        ).encode("utf-8")
+    if pretty:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=PRETTY_INDENT, default=_default)
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+    return "json", lambda item: encoder.encode(item).encode("utf-8")
+
+
+def encoder_name():
+    """Name of the JSON library used for exports: orjson, ujson or json"""
+    return _encoder(False)[0]
+
+
+def iter_ndjson(items):
+    """Yield UTF-8 NDJSON bytes, one compact item per line, in chunks of about EXPORT_CHUNK_BYTES"""
+    dumps = _encoder(False)[1]
+    chunk = bytearray()
+    for item in items:
+        chunk += dumps(item)
+        chunk += b"\n"
+        if len(chunk) >= EXPORT_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+def iter_json_array(items, pretty=True):
+    """Yield a UTF-8 JSON array of the items in chunks, encoding one item at a time"""
+    dumps = _encoder(pretty)[1]
+    pad = b" " * PRETTY_INDENT if pretty else b""
+    newline = b"\n" if pretty else b""
+    chunk = bytearray(b"[")
+    first = True
+    for item in items:
+        if not first:
+            chunk += b","
+        first = False
+        chunk += newline + pad
+        encoded = dumps(item)
+        chunk += encoded.replace(b"\n", b"\n" + pad) if pretty else encoded
+        if len(chunk) >= EXPORT_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if not first:
+        chunk += newline
+    chunk += b"]\n" if pretty else b"]"
+    yield bytes(chunk)
+
+
+def iter_export(items, fmt="json"):
+    """Yield the encoded chunks of an export; fmt is 'json' (pretty array) or 'ndjson'"""
+    if fmt == "ndjson":
+        return iter_ndjson(items)
+    if fmt == "json":
+        return iter_json_array(items)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def write_export(items, fh, fmt="json"):
+    """Encode items into a binary file object chunk by chunk; returns the bytes written"""
+    written = 0
+    for chunk in iter_export(items, fmt):
+        fh.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def export_buffer(items, fmt="json"):
+    """
+    Encode items into a rewound in-memory binary buffer, e.g. for a download button.
+    Items are encoded one at a time, so no intermediate string of the whole export is built.
+    """
+    fh = io.BytesIO()
+    write_export(items, fh, fmt)
+    fh.seek(0)
+    return fh
+
+
+# For testing
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    items = [{"id": i, "text": "ünïcode text / " * 20, "tags": ["a", "b"], "nested": {"likes": i}} for i in range(100000)]
+    for fmt in EXPORT_FORMATS:
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = len(export_buffer(items, fmt).getbuffer())
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{encoder_name()} {fmt}: {size / 2**20:.1f} MiB in {elapsed:.2f} s, peak {peak / 2**20:.1f} MiB")
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = len(json.dumps(items, indent=4, ensure_ascii=False).encode("utf-8"))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    print(f"json.dumps(indent=4): {size / 2**20:.1f} MiB in {elapsed:.2f} s, peak {peak / 2**20:.1f} MiB")
@@ -2,20 +2,92 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from apify_client import ApifyClient
+from apifyActors.actor_client import call_actor, iter_records
+from apifyActors.records import to_int, to_iso
 
-api_token = os.environ.get("APIFY_API_TOKEN")
-client = ApifyClient(api_token)
+FACEBOOK_ACTOR_ID = "KoJrdxJCTtpon81KY"
 
-# Prepare the Actor input
-run_input = {
-    "startUrls": [{ "url": "https://www.facebook.com/humansofnewyork/" }],
-    "resultsLimit": 20,
-    "captionText": False,
-}
+def build_facebook_run_input(profile_urls=None, results_limit=20, caption_text=False):
+    """Build the Facebook posts actor input"""
+    return {
+        "startUrls": [{"url": url} for url in (profile_urls or ["https://www.facebook.com/humansofnewyork/"])],
+        "resultsLimit": results_limit,
+        "captionText": caption_text,
+    }
 
-# Run the Actor and wait for it to finish
-run = client.actor("KoJrdxJCTtpon81KY").call(run_input=run_input)
+def format_facebook_post(item, idx):
+    """Turn one raw Facebook post into a typed record"""
+    media = item.get("media") or []
+    image_url = ""
+    if media and isinstance(media[0], dict):
+        image_url = media[0].get("thumbnail") or (media[0].get("photo_image") or {}).get("uri", "")
+    return {
+        "post_number": idx,
+        "page_name": item.get("pageName") or (item.get("user") or {}).get("name", ""),
+        "text": item.get("text", ""),
+        "posted_at": to_iso(item.get("time") or item.get("timestamp")),
+        "likes": to_int(item.get("likes")),
+        "comments": to_int(item.get("comments")),
+        "shares": to_int(item.get("shares")),
+        "url": item.get("url") or item.get("topLevelUrl", ""),
+        "image_url": image_url,
+        "raw_data": item
+    }
 
-# Fetch and print Actor results from the run's dataset (if there are any)
-for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-    print(item)
\ No newline at end of file
+def stream_facebook_posts(client, run):
+    """Yield typed post records of a finished run while its dataset is downloaded"""
+    return iter_records(client, run, format_facebook_post, "facebook")
+
+def scrape_facebook_posts(profile_urls=None, results_limit=20, api_token=None, on_record=None):
+    """
+    Scrape posts of Facebook pages/profiles and return formatted data.
+    Args:
+        profile_urls (list): Facebook page or profile URLs
+        results_limit (int): Maximum number of posts per page
+        api_token (str): Apify API token
+        on_record (callable): Optional callback(record) for each post as it streams in
+    Returns:
+        dict: {success, posts, summary, raw_results} or {error}
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    try:
+        client = ApifyClient(api_token)
+        run_input = build_facebook_run_input(profile_urls, results_limit)
+        run = call_actor(client, FACEBOOK_ACTOR_ID, run_input, "facebook")
+        if run is None:
+            return {"error": "Failed to start the scraper. Please check your API token."}
+        posts = []
+        for record in stream_facebook_posts(client, run):
+            posts.append(record)
+            if on_record is not None:
+                on_record(record)
+        if not posts:
+            return {"error": "No results found. Please try with different page URLs."}
+        summary = {
+            "total_posts": len(posts),
+            "pages": sorted({post["page_name"] for post in posts if post["page_name"]}),
+            "total_likes": sum(post["likes"] for post in posts),
+            "total_comments": sum(post["comments"] for post in posts),
+            "total_shares": sum(post["shares"] for post in posts),
+            "run_id": run.get('id'),
+            "dataset_id": run.get('defaultDatasetId')
+        }
+        return {
+            "success": True,
+            "posts": posts,
+            "summary": summary,
+            "raw_results": [post["raw_data"] for post in posts]
+        }
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+# For testing
+if __name__ == "__main__":
+    results = scrape_facebook_posts(["https://www.facebook.com/humansofnewyork/"], results_limit=5)
+    if results.get("success"):
+        print(f"Scraped {results['summary']['total_posts']} posts.")
+        for p in results['posts']:
+            print(f"{p['post_number']}: {p['page_name']} - {p['likes']} likes")
+    else:
+        print(results.get("error"))
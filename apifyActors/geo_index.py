@@ -0,0 +1,234 @@
+import math
+import os
+import numpy as np
+import pandas as pd
+from apifyActors.history_store import HISTORY_DB, connect, item_coordinates
+
+EARTH_RADIUS_M = 6371008.8
+
+POINT_COLUMNS = ["kind", "id", "name", "category", "rating", "lat", "lng", "url"]
+
+# Latest version of every place and hotel with coordinates in the history database
+LATEST_POINTS_SQL = """
+SELECT 'place' AS kind, place_id AS id, name, category, rating, lat, lng, url
+FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY COALESCE(place_id, url) ORDER BY scraped_at DESC) AS rn
+      FROM maps_places WHERE lat IS NOT NULL AND lng IS NOT NULL)
+WHERE rn = 1
+UNION ALL
+SELECT 'hotel' AS kind, hotel_id AS id, name, CAST(stars AS TEXT) || '★' AS category, review_score AS rating, lat, lng, url
+FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY COALESCE(hotel_id, url) ORDER BY scraped_at DESC) AS rn
+      FROM booking_hotels WHERE lat IS NOT NULL AND lng IS NOT NULL)
+WHERE rn = 1
+"""
+
+
+def _typed(frame):
+    """Cast point columns to their dtypes and drop rows without valid coordinates"""
+    frame = frame.reindex(columns=POINT_COLUMNS)
+    frame["lat"] = pd.to_numeric(frame["lat"], errors="coerce").astype("float64")
+    frame["lng"] = pd.to_numeric(frame["lng"], errors="coerce").astype("float64")
+    frame["rating"] = pd.to_numeric(frame["rating"], errors="coerce").astype("float64")
+    frame["kind"] = frame["kind"].astype("category")
+    valid = frame["lat"].between(-90, 90) & frame["lng"].between(-180, 180)
+    return frame[valid].reset_index(drop=True)
+
+
+def points_frame(kind, raw_results):
+    """
+    Extract the coordinates of raw scraper items into a typed DataFrame.
+    Args:
+        kind (str): "place" (Google Maps) or "hotel" (Booking)
+        raw_results (list): Raw items returned by the actor
+    Returns:
+        DataFrame: kind, id, name, category, rating, lat (float64), lng (float64), url
+    """
+    rows = []
+    for item in raw_results:
+        lat, lng = item_coordinates(item)
+        if lat is None or lng is None:
+            continue
+        if kind == "hotel":
+            rows.append({
+                "id": str(item.get("hotelId") or item.get("id") or item.get("url") or ""),
+                "name": item.get("name"),
+                "category": f"{item.get('stars')}★" if item.get("stars") not in (None, "") else None,
+                "rating": item.get("reviewScore", item.get("rating")),
+            })
+        else:
+            rows.append({
+                "id": str(item.get("placeId") or item.get("url") or ""),
+                "name": item.get("title"),
+                "category": item.get("category"),
+                "rating": item.get("totalScore"),
+            })
+        rows[-1].update({"kind": kind, "lat": lat, "lng": lng, "url": item.get("url")})
+    return _typed(pd.DataFrame(rows, columns=POINT_COLUMNS))
+
+
+def load_points(db_path=None):
+    """Load the latest version of every stored place and hotel with coordinates"""
+    db_path = db_path or HISTORY_DB
+    if not os.path.exists(db_path):
+        return _typed(pd.DataFrame(columns=POINT_COLUMNS))
+    conn = connect(db_path, read_only=True)
+    try:
+        frame = pd.read_sql_query(LATEST_POINTS_SQL, conn)
+    finally:
+        conn.close()
+    return _typed(frame)
+
+
+def haversine_m(lat, lng, lats, lngs):
+    """Great-circle distance in meters from one point to arrays of points"""
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """
+    Uniform lat/lng grid over a points DataFrame.
+    Radius and bounding-box queries only look at the cells overlapping the query area, so
+    they stay fast with tens of thousands of points. Queries return row positions of the frame.
+    """
+
+    def __init__(self, frame, cell_deg=0.01):
+        self.frame = frame.reset_index(drop=True)
+        self.cell_deg = cell_deg
+        self.lats = self.frame["lat"].to_numpy(dtype="float64")
+        self.lngs = self.frame["lng"].to_numpy(dtype="float64")
+        rows = np.floor(self.lats / cell_deg).astype("int64")
+        cols = np.floor(self.lngs / cell_deg).astype("int64")
+        self.cells = {}
+        if len(self.frame):
+            order = np.lexsort((cols, rows))
+            keys = np.stack([rows[order], cols[order]], axis=1)
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for chunk in np.split(order, starts):
+                self.cells[(int(rows[chunk[0]]), int(cols[chunk[0]]))] = chunk
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _candidates(self, south, west, north, east):
+        row_range = range(math.floor(south / self.cell_deg), math.floor(north / self.cell_deg) + 1)
+        col_range = range(math.floor(west / self.cell_deg), math.floor(east / self.cell_deg) + 1)
+        if len(row_range) * len(col_range) > len(self.cells):
+            # Query covers more cells than are populated: walk the populated ones instead
+            chunks = [idx for (row, col), idx in self.cells.items() if row in row_range and col in col_range]
+        else:
+            chunks = [self.cells[(row, col)] for row in row_range for col in col_range if (row, col) in self.cells]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype="int64")
+
+    def within_bbox(self, south, west, north, east):
+        """Row positions of points inside the (south, west, north, east) box; west > east crosses the antimeridian"""
+        if west > east:
+            return np.union1d(self.within_bbox(south, west, north, 180.0), self.within_bbox(south, -180.0, north, east))
+        idx = self._candidates(south, west, north, east)
+        inside = (self.lats[idx] >= south) & (self.lats[idx] <= north) & (self.lngs[idx] >= west) & (self.lngs[idx] <= east)
+        return np.sort(idx[inside])
+
+    def _radius_boxes(self, lat, lng, radius_m):
+        """Boxes covering the circle around (lat, lng): one, two across the antimeridian, or a polar cap"""
+        delta = radius_m / EARTH_RADIUS_M
+        # Slightly larger than exact, so points right on the circle survive float rounding
+        lat_span = math.degrees(delta) * (1 + 1e-9)
+        south, north = max(lat - lat_span, -90.0), min(lat + lat_span, 90.0)
+        cos_lat = math.cos(math.radians(lat))
+        if north >= 90.0 or south <= -90.0 or math.sin(delta) >= cos_lat:
+            # The circle contains a pole: every longitude is in reach
+            return [(south, -180.0, north, 180.0)]
+        # Widest longitude difference on the circle (reached poleward of lat, not at it)
+        lng_span = math.degrees(math.asin(math.sin(delta) / cos_lat)) * (1 + 1e-9)
+        if lng_span >= 180.0:
+            return [(south, -180.0, north, 180.0)]
+        west, east = lng - lng_span, lng + lng_span
+        if west < -180.0:
+            return [(south, west + 360.0, north, 180.0), (south, -180.0, north, east)]
+        if east > 180.0:
+            return [(south, west, north, 180.0), (south, -180.0, north, east - 360.0)]
+        return [(south, west, north, east)]
+
+    def within_radius(self, lat, lng, radius_m):
+        """
+        Points within radius_m meters of (lat, lng), nearest first.
+        Returns:
+            tuple: (row positions, distances in meters)
+        """
+        idx = np.unique(np.concatenate([self._candidates(*box) for box in self._radius_boxes(lat, lng, radius_m)]))
+        distances = haversine_m(lat, lng, self.lats[idx], self.lngs[idx])
+        inside = distances <= radius_m
+        idx, distances = idx[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return idx[order], distances[order]
+
+    def nearby(self, lat, lng, radius_m, kind=None):
+        """DataFrame of points within radius_m of (lat, lng) with a distance_m column, nearest first"""
+        idx, distances = self.within_radius(lat, lng, radius_m)
+        result = self.frame.iloc[idx].assign(distance_m=distances.round(1))
+        if kind is not None:
+            result = result[result["kind"] == kind]
+        return result.reset_index(drop=True)
+
+
+def cluster_points(frame, max_points=2000):
+    """
+    Downsample points for plotting by merging them into grid clusters.
+    Frames with at most max_points rows are returned as they are (count 1). Larger frames are
+    binned on a grid sized so roughly max_points cells are used; each cluster is placed at the
+    mean position of its members and labelled with its size.
+    Returns: DataFrame with lat, lng, count, name, kind
+    """
+    if len(frame) <= max_points:
+        return frame.assign(count=1)[["lat", "lng", "count", "name", "kind"]]
+    lat_min, lat_max = frame["lat"].min(), frame["lat"].max()
+    lng_min, lng_max = frame["lng"].min(), frame["lng"].max()
+    side = max(1, int(math.sqrt(max_points)))
+    lat_step = max((lat_max - lat_min) / side, 1e-9)
+    lng_step = max((lng_max - lng_min) / side, 1e-9)
+    bins = pd.DataFrame({
+        "row": ((frame["lat"] - lat_min) // lat_step).astype("int64"),
+        "col": ((frame["lng"] - lng_min) // lng_step).astype("int64"),
+        "lat": frame["lat"],
+        "lng": frame["lng"],
+        "name": frame["name"],
+        "kind": frame["kind"].astype(str),
+    })
+    clusters = bins.groupby(["row", "col"], sort=False).agg(
+        lat=("lat", "mean"), lng=("lng", "mean"), count=("lat", "size"), name=("name", "first"), kind=("kind", "first")
+    ).reset_index(drop=True)
+    multi = clusters["count"] > 1
+    clusters.loc[multi, "name"] = clusters.loc[multi, "count"].map(lambda n: f"{n} points")
+    clusters.loc[multi, "kind"] = "cluster"
+    return clusters
+
+
+def map_figure(frame, max_points=2000, center=None, zoom=None):
+    """
+    Plotly map of a points frame, clustered server-side to at most ~max_points markers.
+    Args:
+        frame (DataFrame): Typed points (see points_frame / load_points)
+        max_points (int): Marker budget sent to the browser
+        center (tuple): Optional (lat, lng) highlighted as the query center
+        zoom (float): Optional initial zoom level
+    """
+    import plotly.express as px
+    clusters = cluster_points(frame, max_points)
+    fig = px.scatter_map(
+        clusters,
+        lat="lat",
+        lon="lng",
+        size="count",
+        size_max=30,
+        color="kind",
+        hover_name="name",
+        hover_data={"count": True, "lat": ":.5f", "lng": ":.5f", "kind": False},
+        zoom=zoom if zoom is not None else 11,
+        height=520,
+    )
+    if center is not None:
+        fig.add_scattermap(lat=[center[0]], lon=[center[1]], mode="markers", marker={"size": 14, "color": "red"}, name="center")
+        fig.update_layout(map_center={"lat": center[0], "lon": center[1]})
+    fig.update_layout(margin={"l": 0, "r": 0, "t": 0, "b": 0})
+    return fig
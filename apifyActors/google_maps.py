@@ -2,14 +2,59 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from apify_client import ApifyClient
-from datetime import datetime
+from apifyActors.actor_client import call_actor, download_items
+from apifyActors.metrics import span
+from apifyActors.dedup import dedupe_batch, filter_seen, item_key
+from apifyActors.parallel import DEFAULT_MAX_CONCURRENCY, run_actor_shards
+from apifyActors.records import Place
+
+MAPS_ACTOR_ID = "nwua9Gu5YrADL7ZDj"
+
+def build_maps_run_input(search_strings, location_query, max_places=50, language="en", custom_geolocation=None):
+    """Build the Google Maps actor input; a GeoJSON custom_geolocation replaces the location query."""
+    run_input = {
+        "searchStringsArray": search_strings or ["restaurant"],
+        "locationQuery": location_query,
+        "maxCrawledPlacesPerSearch": max_places,
+        "language": language,
+        "searchMatching": "all",
+        "placeMinimumStars": "",
+        "website": "allPlaces",
+        "skipClosedPlaces": False,
+        "scrapePlaceDetailPage": False,
+        "scrapeTableReservationProvider": False,
+        "includeWebResults": False,
+        "scrapeDirectories": False,
+        "maxQuestions": 0,
+        "scrapeContacts": False,
+        "maximumLeadsEnrichmentRecords": 0,
+        "maxReviews": 0,
+        "reviewsSort": "newest",
+        "reviewsFilterString": "",
+        "reviewsOrigin": "all",
+        "scrapeReviewsPersonalData": True,
+        "maxImages": 0,  # FIXED: must be integer, not None
+        "scrapeImageAuthors": False,
+        "allPlacesNoSearchAction": "",
+    }
+    if custom_geolocation:
+        run_input["locationQuery"] = ""
+        run_input["customGeolocation"] = custom_geolocation
+    return run_input
+
+def format_places(raw_results, new_flags):
+    """Turn raw place items into the formatted records shown in the dashboard"""
+    with span("formatting", "google_maps"):
+        places = [Place.from_raw(item, idx, is_new) for idx, (item, is_new) in enumerate(zip(raw_results, new_flags), 1)]
+    return places
 
 def scrape_google_maps(
     search_strings=None,
     location_query="New York, USA",
     max_places=50,
     language="en",
-    api_token=None
+    api_token=None,
+    hide_seen=False
 ):
     if api_token is None:
         api_token = os.environ.get("APIFY_API_TOKEN")
@@ -19,53 +64,20 @@ def scrape_google_maps(
     """
     try:
         client = ApifyClient(api_token)
-        run_input = {
-            "searchStringsArray": search_strings or ["restaurant"],
-            "locationQuery": location_query,
-            "maxCrawledPlacesPerSearch": max_places,
-            "language": language,
-            "searchMatching": "all",
-            "placeMinimumStars": "",
-            "website": "allPlaces",
-            "skipClosedPlaces": False,
-            "scrapePlaceDetailPage": False,
-            "scrapeTableReservationProvider": False,
-            "includeWebResults": False,
-            "scrapeDirectories": False,
-            "maxQuestions": 0,
-            "scrapeContacts": False,
-            "maximumLeadsEnrichmentRecords": 0,
-            "maxReviews": 0,
-            "reviewsSort": "newest",
-            "reviewsFilterString": "",
-            "reviewsOrigin": "all",
-            "scrapeReviewsPersonalData": True,
-            "maxImages": 0,  # FIXED: must be integer, not None
-            "scrapeImageAuthors": False,
-            "allPlacesNoSearchAction": "",
-        }
-        run = client.actor("nwua9Gu5YrADL7ZDj").call(run_input=run_input)
+        run_input = build_maps_run_input(search_strings, location_query, max_places, language)
+        run = call_actor(client, MAPS_ACTOR_ID, run_input, "google_maps")
         if run is None:
             return {"error": "Failed to start the scraper. Please check your API token."}
-        raw_results = list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        raw_results = download_items(client, run, "google_maps")
         if not raw_results:
             return {"error": "No results found. Please try with different parameters."}
-        places = []
-        for idx, item in enumerate(raw_results, 1):
-            places.append({
-                "place_number": idx,
-                "name": item.get("title", ""),
-                "address": item.get("address", ""),
-                "category": item.get("category", ""),
-                "rating": item.get("totalScore", ""),
-                "reviews": item.get("reviewsCount", 0),
-                "url": item.get("url", ""),
-                "website": item.get("website", ""),
-                "phone": item.get("phone", ""),
-                "raw_data": item
-            })
+        raw_results, new_flags = filter_seen("google_maps", raw_results, hide_seen)
+        if not raw_results:
+            return {"error": "No new places since the last scrape."}
+        places = format_places(raw_results, new_flags)
         summary = {
             "total_places": len(places),
+            "new_places": sum(new_flags),
             "search_strings": search_strings,
             "location_query": location_query,
             "run_id": run.get('id'),
@@ -80,6 +92,119 @@ def scrape_google_maps(
     except Exception as e:
         return {"error": f"An error occurred: {str(e)}"}
 
+def grid_polygons(south, west, north, east, rows, cols):
+    """Split a bounding box into rows x cols GeoJSON polygons (customGeolocation format)"""
+    # Neighbouring cells share the same edge values so rounding leaves no gaps between them
+    lats = [south + (north - south) * row / rows for row in range(rows)] + [north]
+    lngs = [west + (east - west) * col / cols for col in range(cols)] + [east]
+    cells = []
+    for row in range(rows):
+        for col in range(cols):
+            s_lat, w_lng = lats[row], lngs[col]
+            n_lat, e_lng = lats[row + 1], lngs[col + 1]
+            cells.append({
+                "label": f"cell {row + 1}x{col + 1}",
+                "geolocation": {
+                    "type": "Polygon",
+                    "coordinates": [[[w_lng, s_lat], [e_lng, s_lat], [e_lng, n_lat], [w_lng, n_lat], [w_lng, s_lat]]],
+                },
+            })
+    return cells
+
+def plan_maps_shards(search_strings, location_query, sub_areas=None, bbox=None, grid_size=(2, 2)):
+    """
+    Plan one shard per (search string, sub-area).
+    Sub-areas are either explicit location queries (e.g. neighborhoods), a grid over a
+    (south, west, north, east) bounding box, or just the location query itself.
+    """
+    if sub_areas:
+        areas = [{"label": area, "location_query": area} for area in sub_areas]
+    elif bbox:
+        areas = grid_polygons(*bbox, *grid_size)
+    else:
+        areas = [{"label": location_query, "location_query": location_query}]
+    return [
+        dict(area, search_string=search_string, label=f"{search_string} @ {area['label']}")
+        for search_string in (search_strings or ["restaurant"])
+        for area in areas
+    ]
+
+def scrape_google_maps_sharded(
+    search_strings=None,
+    location_query="New York, USA",
+    sub_areas=None,
+    bbox=None,
+    grid_size=(2, 2),
+    max_places=50,
+    language="en",
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    api_token=None,
+    hide_seen=False
+):
+    """
+    Run a multi-category / multi-area survey as concurrent actor runs.
+    Each search string x sub-area is one shard with its own max_places limit. Results are
+    merged with duplicates removed by placeId (or URL); per-shard timing and overlap are
+    reported in the summary so shard granularity can be tuned.
+    Returns: dict with 'success', 'places', 'summary', 'raw_results' or 'error'.
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    try:
+        plan = plan_maps_shards(search_strings, location_query, sub_areas, bbox, grid_size)
+
+        def run_shard(shard):
+            client = ApifyClient(api_token)
+            run_input = build_maps_run_input(
+                [shard["search_string"]],
+                shard.get("location_query", location_query),
+                max_places,
+                language,
+                custom_geolocation=shard.get("geolocation")
+            )
+            run = call_actor(client, MAPS_ACTOR_ID, run_input, "google_maps")
+            if run is None:
+                raise RuntimeError("Failed to start the scraper. Please check your API token.")
+            return run, download_items(client, run, "google_maps")
+
+        sharded = run_actor_shards(
+            run_shard,
+            plan,
+            max_concurrency,
+            describe=lambda shard, items: {"shard": shard["label"]},
+            key=lambda item: item_key("google_maps", item) or id(item)
+        )
+        if not sharded.get("success"):
+            return sharded
+        fetched = sharded["items"]
+        unique = dedupe_batch("google_maps", fetched)
+        if not unique:
+            return {"error": "No results found. Please try with different parameters."}
+        raw_results, new_flags = filter_seen("google_maps", unique, hide_seen)
+        if not raw_results:
+            return {"error": "No new places since the last scrape."}
+        places = format_places(raw_results, new_flags)
+        summary = {
+            "total_places": len(places),
+            "new_places": sum(new_flags),
+            "search_strings": search_strings,
+            "location_query": location_query,
+            "run_id": sharded["run_id"],
+            "dataset_id": None,
+            "shards": sharded["shards"],
+            "duplicates_removed": len(fetched) - len(unique),
+            "wall_time_s": sharded["wall_time_s"],
+            "total_shard_time_s": sharded["total_shard_time_s"]
+        }
+        return {
+            "success": True,
+            "places": places,
+            "summary": summary,
+            "raw_results": raw_results
+        }
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
 # For testing
 if __name__ == "__main__":
     results = scrape_google_maps()
@@ -2,24 +2,97 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from apify_client import ApifyClient
+from apifyActors.actor_client import call_actor, iter_records
+from apifyActors.records import to_iso
 
-api_token = os.environ.get("APIFY_API_TOKEN")
-client = ApifyClient(api_token)
+GOOGLE_NEWS_ACTOR_ID = "eWUEW5YpCaCBAa0Zs"
 
-# Prepare the Actor input
-run_input = {
-    "query": "Tesla",
-    "topics": [],
-    "topicsHashed": [],
-    "language": "US:en",
-    "maxItems": 100,
-    "fetchArticleDetails": True,
-    "proxyConfiguration": { "useApifyProxy": True },
-}
+def build_news_run_input(query="Tesla", language="US:en", max_items=100, fetch_article_details=True, topics=None):
+    """Build the Google News actor input"""
+    return {
+        "query": query,
+        "topics": topics or [],
+        "topicsHashed": [],
+        "language": language,
+        "maxItems": max_items,
+        "fetchArticleDetails": fetch_article_details,
+        "proxyConfiguration": {"useApifyProxy": True},
+    }
 
-# Run the Actor and wait for it to finish
-run = client.actor("eWUEW5YpCaCBAa0Zs").call(run_input=run_input)
+def format_news_article(item, idx):
+    """Turn one raw Google News item into a typed record"""
+    source = item.get("source")
+    if isinstance(source, dict):
+        source = source.get("title") or source.get("name", "")
+    return {
+        "article_number": idx,
+        "title": item.get("title", ""),
+        "source": source or "",
+        "published_at": to_iso(item.get("publishedAt") or item.get("date")),
+        "url": item.get("link") or item.get("url", ""),
+        "description": item.get("description") or item.get("snippet", ""),
+        "image_url": item.get("image") or item.get("imageUrl", ""),
+        "raw_data": item
+    }
 
-# Fetch and print Actor results from the run's dataset (if there are any)
-for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-    print(item)
\ No newline at end of file
+def stream_google_news(client, run):
+    """Yield typed article records of a finished run while its dataset is downloaded"""
+    return iter_records(client, run, format_news_article, "google_news")
+
+def scrape_google_news(query="Tesla", language="US:en", max_items=50, fetch_article_details=False, api_token=None, on_record=None):
+    """
+    Scrape Google News articles for a query and return formatted data.
+    Headlines come back fastest with fetch_article_details off; details of the articles a
+    user actually opens can be fetched afterwards with article_details.fetch_article_details.
+    Args:
+        query (str): Search query
+        language (str): Edition as "COUNTRY:lang", e.g. "US:en"
+        max_items (int): Maximum number of articles
+        fetch_article_details (bool): Also open every article inside the run (much slower)
+        api_token (str): Apify API token
+        on_record (callable): Optional callback(record) for each article as it streams in
+    Returns:
+        dict: {success, articles, summary, raw_results} or {error}
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    try:
+        client = ApifyClient(api_token)
+        run_input = build_news_run_input(query, language, max_items, fetch_article_details)
+        run = call_actor(client, GOOGLE_NEWS_ACTOR_ID, run_input, "google_news")
+        if run is None:
+            return {"error": "Failed to start the scraper. Please check your API token."}
+        articles = []
+        for record in stream_google_news(client, run):
+            articles.append(record)
+            if on_record is not None:
+                on_record(record)
+        if not articles:
+            return {"error": "No results found. Please try a different query."}
+        summary = {
+            "total_articles": len(articles),
+            "query": query,
+            "language": language,
+            "sources": len({article["source"] for article in articles if article["source"]}),
+            "details_fetched": fetch_article_details,
+            "run_id": run.get('id'),
+            "dataset_id": run.get('defaultDatasetId')
+        }
+        return {
+            "success": True,
+            "articles": articles,
+            "summary": summary,
+            "raw_results": [article["raw_data"] for article in articles]
+        }
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+# For testing
+if __name__ == "__main__":
+    results = scrape_google_news("Tesla", max_items=10)
+    if results.get("success"):
+        print(f"Scraped {results['summary']['total_articles']} articles.")
+        for a in results['articles']:
+            print(f"{a['article_number']}: {a['title']} ({a['source']})")
+    else:
+        print(results.get("error"))
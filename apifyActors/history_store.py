@@ -0,0 +1,410 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timezone
+from apifyActors.tweet_history import parse_tweet_time
+from apifyActors.blob_store import compact_item
+from apifyActors.records import parse_price, to_float, to_int, to_iso
+
+HISTORY_DB = os.environ.get("SCRAPER_HISTORY_DB", os.path.join(".scraper_data", "history.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    scraped_at TEXT NOT NULL,
+    params TEXT,
+    item_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_source_time ON runs (source, scraped_at);
+
+CREATE TABLE IF NOT EXISTS instagram_posts (
+    run_id TEXT, scraped_at TEXT, source TEXT,
+    post_id TEXT, short_code TEXT, owner_username TEXT, caption TEXT,
+    likes INTEGER, comments INTEGER, views INTEGER, posted_at TEXT,
+    hashtags TEXT, url TEXT, raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_instagram_posts_post_id ON instagram_posts (post_id);
+CREATE INDEX IF NOT EXISTS idx_instagram_posts_short_code ON instagram_posts (short_code);
+CREATE INDEX IF NOT EXISTS idx_instagram_posts_posted_at ON instagram_posts (posted_at);
+CREATE INDEX IF NOT EXISTS idx_instagram_posts_scraped_at ON instagram_posts (scraped_at);
+CREATE INDEX IF NOT EXISTS idx_instagram_posts_owner ON instagram_posts (owner_username);
+
+CREATE TABLE IF NOT EXISTS booking_hotels (
+    run_id TEXT, scraped_at TEXT, search TEXT,
+    hotel_id TEXT, name TEXT, address TEXT, city TEXT, country TEXT,
+    price REAL, currency TEXT, stars REAL, review_score REAL, review_count INTEGER,
+    lat REAL, lng REAL, url TEXT, raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_booking_hotels_hotel_id ON booking_hotels (hotel_id);
+CREATE INDEX IF NOT EXISTS idx_booking_hotels_scraped_at ON booking_hotels (scraped_at);
+CREATE INDEX IF NOT EXISTS idx_booking_hotels_city ON booking_hotels (city, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_booking_hotels_search ON booking_hotels (search, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_booking_hotels_latlng ON booking_hotels (lat, lng);
+
+CREATE TABLE IF NOT EXISTS tweets (
+    run_id TEXT, scraped_at TEXT,
+    tweet_id TEXT, author TEXT, text TEXT, created_at TEXT,
+    likes INTEGER, retweets INTEGER, replies INTEGER, lang TEXT, url TEXT, raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tweets_tweet_id ON tweets (tweet_id);
+CREATE INDEX IF NOT EXISTS idx_tweets_created_at ON tweets (created_at);
+CREATE INDEX IF NOT EXISTS idx_tweets_scraped_at ON tweets (scraped_at);
+CREATE INDEX IF NOT EXISTS idx_tweets_author ON tweets (author);
+
+CREATE TABLE IF NOT EXISTS maps_places (
+    run_id TEXT, scraped_at TEXT, location_query TEXT,
+    place_id TEXT, name TEXT, category TEXT, address TEXT, city TEXT,
+    rating REAL, reviews INTEGER, lat REAL, lng REAL,
+    url TEXT, website TEXT, phone TEXT, raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_maps_places_place_id ON maps_places (place_id);
+CREATE INDEX IF NOT EXISTS idx_maps_places_scraped_at ON maps_places (scraped_at);
+CREATE INDEX IF NOT EXISTS idx_maps_places_location ON maps_places (location_query, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_maps_places_city ON maps_places (city);
+CREATE INDEX IF NOT EXISTS idx_maps_places_latlng ON maps_places (lat, lng);
+
+CREATE TABLE IF NOT EXISTS website_pages (
+    run_id TEXT, scraped_at TEXT,
+    url TEXT, title TEXT, text_hash TEXT, raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_website_pages_url ON website_pages (url);
+CREATE INDEX IF NOT EXISTS idx_website_pages_scraped_at ON website_pages (scraped_at);
+
+CREATE TABLE IF NOT EXISTS facebook_posts (
+    run_id TEXT, scraped_at TEXT,
+    post_id TEXT, page_name TEXT, text TEXT, posted_at TEXT,
+    likes INTEGER, comments INTEGER, shares INTEGER, url TEXT, raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_facebook_posts_post_id ON facebook_posts (post_id);
+CREATE INDEX IF NOT EXISTS idx_facebook_posts_posted_at ON facebook_posts (posted_at);
+CREATE INDEX IF NOT EXISTS idx_facebook_posts_scraped_at ON facebook_posts (scraped_at);
+
+CREATE TABLE IF NOT EXISTS news_articles (
+    run_id TEXT, scraped_at TEXT, query TEXT,
+    title TEXT, publisher TEXT, published_at TEXT, description TEXT, url TEXT, raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_news_articles_url ON news_articles (url);
+CREATE INDEX IF NOT EXISTS idx_news_articles_published_at ON news_articles (published_at);
+CREATE INDEX IF NOT EXISTS idx_news_articles_query ON news_articles (query, scraped_at);
+
+CREATE TABLE IF NOT EXISTS tripadvisor_listings (
+    run_id TEXT, scraped_at TEXT, search_url TEXT,
+    listing_id TEXT, name TEXT, category TEXT, rating REAL, reviews INTEGER,
+    price TEXT, location TEXT, url TEXT, raw TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tripadvisor_listings_listing_id ON tripadvisor_listings (listing_id);
+CREATE INDEX IF NOT EXISTS idx_tripadvisor_listings_scraped_at ON tripadvisor_listings (scraped_at);
+"""
+
+# Ready-made queries for the dashboard's History tab
+PRESET_QUERIES = {
+    "Booking prices by city (last 30 days)": """SELECT city, currency, COUNT(*) AS hotels,
+       MIN(price) AS min_price, ROUND(AVG(price), 2) AS avg_price, MAX(price) AS max_price
+FROM booking_hotels
+WHERE scraped_at >= datetime('now', '-30 days') AND price IS NOT NULL
+GROUP BY city, currency
+ORDER BY city""",
+    "Most liked Instagram posts": """SELECT short_code, owner_username, MAX(likes) AS likes, comments, posted_at, url
+FROM instagram_posts
+GROUP BY short_code
+ORDER BY likes DESC
+LIMIT 100""",
+    "Tweets per author per day": """SELECT author, date(created_at) AS day, COUNT(DISTINCT tweet_id) AS tweets,
+       SUM(likes) AS likes, SUM(retweets) AS retweets
+FROM tweets
+GROUP BY author, day
+ORDER BY day DESC, tweets DESC""",
+    "Top rated places by location": """SELECT location_query, name, category, rating, reviews, address
+FROM maps_places
+WHERE rating IS NOT NULL
+ORDER BY location_query, rating DESC, reviews DESC""",
+    "News articles per publisher": """SELECT publisher, COUNT(DISTINCT url) AS articles, MAX(published_at) AS latest
+FROM news_articles
+GROUP BY publisher
+ORDER BY articles DESC""",
+    "Top rated TripAdvisor listings": """SELECT name, category, MAX(rating) AS rating, MAX(reviews) AS reviews, location, url
+FROM tripadvisor_listings
+WHERE rating IS NOT NULL
+GROUP BY listing_id
+ORDER BY rating DESC, reviews DESC""",
+    "Scrape runs": """SELECT run_id, source, scraped_at, item_count, params
+FROM runs
+ORDER BY scraped_at DESC
+LIMIT 200""",
+}
+
+
+def _to_float(value):
+    if value in (None, "", "N/A"):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _sql_timestamp(value):
+    """Normalize epoch seconds or ISO 8601 strings to SQLite's 'YYYY-MM-DD HH:MM:SS' (UTC)"""
+    if value in (None, ""):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            moment = datetime.fromtimestamp(value, tz=timezone.utc)
+        else:
+            moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+            if moment.tzinfo is not None:
+                moment = moment.astimezone(timezone.utc)
+        return moment.strftime("%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def item_coordinates(item):
+    """Return (lat, lng) floats of a raw Google Maps / Booking item, or (None, None)"""
+    location = item.get("location") or item.get("coordinates") or {}
+    if isinstance(location, dict):
+        lat = location.get("lat", location.get("latitude"))
+        lng = location.get("lng", location.get("lon", location.get("longitude")))
+    else:
+        lat = lng = None
+    if lat is None:
+        lat, lng = item.get("latitude", item.get("lat")), item.get("longitude", item.get("lng"))
+    return _to_float(lat), _to_float(lng)
+
+
+def _instagram_row(item, context):
+    hashtags = item.get("hashtags") or []
+    return {
+        "source": context["source"],
+        "post_id": str(item.get("id", "")) or None,
+        "short_code": item.get("shortCode"),
+        "owner_username": item.get("ownerUsername"),
+        "caption": item.get("caption"),
+        "likes": _to_int(item.get("likesCount")),
+        "comments": _to_int(item.get("commentsCount")),
+        "views": _to_int(item.get("videoViewCount")),
+        "posted_at": _sql_timestamp(item.get("timestamp")),
+        "hashtags": " ".join(f"#{tag}" for tag in hashtags) if isinstance(hashtags, list) else str(hashtags),
+        "url": item.get("url"),
+    }
+
+
+def _booking_row(item, context):
+    lat, lng = item_coordinates(item)
+    price, currency = parse_price(item.get("price"), item.get("currency") or context["params"].get("currency"))
+    return {
+        "search": item.get("search") or context["params"].get("search"),
+        "hotel_id": str(item.get("hotelId") or item.get("id") or item.get("url") or "") or None,
+        "name": item.get("name"),
+        "address": item.get("address") if isinstance(item.get("address"), str) else json.dumps(item.get("address")),
+        "city": item.get("city"),
+        "country": item.get("country"),
+        "price": price,
+        "currency": currency,
+        "stars": _to_float(item.get("stars")),
+        "review_score": _to_float(item.get("reviewScore", item.get("rating"))),
+        "review_count": _to_int(item.get("reviewCount", item.get("reviews"))),
+        "lat": lat,
+        "lng": lng,
+        "url": item.get("url"),
+    }
+
+
+def _tweet_row(item, context):
+    created_at = parse_tweet_time(item.get("createdAt"))
+    return {
+        "tweet_id": str(item.get("id", "")) or None,
+        "author": (item.get("author") or {}).get("username"),
+        "text": item.get("fullText", item.get("text")),
+        "created_at": created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else None,
+        "likes": _to_int(item.get("favoriteCount", item.get("likeCount"))),
+        "retweets": _to_int(item.get("retweetCount")),
+        "replies": _to_int(item.get("replyCount")),
+        "lang": item.get("lang"),
+        "url": item.get("url"),
+    }
+
+
+def _place_row(item, context):
+    lat, lng = item_coordinates(item)
+    return {
+        "location_query": context["params"].get("location_query"),
+        "place_id": item.get("placeId") or item.get("url"),
+        "name": item.get("title"),
+        "category": item.get("categoryName", item.get("category")),
+        "address": item.get("address"),
+        "city": item.get("city"),
+        "rating": _to_float(item.get("totalScore")),
+        "reviews": _to_int(item.get("reviewsCount")),
+        "lat": lat,
+        "lng": lng,
+        "url": item.get("url"),
+        "website": item.get("website"),
+        "phone": item.get("phone"),
+    }
+
+
+def _page_row(item, context):
+    return {
+        "url": item.get("url"),
+        "title": item.get("title") or (item.get("metadata") or {}).get("title"),
+        # The page text itself lives in the blob store
+        "text_hash": item.get("text_blob"),
+    }
+
+
+def _facebook_row(item, context):
+    # Counts come as strings like "1.2K" or "1,200"
+    return {
+        "post_id": str(item.get("postId") or item.get("id") or item.get("url") or "") or None,
+        "page_name": item.get("pageName") or (item.get("user") or {}).get("name"),
+        "text": item.get("text"),
+        "posted_at": _sql_timestamp(to_iso(item.get("time") or item.get("timestamp"))),
+        "likes": to_int(item.get("likes"), None),
+        "comments": to_int(item.get("comments"), None),
+        "shares": to_int(item.get("shares"), None),
+        "url": item.get("url") or item.get("topLevelUrl"),
+    }
+
+
+def _news_row(item, context):
+    publisher = item.get("source")
+    if isinstance(publisher, dict):
+        publisher = publisher.get("title") or publisher.get("name")
+    return {
+        "query": context["params"].get("query"),
+        "title": item.get("title"),
+        "publisher": publisher,
+        "published_at": _sql_timestamp(to_iso(item.get("publishedAt") or item.get("date"))),
+        "description": item.get("description") or item.get("snippet"),
+        "url": item.get("link") or item.get("url"),
+    }
+
+
+def _tripadvisor_row(item, context):
+    return {
+        "search_url": context["params"].get("url"),
+        "listing_id": str(item.get("locationId") or item.get("id") or item.get("url") or item.get("webUrl") or "") or None,
+        "name": item.get("name") or item.get("title"),
+        "category": item.get("category") or item.get("type"),
+        "rating": to_float(item.get("rating")),
+        "reviews": to_int(item.get("numberOfReviews", item.get("reviews")), None),
+        "price": item.get("priceRange") or item.get("price"),
+        "location": item.get("locationString") or item.get("address"),
+        "url": item.get("url") or item.get("webUrl"),
+    }
+
+
+# scraper name -> (table, row builder)
+SOURCE_TABLES = {
+    "instagram_hashtag": ("instagram_posts", _instagram_row),
+    "instagram_profile": ("instagram_posts", _instagram_row),
+    "booking": ("booking_hotels", _booking_row),
+    "twitter": ("tweets", _tweet_row),
+    "website_content": ("website_pages", _page_row),
+    "google_maps": ("maps_places", _place_row),
+    "facebook": ("facebook_posts", _facebook_row),
+    "google_news": ("news_articles", _news_row),
+    "tripadvisor": ("tripadvisor_listings", _tripadvisor_row),
+}
+
+
+def connect(db_path=None, read_only=False):
+    """Open the history database, creating the schema on first use"""
+    db_path = db_path or HISTORY_DB
+    if read_only:
+        return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def ingest_results(scraper, results, params=None, db_path=None):
+    """
+    Store the raw items of a successful scrape in the history database.
+    Args:
+        scraper (str): Scraper name as used by the chat intents (e.g. "booking")
+        results (dict): Return value of a scrape_* function
+        params (dict): Parameters the scraper was called with
+    Returns:
+        int: Number of items stored
+    """
+    if scraper not in SOURCE_TABLES or not results.get("success"):
+        return 0
+    table, build_row = SOURCE_TABLES[scraper]
+    params = params or {}
+    summary = results.get("summary", {})
+    run_id = summary.get("run_id") or f"local-{uuid.uuid4().hex[:12]}"
+    scraped_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    context = {"source": scraper, "params": params}
+    rows = []
+    for item in results.get("raw_results", []):
+        if table == "website_pages":
+            # Page bodies go to the blob store; rows only keep their digests
+            item = compact_item(item)
+        row = build_row(item, context)
+        row.update({"run_id": run_id, "scraped_at": scraped_at, "raw": json.dumps(item, ensure_ascii=False, default=str)})
+        rows.append(row)
+    if not rows:
+        return 0
+    columns = list(rows[0])
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, source, scraped_at, params, item_count) VALUES (?, ?, ?, ?, ?)",
+                (run_id, scraper, scraped_at, json.dumps(params, default=str), len(rows)),
+            )
+            conn.executemany(sql, rows)
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def run_query(sql, params=(), max_rows=10000, db_path=None):
+    """
+    Run a read-only SQL query against the history database.
+    Returns: dict with 'columns', 'rows', 'elapsed_ms' or 'error'
+    """
+    db_path = db_path or HISTORY_DB
+    if not os.path.exists(db_path):
+        return {"error": "No history yet. Run a scraper first."}
+    try:
+        conn = connect(db_path, read_only=True)
+        try:
+            start = time.perf_counter()
+            cursor = conn.execute(sql, params)
+            rows = cursor.fetchmany(max_rows)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            columns = [col[0] for col in cursor.description or []]
+        finally:
+            conn.close()
+        return {"columns": columns, "rows": rows, "elapsed_ms": elapsed_ms}
+    except sqlite3.Error as e:
+        return {"error": f"Query failed: {str(e)}"}
+
+
+def table_counts(db_path=None):
+    """Return the number of stored rows per table"""
+    db_path = db_path or HISTORY_DB
+    if not os.path.exists(db_path):
+        return {}
+    conn = connect(db_path, read_only=True)
+    try:
+        tables = ["runs"] + sorted({table for table, _ in SOURCE_TABLES.values()})
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+    finally:
+        conn.close()
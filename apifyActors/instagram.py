@@ -2,15 +2,19 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from apify_client import ApifyClient
-from datetime import datetime
+from apifyActors.actor_client import call_actor, download_items
+from apifyActors.metrics import span
+from apifyActors.dedup import filter_seen
+from apifyActors.records import InstagramPost
 
-def scrape_instagram_profile(profile_urls, results_limit=20, api_token=None):
+def scrape_instagram_profile(profile_urls, results_limit=20, api_token=None, hide_seen=False):
     """
     Scrape Instagram profile(s) and return formatted data.
     Args:
         profile_urls (list): List of Instagram profile URLs
         results_limit (int): Number of posts to fetch
         api_token (str): Apify API token
+        hide_seen (bool): Drop posts already seen in earlier runs
     Returns:
         dict: {success, posts, summary, raw_results} or {error}
     """
@@ -26,47 +30,24 @@ def scrape_instagram_profile(profile_urls, results_limit=20, api_token=None):
             "searchLimit": 1,
             "addParentData": False,
         }
-        run = client.actor("shu8hvrXbJbY3Eb9W").call(run_input=run_input)
+        run = call_actor(client, "shu8hvrXbJbY3Eb9W", run_input, "instagram_profile")
         if run is None:
             return {"error": "Failed to start the scraper. Please check your API token."}
-        raw_results = list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        raw_results = download_items(client, run, "instagram_profile")
         if not raw_results:
             return {"error": "No results found. Please try with different profile URLs."}
-        posts = []
-        for idx, post in enumerate(raw_results, 1):
-            timestamp = post.get('timestamp')
-            formatted_date = "Unknown"
-            if timestamp and isinstance(timestamp, (int, float)):
-                try:
-                    formatted_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                except:
-                    formatted_date = str(timestamp)
-            hashtags_text = ""
-            if post.get('hashtags'):
-                hashtags_text = " ".join([f"#{tag}" for tag in post.get('hashtags', [])])
-            posts.append({
-                "post_number": idx,
-                "username": post.get('ownerUsername', 'Unknown'),
-                "full_name": post.get('ownerFullName', ''),
-                "posted_date": formatted_date,
-                "caption": post.get('caption', ''),
-                "likes": post.get('likesCount', 0),
-                "comments": post.get('commentsCount', 0),
-                "shares": post.get('sharesCount', 0),
-                "views": post.get('videoViewCount', 0),
-                "hashtags": hashtags_text,
-                "post_url": post.get('url', ''),
-                "media_type": post.get('mediaType', ''),
-                "image_url": post.get('imageUrl', ''),
-                "video_url": post.get('videoUrl', ''),
-                "raw_data": post
-            })
+        raw_results, new_flags = filter_seen("instagram_profile", raw_results, hide_seen)
+        if not raw_results:
+            return {"error": "No new posts since the last scrape."}
+        with span("formatting", "instagram_profile"):
+            posts = [InstagramPost.from_raw(post, idx, is_new) for idx, (post, is_new) in enumerate(zip(raw_results, new_flags), 1)]
         total_likes = sum(post.get('likesCount', 0) for post in raw_results)
         total_comments = sum(post.get('commentsCount', 0) for post in raw_results)
         total_shares = sum(post.get('sharesCount', 0) for post in raw_results)
         unique_users = len(set(post.get('ownerUsername', 'Unknown') for post in raw_results))
         summary = {
             "total_posts": len(raw_results),
+            "new_posts": sum(new_flags),
             "unique_users": unique_users,
             "total_likes": total_likes,
             "total_comments": total_comments,
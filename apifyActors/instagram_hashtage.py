@@ -1,11 +1,31 @@
 from apify_client import ApifyClient
+from apifyActors.actor_client import call_actor, download_items
+from apifyActors.metrics import span
+from apifyActors.dedup import dedupe_batch, filter_seen, item_key
+from apifyActors.parallel import DEFAULT_MAX_CONCURRENCY, run_actor_shards
+from apifyActors.records import InstagramPost
+from apifyActors.replay import active_replay
 import json
-from datetime import datetime
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
-def scrape_instagram_posts(api_token=None, hashtags=None, results_limit=20):
+def format_hashtag_posts(raw_results, new_flags):
+    """Turn raw hashtag-scraper posts into display records"""
+    return [InstagramPost.from_raw(post, idx, is_new) for idx, (post, is_new) in enumerate(zip(raw_results, new_flags), 1)]
+
+def hashtag_summary(raw_results, new_flags):
+    """Totals over a set of raw hashtag posts"""
+    return {
+        "total_posts": len(raw_results),
+        "new_posts": sum(new_flags),
+        "unique_users": len(set(post.get('ownerUsername', 'Unknown') for post in raw_results)),
+        "total_likes": sum(post.get('likesCount', 0) for post in raw_results),
+        "total_comments": sum(post.get('commentsCount', 0) for post in raw_results),
+        "total_shares": sum(post.get('sharesCount', 0) for post in raw_results),
+    }
+
+def scrape_instagram_posts(api_token=None, hashtags=None, results_limit=20, hide_seen=False):
     """
     Scrape Instagram posts for given hashtags and return formatted data
     
@@ -13,6 +33,7 @@ def scrape_instagram_posts(api_token=None, hashtags=None, results_limit=20):
         api_token (str): Apify API token
         hashtags (list): List of hashtags to scrape
         results_limit (int): Maximum number of results
+        hide_seen (bool): Drop posts already seen in earlier runs
     
     Returns:
         dict: Formatted data with posts and summary
@@ -33,73 +54,111 @@ def scrape_instagram_posts(api_token=None, hashtags=None, results_limit=20):
         }
         
         # Run the Actor
-        run = client.actor("apify/instagram-hashtag-scraper").call(run_input=run_input)
+        run = call_actor(client, "apify/instagram-hashtag-scraper", run_input, "instagram_hashtag")
         
         if run is None:
             return {"error": "Failed to start the scraper. Please check your API token."}
         
         # Fetch results
-        raw_results = list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        raw_results = download_items(client, run, "instagram_hashtag")
         
         if not raw_results:
             return {"error": "No results found. Please try with different hashtags."}
         
-        # Format the data
-        formatted_posts = []
-        for post in raw_results:
-            # Format timestamp
-            timestamp = post.get('timestamp')
-            formatted_date = "Unknown"
-            if timestamp and isinstance(timestamp, (int, float)):
-                try:
-                    formatted_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                except:
-                    formatted_date = str(timestamp)
-            
-            # Format hashtags
-            hashtags_text = ""
-            if post.get('hashtags'):
-                hashtags_text = " ".join([f"#{tag}" for tag in post.get('hashtags', [])])
-            
-            # Create formatted post
-            formatted_post = {
-                "post_number": len(formatted_posts) + 1,
-                "username": post.get('ownerUsername', 'Unknown'),
-                "full_name": post.get('ownerFullName', ''),
-                "posted_date": formatted_date,
-                "caption": post.get('caption', ''),
-                "likes": post.get('likesCount', 0),
-                "comments": post.get('commentsCount', 0),
-                "shares": post.get('sharesCount', 0),
-                "views": post.get('videoViewCount', 0),
-                "hashtags": hashtags_text,
-                "post_url": post.get('url', ''),
-                "media_type": post.get('mediaType', ''),
-                "image_url": post.get('imageUrl', ''),
-                "video_url": post.get('videoUrl', ''),
-                "raw_data": post  # Keep original data for reference
-            }
-            formatted_posts.append(formatted_post)
+        # Drop duplicates and mark posts seen in earlier runs
+        raw_results, new_flags = filter_seen("instagram_hashtag", raw_results, hide_seen)
+        if not raw_results:
+            return {"error": "No new posts since the last scrape."}
         
-        # Calculate summary
-        total_likes = sum(post.get('likesCount', 0) for post in raw_results)
-        total_comments = sum(post.get('commentsCount', 0) for post in raw_results)
-        total_shares = sum(post.get('sharesCount', 0) for post in raw_results)
-        unique_users = len(set(post.get('ownerUsername', 'Unknown') for post in raw_results))
+        with span("formatting", "instagram_hashtag"):
+            formatted_posts = format_hashtag_posts(raw_results, new_flags)
+        summary = hashtag_summary(raw_results, new_flags)
+        summary.update({"run_id": run.get('id'), "dataset_id": run.get('defaultDatasetId')})
         
-        summary = {
-            "total_posts": len(raw_results),
-            "unique_users": unique_users,
-            "total_likes": total_likes,
-            "total_comments": total_comments,
-            "total_shares": total_shares,
-            "run_id": run.get('id'),
-            "dataset_id": run.get('defaultDatasetId')
+        # Save raw results to file (not when replaying, which may be reading this very file)
+        if active_replay() is None:
+            with open("instagram_results.json", "w", encoding="utf-8") as f:
+                json.dump(raw_results, f, indent=4, ensure_ascii=False)
+        
+        return {
+            "success": True,
+            "posts": formatted_posts,
+            "summary": summary,
+            "raw_results": raw_results
         }
         
-        # Save raw results to file
-        with open("instagram_results.json", "w", encoding="utf-8") as f:
-            json.dump(raw_results, f, indent=4, ensure_ascii=False)
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+def scrape_instagram_hashtags_parallel(api_token=None, hashtags=None, results_limit=20, per_hashtag_limits=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, hide_seen=False):
+    """
+    Scrape several hashtags as one actor run per hashtag, run concurrently
+    
+    Args:
+        api_token (str): Apify API token
+        hashtags (list): List of hashtags to scrape
+        results_limit (int): Maximum number of results per hashtag
+        per_hashtag_limits (dict): Optional hashtag -> results limit overrides
+        max_concurrency (int): Maximum number of actor runs at the same time
+        hide_seen (bool): Drop posts already seen in earlier runs
+    
+    Returns:
+        dict: Formatted data with posts and summary; posts found under several hashtags
+        appear once (merged on shortCode) and summary['hashtags'] breaks results down per tag
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    hashtags = list(dict.fromkeys(tag.strip().lstrip("#") for tag in (hashtags or []) if tag.strip().lstrip("#")))
+    per_hashtag_limits = {tag.lstrip("#"): limit for tag, limit in (per_hashtag_limits or {}).items()}
+    if not hashtags:
+        return {"error": "Please enter at least one hashtag."}
+    try:
+        def run_hashtag(tag):
+            client = ApifyClient(api_token)
+            run_input = {
+                "hashtags": [tag],
+                "resultsType": "posts",
+                "resultsLimit": per_hashtag_limits.get(tag, results_limit),
+            }
+            run = call_actor(client, "apify/instagram-hashtag-scraper", run_input, "instagram_hashtag")
+            if run is None:
+                raise RuntimeError("Failed to start the scraper. Please check your API token.")
+            return run, download_items(client, run, "instagram_hashtag")
+        
+        sharded = run_actor_shards(
+            run_hashtag,
+            hashtags,
+            max_concurrency,
+            describe=lambda tag, items: {
+                "hashtag": tag,
+                "limit": per_hashtag_limits.get(tag, results_limit),
+                "likes": sum(item.get('likesCount', 0) or 0 for item in items),
+            },
+            key=lambda item: item_key("instagram_hashtag", item) or id(item),
+            noun="hashtags"
+        )
+        if not sharded.get("success"):
+            return sharded
+        fetched = sharded["items"]
+        
+        unique = dedupe_batch("instagram_hashtag", fetched)
+        if not unique:
+            return {"error": "No results found. Please try with different hashtags."}
+        raw_results, new_flags = filter_seen("instagram_hashtag", unique, hide_seen)
+        if not raw_results:
+            return {"error": "No new posts since the last scrape."}
+        
+        with span("formatting", "instagram_hashtag"):
+            formatted_posts = format_hashtag_posts(raw_results, new_flags)
+        summary = hashtag_summary(raw_results, new_flags)
+        summary.update({
+            "run_id": sharded["run_id"],
+            "dataset_id": None,
+            "hashtags": sharded["shards"],
+            "duplicates_removed": len(fetched) - len(unique),
+            "wall_time_s": sharded["wall_time_s"],
+            "total_shard_time_s": sharded["total_shard_time_s"]
+        })
         
         return {
             "success": True,
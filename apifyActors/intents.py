@@ -0,0 +1,286 @@
+import json
+import re
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+    genai = None
+from apifyActors.instagram_hashtage import scrape_instagram_posts, scrape_instagram_hashtags_parallel
+from apifyActors.booking import scrape_booking, scrape_booking_batch
+from apifyActors.instagram import scrape_instagram_profile
+from apifyActors.tweet import scrape_tweets, scrape_tweets_incremental, scrape_tweets_sharded
+from apifyActors.website_content import scrape_website_content
+from apifyActors.google_maps import scrape_google_maps, scrape_google_maps_sharded
+from apifyActors.facebook import scrape_facebook_posts
+from apifyActors.google_news import scrape_google_news
+from apifyActors.trip_advisor import scrape_tripadvisor, scrape_tripadvisor_paginated, DEFAULT_TRIPADVISOR_URL, DEFAULT_PAGE_SIZE
+from apifyActors.search_index import search_scraped_content
+from apifyActors.metrics import span
+
+# Configure Gemini
+def configure_gemini(api_key):
+    """Configure Gemini with API key"""
+    if not GEMINI_AVAILABLE:
+        raise ImportError("google-generativeai package is not installed")
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-2.0-flash-exp')
+
+def extract_scraper_intent(user_message, model):
+    """Use Gemini to extract scraper intent from user message"""
+    
+    system_prompt = """
+    You are an AI assistant that helps users run web scrapers. Your job is to understand user requests and extract the appropriate scraper and parameters.
+    
+    Available scrapers:
+    1. instagram_hashtag - Scrape Instagram posts by hashtags
+    2. instagram_profile - Scrape Instagram profile posts
+    3. booking - Scrape Booking.com hotels
+    4. twitter - Scrape Twitter tweets
+    5. website_content - Scrape website content
+    6. google_maps - Scrape Google Maps places
+    7. facebook - Scrape Facebook page/profile posts
+    8. google_news - Scrape Google News articles for a query
+    9. tripadvisor - Scrape a TripAdvisor listing page (hotels, restaurants, attractions)
+    10. search_index - Search pages, Instagram captions and tweets that were already scraped (no new scraping), e.g. "which pages mention X"
+    
+    Return ONLY a JSON object with this exact structure:
+    {
+        "scraper": "scraper_name",
+        "parameters": {
+            "param1": "value1",
+            "param2": "value2"
+        },
+        "confidence": 0.95,
+        "explanation": "Brief explanation of what will be scraped"
+    }
+    
+    Parameter examples:
+    - instagram_hashtag: {"hashtags": ["goa", "travel"], "results_limit": 20, "per_hashtag_limits": {"travel": 50}} (with several hashtags, results_limit applies to each hashtag)
+    - instagram_profile: {"profile_urls": ["https://instagram.com/username"], "results_limit": 20}
+    - booking: {"search": "New York", "max_items": 10, "currency": "USD", "rooms": 1, "adults": 2, "children": 0, "min_max_price": "0-999999"}
+    - booking (several cities and/or dates compared): {"destinations": ["Paris", "Rome"], "date_ranges": [["2025-06-01", "2025-06-03"]], "max_items": 10, "currency": "EUR", "adults": 2}
+    - twitter: {"start_urls": ["https://twitter.com/apify"], "search_terms": ["web scraping"], "twitter_handles": ["elonmusk"], "max_items": 20}
+    - website_content: {"start_urls": ["https://docs.apify.com"], "results_limit": 10, "save_markdown": true}
+    - google_maps: {"search_strings": ["restaurant"], "location_query": "New York, USA", "max_places": 20}
+    - facebook: {"profile_urls": ["https://www.facebook.com/humansofnewyork/"], "results_limit": 20}
+    - google_news: {"query": "Tesla", "language": "US:en", "max_items": 50}
+    - tripadvisor: {"url": "https://www.tripadvisor.com/Hotels-g187147-Paris_Ile_de_France-Hotels.html", "count": 30}
+    - search_index: {"query": "\"web scraping\" python", "sources": ["website"], "limit": 10} (sources: website, instagram, twitter, facebook, news; omit for all)
+    
+    For website_content, add "monitor": true when the user wants to check docs/news pages for changes (only new or changed pages since the last crawl).
+    For twitter, add "incremental": true when the user wants to refresh / update / get the latest tweets since the last time.
+    For large historical twitter pulls over a date range, add "start" and "end" (YYYY-MM-DD) and "shards" (number of parallel runs, e.g. 4).
+    For google_maps surveys across several neighborhoods or districts, add "sub_areas": ["Manhattan, New York, USA", "Brooklyn, New York, USA"] (one parallel run per search term and sub-area).
+    For instagram_hashtag, instagram_profile, twitter and google_maps, add "hide_seen": true when the user only wants new items not seen in earlier scrapes (e.g. "what's new", "only new posts").
+    
+    If the user's request doesn't match any scraper, return:
+    {
+        "scraper": "none",
+        "parameters": {},
+        "confidence": 0.0,
+        "explanation": "I couldn't understand which scraper you want to use. Please be more specific."
+    }
+    """
+    
+    try:
+        with span("intent_extraction"):
+            response = model.generate_content(f"{system_prompt}\n\nUser request: {user_message}")
+        # Extract JSON from response
+        json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        else:
+            return {
+                "scraper": "none",
+                "parameters": {},
+                "confidence": 0.0,
+                "explanation": "I couldn't parse the response properly."
+            }
+    except Exception as e:
+        return {
+            "scraper": "none",
+            "parameters": {},
+            "confidence": 0.0,
+            "explanation": f"Error processing request: {str(e)}"
+        }
+
+def _int_param(parameters, name, default):
+    """An integer parameter; Gemini and job files may send numbers as strings (or junk)"""
+    try:
+        return int(parameters.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+def run_scraper_from_intent(intent, api_token):
+    """Run the appropriate scraper based on extracted intent"""
+    
+    scraper = intent.get("scraper")
+    parameters = intent.get("parameters", {})
+    
+    with span("scraper_total", scraper):
+        if scraper == "instagram_hashtag":
+            hashtags = parameters.get("hashtags", [])
+            results_limit = parameters.get("results_limit", 20)
+            if len(hashtags) > 1:
+                # One concurrent run per hashtag, each with its own limit
+                return scrape_instagram_hashtags_parallel(
+                    api_token,
+                    hashtags,
+                    results_limit,
+                    per_hashtag_limits=parameters.get("per_hashtag_limits"),
+                    hide_seen=parameters.get("hide_seen", False)
+                )
+            return scrape_instagram_posts(api_token, hashtags, results_limit, hide_seen=parameters.get("hide_seen", False))
+    
+        elif scraper == "instagram_profile":
+            profile_urls = parameters.get("profile_urls", [])
+            results_limit = parameters.get("results_limit", 20)
+            return scrape_instagram_profile(profile_urls, results_limit, api_token, hide_seen=parameters.get("hide_seen", False))
+    
+        elif scraper == "booking" and (len(parameters.get("destinations", [])) > 1 or parameters.get("date_ranges")):
+            return scrape_booking_batch(
+                destinations=parameters.get("destinations") or [parameters.get("search", "New York")],
+                date_ranges=[tuple(pair) for pair in parameters.get("date_ranges", []) if len(pair) == 2],
+                guest_options=[{"adults": parameters.get("adults", 2), "children": parameters.get("children", 0), "rooms": parameters.get("rooms", 1)}],
+                max_items=parameters.get("max_items", 10),
+                currency=parameters.get("currency", "USD"),
+                min_max_price=parameters.get("min_max_price", "0-999999"),
+                api_token=api_token
+            )
+    
+        elif scraper == "booking":
+            # A single destination is an ordinary search
+            destinations = parameters.get("destinations") or [parameters.get("search", "New York")]
+            return scrape_booking(
+                search=destinations[0],
+                max_items=parameters.get("max_items", 10),
+                currency=parameters.get("currency", "USD"),
+                rooms=parameters.get("rooms", 1),
+                adults=parameters.get("adults", 2),
+                children=parameters.get("children", 0),
+                min_max_price=parameters.get("min_max_price", "0-999999"),
+                api_token=api_token
+            )
+    
+        elif scraper == "twitter" and parameters.get("start") and parameters.get("end") and _int_param(parameters, "shards", 1) > 1:
+            return scrape_tweets_sharded(
+                start=parameters["start"],
+                end=parameters["end"],
+                shards=_int_param(parameters, "shards", 1),
+                start_urls=parameters.get("start_urls", []),
+                search_terms=parameters.get("search_terms", []),
+                twitter_handles=parameters.get("twitter_handles", []),
+                max_items=parameters.get("max_items", 1000),
+                api_token=api_token
+            )
+    
+        elif scraper == "twitter" and parameters.get("incremental"):
+            return scrape_tweets_incremental(
+                start_urls=parameters.get("start_urls", []),
+                search_terms=parameters.get("search_terms", []),
+                twitter_handles=parameters.get("twitter_handles", []),
+                max_items=parameters.get("max_items", 20),
+                api_token=api_token
+            )
+    
+        elif scraper == "twitter":
+            return scrape_tweets(
+                start_urls=parameters.get("start_urls", []),
+                search_terms=parameters.get("search_terms", []),
+                twitter_handles=parameters.get("twitter_handles", []),
+                max_items=parameters.get("max_items", 20),
+                api_token=api_token,
+                hide_seen=parameters.get("hide_seen", False)
+            )
+    
+        elif scraper == "website_content":
+            return scrape_website_content(
+                start_urls=parameters.get("start_urls", []),
+                results_limit=parameters.get("results_limit", 10),
+                save_markdown=parameters.get("save_markdown", True),
+                api_token=api_token,
+                monitor=parameters.get("monitor", False)
+            )
+    
+        elif scraper == "facebook":
+            return scrape_facebook_posts(
+                profile_urls=parameters.get("profile_urls", []),
+                results_limit=parameters.get("results_limit", 20),
+                api_token=api_token
+            )
+    
+        elif scraper == "google_news":
+            return scrape_google_news(
+                query=parameters.get("query", "Tesla"),
+                language=parameters.get("language", "US:en"),
+                max_items=parameters.get("max_items", 50),
+                api_token=api_token
+            )
+    
+        elif scraper == "tripadvisor":
+            count = _int_param(parameters, "count", 30)
+            if count > DEFAULT_PAGE_SIZE:
+                # Large pulls run as parallel offset pages
+                return scrape_tripadvisor_paginated(
+                    url=parameters.get("url", DEFAULT_TRIPADVISOR_URL),
+                    count=count,
+                    api_token=api_token
+                )
+            return scrape_tripadvisor(
+                url=parameters.get("url", DEFAULT_TRIPADVISOR_URL),
+                count=count,
+                api_token=api_token
+            )
+    
+        elif scraper == "search_index":
+            return search_scraped_content(
+                query=parameters.get("query", ""),
+                sources=parameters.get("sources") or None,
+                limit=parameters.get("limit", 10)
+            )
+    
+        elif scraper == "google_maps" and parameters.get("sub_areas"):
+            return scrape_google_maps_sharded(
+                search_strings=parameters.get("search_strings", []),
+                location_query=parameters.get("location_query", "New York, USA"),
+                sub_areas=parameters["sub_areas"],
+                max_places=parameters.get("max_places", 20),
+                api_token=api_token,
+                hide_seen=parameters.get("hide_seen", False)
+            )
+    
+        elif scraper == "google_maps":
+            return scrape_google_maps(
+                search_strings=parameters.get("search_strings", []),
+                location_query=parameters.get("location_query", "New York, USA"),
+                max_places=parameters.get("max_places", 20),
+                api_token=api_token,
+                hide_seen=parameters.get("hide_seen", False)
+            )
+    
+        else:
+            return {"success": False, "error": "Unknown scraper type"}
+
+# Key holding the formatted records in each scraper's results dict
+RESULT_KEYS = {
+    "instagram_hashtag": "posts",
+    "instagram_profile": "posts",
+    "booking": "hotels",
+    "twitter": "tweets",
+    "website_content": "pages",
+    "google_maps": "places",
+    "facebook": "posts",
+    "google_news": "articles",
+    "tripadvisor": "listings",
+    "search_index": "hits",
+}
+
+def result_items(results, scraper, raw=False):
+    """
+    Items to export from a successful scraper result: the raw actor items, or the formatted
+    records without their 'raw_data' copy of the raw item.
+    """
+    if raw:
+        return results.get("raw_results") or []
+    return [{key: value for key, value in record.items() if key != "raw_data"} for record in results.get(RESULT_KEYS[scraper]) or []]
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+# Histogram bucket upper bounds (seconds), Prometheus style
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RECENT_LIMIT = int(os.environ.get("SCRAPER_METRICS_RECENT", "50"))
+METRICS_FILE = os.environ.get("SCRAPER_METRICS_FILE", os.path.join(".scraper_data", "metrics.prom"))
+
+_lock = threading.Lock()
+_histograms = {}
+_recent = deque(maxlen=RECENT_LIMIT)
+_current_request = ContextVar("scraper_request", default=None)
+
+
+def observe(stage, seconds, source=""):
+    """
+    Record one stage duration in the histograms and in the active request (if any).
+    Args:
+        stage (str): Pipeline stage, e.g. "actor_run" or "render"
+        seconds (float): Measured duration
+        source (str): Scraper name the stage belongs to
+    """
+    key = (stage, source or "")
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+        for idx, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][idx] += 1
+        hist["sum"] += seconds
+        hist["count"] += 1
+        request = _current_request.get()
+        if request is not None:
+            request["stages"][stage] = request["stages"].get(stage, 0.0) + seconds
+
+
+@contextmanager
+def span(stage, source=""):
+    """Time the wrapped block and record it as `stage`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, source)
+
+
+@contextmanager
+def request_trace(label):
+    """
+    Group all spans recorded inside the block into one request entry.
+    The yielded dict can be updated (e.g. the label once the scraper is known).
+    """
+    request = {
+        "id": uuid.uuid4().hex[:8],
+        "label": label,
+        "started": datetime.now(),
+        "stages": {},
+        "total": 0.0,
+    }
+    token = _current_request.set(request)
+    start = time.perf_counter()
+    try:
+        yield request
+    finally:
+        request["total"] = time.perf_counter() - start
+        _current_request.reset(token)
+        observe("request", request["total"], request["label"])
+        with _lock:
+            _recent.append(request)
+        write_prometheus()
+
+
+def recent_requests(limit=None):
+    """Return the most recent traced requests, newest first"""
+    with _lock:
+        requests = list(_recent)[::-1]
+    return requests[:limit] if limit else requests
+
+
+def _quantile(hist, q):
+    """Estimate a quantile from cumulative histogram buckets (linear interpolation)"""
+    if not hist["count"]:
+        return None
+    rank = q * hist["count"]
+    prev_bound, prev_count = 0.0, 0
+    for bound, count in zip(BUCKETS, hist["buckets"]):
+        if count >= rank:
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return BUCKETS[-1]
+
+
+def stage_summary():
+    """Aggregate view of the histograms: count, mean, p50 and p95 per stage/source"""
+    with _lock:
+        items = [(key, dict(hist, buckets=list(hist["buckets"]))) for key, hist in _histograms.items()]
+    summary = []
+    for (stage, source), hist in sorted(items):
+        summary.append({
+            "stage": stage,
+            "source": source,
+            "count": hist["count"],
+            "mean_s": hist["sum"] / hist["count"] if hist["count"] else 0.0,
+            "p50_s": _quantile(hist, 0.5),
+            "p95_s": _quantile(hist, 0.95),
+        })
+    return summary
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Render all stage histograms in the Prometheus text exposition format"""
+    name = "scraper_stage_duration_seconds"
+    lines = [
+        f"# HELP {name} Time spent in each scraper pipeline stage.",
+        f"# TYPE {name} histogram",
+    ]
+    with _lock:
+        items = sorted((key, dict(hist, buckets=list(hist["buckets"]))) for key, hist in _histograms.items())
+    for (stage, source), hist in items:
+        labels = f'stage="{_escape(stage)}",source="{_escape(source)}"'
+        for bound, count in zip(BUCKETS, hist["buckets"]):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist["count"]}')
+        lines.append(f"{name}_sum{{{labels}}} {hist['sum']:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path=None):
+    """
+    Write the exposition text to a file (e.g. for node_exporter's textfile collector).
+    Returns the path written, or None if the file could not be written.
+    """
+    path = path or METRICS_FILE
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(prometheus_text())
+        os.replace(tmp_path, path)
+        return path
+    except OSError:
+        return None
@@ -0,0 +1,147 @@
+import difflib
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timezone
+from apifyActors.blob_store import get_text, item_body, put_text
+
+MONITOR_DB = os.environ.get("SCRAPER_MONITOR_DB", os.path.join(".scraper_data", "page_monitor.sqlite"))
+MAX_DIFF_LINES = int(os.environ.get("SCRAPER_MONITOR_MAX_DIFF_LINES", "2000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_versions (
+    url TEXT PRIMARY KEY,
+    content_hash BLOB NOT NULL,
+    text_hash TEXT,
+    version INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_changed TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS page_diffs (
+    url TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    changed_at TEXT NOT NULL,
+    added_lines INTEGER NOT NULL,
+    removed_lines INTEGER NOT NULL,
+    diff TEXT NOT NULL,
+    PRIMARY KEY (url, version)
+) WITHOUT ROWID;
+"""
+
+
+def normalize_content(text):
+    """Strip trailing whitespace and repeated blank lines so re-renders don't count as changes"""
+    lines = [line.rstrip() for line in (text or "").splitlines()]
+    normalized = []
+    for line in lines:
+        if line or (normalized and normalized[-1]):
+            normalized.append(line)
+    return "\n".join(normalized).strip()
+
+
+def page_content(item):
+    """The monitored content of a raw website page: markdown if present, else text"""
+    return normalize_content(item_body(item, "markdown") or item_body(item, "text"))
+
+
+def _diff(old, new, url):
+    lines = list(difflib.unified_diff(old.splitlines(), new.splitlines(), "previous", "current", n=1, lineterm=""))
+    added = sum(1 for line in lines if line.startswith("+") and not line.startswith("+++"))
+    removed = sum(1 for line in lines if line.startswith("-") and not line.startswith("---"))
+    if len(lines) > MAX_DIFF_LINES:
+        lines = lines[:MAX_DIFF_LINES] + [f"... ({len(lines) - MAX_DIFF_LINES} more diff lines of {url} not stored)"]
+    return "\n".join(lines), added, removed
+
+
+def connect(db_path=None):
+    db_path = db_path or MONITOR_DB
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def detect_changes(items, db_path=None, record=True):
+    """
+    Compare crawled pages with the last crawl of the same URLs and record the new state.
+    Only the latest content of each URL is kept, in the blob store; earlier versions survive
+    as unified diffs.
+    Args:
+        items (list): Raw website pages (with 'url' and 'markdown'/'text')
+        record (bool): Store the new state; with False the stored state is only read
+    Returns:
+        list: One {'status', 'version', 'added_lines', 'removed_lines', 'diff', 'last_changed'}
+              per item, status being "new", "changed" or "unchanged"
+    """
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    statuses = []
+    conn = connect(db_path)
+    try:
+        with conn:
+            for item in items:
+                url = item.get("url")
+                if not url:
+                    statuses.append({"status": "new", "version": 1, "added_lines": 0, "removed_lines": 0, "diff": "", "last_changed": now})
+                    continue
+                content = page_content(item)
+                content_hash = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+                row = conn.execute(
+                    "SELECT content_hash, text_hash, version, last_changed FROM page_versions WHERE url = ?", (url,)
+                ).fetchone()
+                if row is None:
+                    if record:
+                        conn.execute(
+                            "INSERT INTO page_versions (url, content_hash, text_hash, version, first_seen, last_changed, last_seen) VALUES (?, ?, ?, 1, ?, ?, ?)",
+                            (url, content_hash, put_text(content), now, now, now),
+                        )
+                    statuses.append({"status": "new", "version": 1, "added_lines": 0, "removed_lines": 0, "diff": "", "last_changed": now})
+                elif row[0] == content_hash:
+                    if record:
+                        conn.execute("UPDATE page_versions SET last_seen = ? WHERE url = ?", (now, url))
+                    statuses.append({"status": "unchanged", "version": row[2], "added_lines": 0, "removed_lines": 0, "diff": "", "last_changed": row[3]})
+                else:
+                    diff, added, removed = _diff(get_text(row[1]) or "", content, url)
+                    version = row[2] + 1
+                    if record:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO page_diffs (url, version, changed_at, added_lines, removed_lines, diff) VALUES (?, ?, ?, ?, ?, ?)",
+                            (url, version, now, added, removed, diff),
+                        )
+                        conn.execute(
+                            "UPDATE page_versions SET content_hash = ?, text_hash = ?, version = ?, last_changed = ?, last_seen = ? WHERE url = ?",
+                            (content_hash, put_text(content), version, now, now, url),
+                        )
+                    statuses.append({"status": "changed", "version": version, "added_lines": added, "removed_lines": removed, "diff": diff, "last_changed": now})
+    finally:
+        conn.close()
+    return statuses
+
+
+def page_history(url, db_path=None):
+    """Return the stored diffs of one URL, newest first"""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT version, changed_at, added_lines, removed_lines, diff FROM page_diffs WHERE url = ? ORDER BY version DESC", (url,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(["version", "changed_at", "added_lines", "removed_lines", "diff"], row)) for row in rows]
+
+
+def recent_changes(limit=50, db_path=None):
+    """Return the most recent page changes across all monitored URLs"""
+    db_path = db_path or MONITOR_DB
+    if not os.path.exists(db_path):
+        return []
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT url, version, changed_at, added_lines, removed_lines FROM page_diffs ORDER BY changed_at DESC, url LIMIT ?", (limit,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(["url", "version", "changed_at", "added_lines", "removed_lines"], row)) for row in rows]
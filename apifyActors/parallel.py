@@ -0,0 +1,97 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+def _timed(task, shard):
+    start = time.perf_counter()
+    try:
+        return {"result": task(shard), "error": None, "elapsed_s": time.perf_counter() - start}
+    except Exception as e:
+        return {"result": None, "error": str(e), "elapsed_s": time.perf_counter() - start}
+
+
+def run_shards(task, shards, max_concurrency=DEFAULT_MAX_CONCURRENCY, on_done=None):
+    """
+    Run task(shard) for every shard on a bounded thread pool.
+    Actor runs spend their time waiting on Apify, so threads are enough to overlap them.
+    Each worker runs in a copy of the caller's context, so metric spans still land in the
+    active request trace.
+    Args:
+        task (callable): Function taking one shard
+        shards (list): Shard descriptions (any objects)
+        max_concurrency (int): Maximum number of shards running at the same time
+        on_done (callable): Optional callback(shard, outcome) as each shard finishes
+    Returns:
+        list: One {'shard', 'result', 'error', 'elapsed_s'} dict per shard, in input order
+    """
+    shards = list(shards)
+    outcomes = [None] * len(shards)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(shards) or 1))) as executor:
+        futures = {
+            executor.submit(copy_context().run, _timed, task, shard): idx
+            for idx, shard in enumerate(shards)
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            outcome = dict(future.result(), shard=shards[idx])
+            outcomes[idx] = outcome
+            if on_done is not None:
+                on_done(shards[idx], outcome)
+    return outcomes
+
+
+def run_actor_shards(run_shard, shards, max_concurrency=DEFAULT_MAX_CONCURRENCY, describe=None, key=None, noun="shards", on_done=None):
+    """
+    Run one actor call per shard on run_shards and merge what the shards returned.
+    Args:
+        run_shard (callable): Function taking one shard and returning (run, items)
+        shards (list): Shard descriptions
+        max_concurrency (int): Maximum number of actor runs at the same time
+        describe (callable): Optional describe(shard, items) -> leading columns of the shard's stats row
+        key (callable): Optional key(item) -> identity; adds unique_new / overlap / overlap_pct
+                        (items an earlier shard already returned) to the stats rows
+        noun (str): What the shards are, for the error when all of them failed
+        on_done (callable): Passed on to run_shards
+    Returns:
+        dict: {success, items (all shards' items in shard order), shards (one stats row per
+               shard), run_id, wall_time_s, total_shard_time_s} or {error} if every shard failed
+    """
+    wall_start = time.perf_counter()
+    outcomes = run_shards(run_shard, shards, max_concurrency, on_done)
+    wall_time = time.perf_counter() - wall_start
+    if all(outcome["error"] for outcome in outcomes):
+        return {"error": f"All {noun} failed: {outcomes[0]['error'] if outcomes else 'nothing to run'}"}
+    items = []
+    stats = []
+    seen_keys = set()
+    for outcome in outcomes:
+        run, shard_items = outcome["result"] or (None, [])
+        row = dict(describe(outcome["shard"], shard_items)) if describe is not None else {"shard": str(outcome["shard"])}
+        row["items"] = len(shard_items)
+        if key is not None:
+            keys = {key(item) for item in shard_items}
+            overlap = len(keys & seen_keys)
+            seen_keys |= keys
+            row.update({
+                "unique_new": len(keys) - overlap,
+                "overlap": overlap,
+                "overlap_pct": round(100 * overlap / len(keys), 1) if keys else 0.0,
+            })
+        row.update({
+            "elapsed_s": round(outcome["elapsed_s"], 2),
+            "run_id": run.get('id') if run else None,
+            "error": outcome["error"],
+        })
+        items.extend(shard_items)
+        stats.append(row)
+    return {
+        "success": True,
+        "items": items,
+        "shards": stats,
+        "run_id": ",".join(row["run_id"] for row in stats if row["run_id"]),
+        "wall_time_s": round(wall_time, 2),
+        "total_shard_time_s": round(sum(outcome["elapsed_s"] for outcome in outcomes), 2)
+    }
@@ -0,0 +1,188 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+PROFILE_ENV = "SCRAPER_PROFILE"
+PROFILE_DIR = os.environ.get("SCRAPER_PROFILE_DIR", os.path.join(".scraper_data", "profiles"))
+KEEP_SLOWEST = int(os.environ.get("SCRAPER_PROFILE_KEEP", "10"))
+SAMPLE_INTERVAL = float(os.environ.get("SCRAPER_PROFILE_INTERVAL", "0.005"))
+# Safety net: a sampler whose rerun never reached finish_rerun_profile stops by itself
+MAX_SAMPLE_SECONDS = 600
+MODES = ("sample", "cprofile")
+
+_lock = threading.Lock()
+
+
+class _StackSampler(threading.Thread):
+    """Periodically snapshots the stack of one thread into collapsed-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True, name="rerun-profile-sampler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        deadline = time.monotonic() + MAX_SAMPLE_SECONDS
+        while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def resolve_mode(query_value=None):
+    """
+    Decide whether this rerun should be profiled.
+    The query parameter (e.g. ?profile=cprofile) wins over the SCRAPER_PROFILE env var.
+    "1"/"true"/"on" mean the default sampling profiler.
+    Returns: "sample", "cprofile" or None
+    """
+    value = query_value if query_value else os.environ.get(PROFILE_ENV, "")
+    value = str(value).strip().lower()
+    if value in ("1", "true", "on", "yes"):
+        return "sample"
+    return value if value in MODES else None
+
+
+def start_rerun_profile(mode, label="rerun"):
+    """
+    Start profiling the current script run (call at the top of app.py and pair it with
+    finish_rerun_profile in a finally block, so st.rerun / st.stop / errors still stop it).
+    Returns: a profile handle for finish_rerun_profile, or None when disabled or when
+    cProfile is already in use by another rerun
+    """
+    if mode not in MODES:
+        return None
+    thread_id = threading.get_ident()
+    handle = {
+        "id": datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6],
+        "label": label,
+        "mode": mode,
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "thread_id": thread_id,
+        "start": time.perf_counter(),
+        "sampler": None,
+        "profiler": None,
+    }
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one cProfile per process; another session's rerun holds it
+            return None
+        handle["profiler"] = profiler
+    else:
+        handle["sampler"] = _StackSampler(thread_id, SAMPLE_INTERVAL)
+        handle["sampler"].start()
+    return handle
+
+
+def _stop(handle):
+    if handle["profiler"] is not None:
+        handle["profiler"].disable()
+    if handle["sampler"] is not None:
+        handle["sampler"].stop()
+
+
+def _write_sample_outputs(handle, base_path):
+    stacks = handle["sampler"].stacks
+    with open(f"{base_path}.collapsed", "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    self_counts = Counter()
+    for stack, count in stacks.items():
+        self_counts[stack.rsplit(";", 1)[-1]] += count
+    total = sum(stacks.values()) or 1
+    with open(f"{base_path}.txt", "w", encoding="utf-8") as f:
+        f.write(f"{total} samples every {SAMPLE_INTERVAL * 1000:.1f} ms\n\n")
+        for frame, count in self_counts.most_common(40):
+            f.write(f"{count / total:6.1%}  {count:6d}  {frame}\n")
+    return [f"{base_path}.collapsed", f"{base_path}.txt"]
+
+
+def _write_cprofile_outputs(handle, base_path):
+    profiler = handle["profiler"]
+    profiler.dump_stats(f"{base_path}.prof")
+    buffer = io.StringIO()
+    pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(60)
+    with open(f"{base_path}.txt", "w", encoding="utf-8") as f:
+        f.write(buffer.getvalue())
+    return [f"{base_path}.prof", f"{base_path}.txt"]
+
+
+def _load_index(profile_dir):
+    try:
+        with open(os.path.join(profile_dir, "index.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def finish_rerun_profile(handle, label=None):
+    """
+    Stop profiling, write the outputs and keep only the slowest reruns on disk.
+    Sampling mode writes <id>.collapsed (flamegraph.pl / speedscope input) and a text summary,
+    cprofile mode writes <id>.prof (pstats / snakeviz) and a text summary.
+    Returns: the index entry of this rerun, or None if it was not kept
+    """
+    if handle is None:
+        return None
+    _stop(handle)
+    duration = time.perf_counter() - handle["start"]
+    entry = {
+        "id": handle["id"],
+        "label": label or handle["label"],
+        "mode": handle["mode"],
+        "started": handle["started"],
+        "duration_s": round(duration, 4),
+    }
+    with _lock:
+        index = _load_index(PROFILE_DIR)
+        slowest = sorted(index, key=lambda e: e["duration_s"], reverse=True)[:KEEP_SLOWEST]
+        if len(slowest) >= KEEP_SLOWEST and duration <= slowest[-1]["duration_s"]:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base_path = os.path.join(PROFILE_DIR, handle["id"])
+        if handle["mode"] == "cprofile":
+            entry["files"] = _write_cprofile_outputs(handle, base_path)
+        else:
+            entry["files"] = _write_sample_outputs(handle, base_path)
+        index = sorted(index + [entry], key=lambda e: e["duration_s"], reverse=True)
+        for evicted in index[KEEP_SLOWEST:]:
+            for path in evicted.get("files", []):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        index = index[:KEEP_SLOWEST]
+        tmp_path = os.path.join(PROFILE_DIR, "index.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, os.path.join(PROFILE_DIR, "index.json"))
+    return entry
+
+
+def slowest_reruns():
+    """Return the retained profiled reruns, slowest first"""
+    with _lock:
+        return _load_index(PROFILE_DIR)
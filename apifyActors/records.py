@@ -0,0 +1,402 @@
+import re
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from apifyActors.tweet_history import parse_tweet_time
+
+# Shared value coercion for typed scraper records
+
+_SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9}
+
+
+def to_float(value):
+    """Parse numbers like 12, "4.5", "1,234" or "1.2K"; None when missing or unparseable"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace(",", "")
+    if not text or text == "N/A":
+        return None
+    multiplier = _SUFFIXES.get(text[-1].upper())
+    if multiplier:
+        text = text[:-1]
+    try:
+        return float(text) * (multiplier or 1)
+    except ValueError:
+        return None
+
+
+def to_int(value, default=0):
+    """Integer version of to_float (default when missing)"""
+    number = to_float(value)
+    return int(number) if number is not None else default
+
+
+def to_iso(value):
+    """
+    Normalize epoch seconds/milliseconds, ISO 8601 or RFC 2822 dates (as in RSS feeds) to
+    'YYYY-MM-DDTHH:MM:SSZ' (UTC); None when missing or unparseable (e.g. "2 hours ago")
+    """
+    if value in (None, ""):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            moment = datetime.fromtimestamp(value / 1000 if value > 1e11 else value, tz=timezone.utc)
+        else:
+            text = str(value).strip()
+            try:
+                moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            except ValueError:
+                moment = parsedate_to_datetime(text)
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+        return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+# Currency symbols/prefixes as they appear in scraped price strings, longest first
+CURRENCY_SYMBOLS = [
+    ("US$", "USD"), ("CA$", "CAD"), ("C$", "CAD"), ("A$", "AUD"), ("AU$", "AUD"), ("NZ$", "NZD"),
+    ("HK$", "HKD"), ("S$", "SGD"), ("R$", "BRL"), ("MX$", "MXN"), ("CHF", "CHF"), ("zł", "PLN"),
+    ("Kč", "CZK"), ("kr", "SEK"), ("€", "EUR"), ("£", "GBP"), ("¥", "JPY"), ("₹", "INR"),
+    ("₩", "KRW"), ("₺", "TRY"), ("₪", "ILS"), ("฿", "THB"), ("₫", "VND"), ("$", "USD"),
+]
+# Symbols whose default code above is only a guess (kr: SEK, DKK, NOK or ISK)
+AMBIGUOUS_SYMBOLS = ("$", "kr")
+_CODE_RE = re.compile(r"\b([A-Z]{3})\b")
+_NUMBER_RE = re.compile(r"\d[\d.,\s  ']*")
+
+
+def _parse_amount(text):
+    """Parse '1,234.50', '1.234,50', '1 234' or "1'234" into a float"""
+    digits = re.sub(r"[\s  ']", "", text).rstrip(".,")
+    if "," in digits and "." in digits:
+        # Whichever separator comes last is the decimal one
+        if digits.rfind(",") > digits.rfind("."):
+            digits = digits.replace(".", "").replace(",", ".")
+        else:
+            digits = digits.replace(",", "")
+    elif "," in digits:
+        head, _, tail = digits.rpartition(",")
+        digits = f"{head.replace(',', '')}.{tail}" if len(tail) != 3 else digits.replace(",", "")
+    elif digits.count(".") > 1 or (digits.count(".") == 1 and len(digits.rpartition(".")[2]) == 3):
+        digits = digits.replace(".", "")
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+def parse_price(value, currency=None):
+    """
+    Split a scraped price into (amount, ISO currency code).
+    Accepts numbers, strings such as "US$1,234", "€ 99,50" or "1.299 EUR", and
+    {"value"/"amount", "currency"} dicts. currency is the code the value is known to be in,
+    used when the value itself names none. Returns (None, code) when there is no number.
+    """
+    if isinstance(value, dict):
+        currency = value.get("currency") or currency
+        value = value.get("value", value.get("amount"))
+    code = currency.strip().upper() if isinstance(currency, str) and currency.strip() else None
+    if value is None or isinstance(value, bool):
+        return None, code
+    if isinstance(value, (int, float)):
+        return float(value), code
+    text = str(value).strip()
+    match = _CODE_RE.search(text)
+    if match:
+        code = match.group(1)
+    else:
+        for symbol, symbol_code in CURRENCY_SYMBOLS:
+            if symbol in text:
+                # "$" and "kr" are shared by several currencies; a known code wins
+                code = code if symbol in AMBIGUOUS_SYMBOLS and code else symbol_code
+                break
+    number = _NUMBER_RE.search(text)
+    return (_parse_amount(number.group(0)) if number else None), code
+
+
+
+class lazy_field:
+    """Derived record field computed on first access and kept in the record's '_<name>' slot"""
+
+    def __init__(self, func):
+        self.func = func
+        self.slot = "_" + func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, record, owner=None):
+        if record is None:
+            return self
+        try:
+            return getattr(record, self.slot)
+        except AttributeError:
+            value = self.func(record)
+            setattr(record, self.slot, value)
+            return value
+
+
+class Record(Mapping):
+    """
+    Base of the compact formatted-record types.
+    Stored fields live in __slots__ instead of a per-record dict, derived fields (KEYS not
+    in FIELDS) are lazy_fields computed from raw_data on access. Records are mappings, so
+    record["likes"], record.get(...), dict(record) and pandas.DataFrame(records) work as
+    they did with plain dicts; stored fields can also be reassigned with record[key] = value.
+    """
+    __slots__ = ()
+    # Stored fields, in constructor order
+    FIELDS = ()
+    # All keys (stored and derived) in display / DataFrame column order
+    KEYS = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(f"{type(self).__name__} has no stored field {key!r}")
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        shown = ", ".join(f"{key}={self[key]!r}" for key in self.KEYS if key != "raw_data")
+        return f"{type(self).__name__}({shown})"
+
+    def to_dict(self):
+        """Plain dict copy (e.g. for JSON encoding)"""
+        return {key: self[key] for key in self.KEYS}
+
+
+def _hashtag_text(tags):
+    return " ".join(f"#{tag}" for tag in tags) if tags else ""
+
+
+class InstagramPost(Record):
+    """Formatted Instagram post (hashtag and profile scrapers)"""
+    FIELDS = ("post_number", "username", "full_name", "caption", "likes", "comments", "shares",
+              "views", "post_url", "media_type", "image_url", "video_url", "is_new", "raw_data")
+    KEYS = ("post_number", "username", "full_name", "posted_date", "caption", "likes", "comments",
+            "shares", "views", "hashtags", "post_url", "media_type", "image_url", "video_url",
+            "is_new", "raw_data")
+    __slots__ = FIELDS + ("_posted_date", "_hashtags")
+
+    @classmethod
+    def from_raw(cls, post, idx, is_new=False):
+        return cls(
+            idx,
+            post.get('ownerUsername', 'Unknown'),
+            post.get('ownerFullName', ''),
+            post.get('caption', ''),
+            post.get('likesCount', 0),
+            post.get('commentsCount', 0),
+            post.get('sharesCount', 0),
+            post.get('videoViewCount', 0),
+            post.get('url', ''),
+            post.get('mediaType', ''),
+            post.get('imageUrl') or post.get('displayUrl', ''),
+            post.get('videoUrl', ''),
+            is_new,
+            post,
+        )
+
+    @lazy_field
+    def posted_date(self):
+        timestamp = self.raw_data.get('timestamp')
+        if timestamp and isinstance(timestamp, (int, float)):
+            try:
+                return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            except (OverflowError, OSError, ValueError):
+                return str(timestamp)
+        return "Unknown"
+
+    @lazy_field
+    def hashtags(self):
+        return _hashtag_text(self.raw_data.get('hashtags'))
+
+
+class Tweet(Record):
+    """Formatted tweet"""
+    FIELDS = ("tweet_number", "id", "text", "author", "author_name", "retweets", "likes",
+              "replies", "url", "lang", "is_new", "raw_data")
+    KEYS = ("tweet_number", "id", "text", "author", "author_name", "created_at", "retweets",
+            "likes", "replies", "url", "lang", "hashtags", "mentions", "media", "is_new", "raw_data")
+    __slots__ = FIELDS + ("_created_at",)
+
+    @classmethod
+    def from_raw(cls, item, idx, is_new=False):
+        author = item.get("author") or {}
+        return cls(
+            idx,
+            item.get("id", ""),
+            item.get("fullText", ""),
+            author.get("username", ""),
+            author.get("name", ""),
+            item.get("retweetCount", 0),
+            item.get("favoriteCount", 0),
+            item.get("replyCount", 0),
+            item.get("url", ""),
+            item.get("lang", ""),
+            is_new,
+            item,
+        )
+
+    @lazy_field
+    def created_at(self):
+        created_at = self.raw_data.get('createdAt')
+        if not created_at:
+            return "Unknown"
+        moment = parse_tweet_time(created_at)
+        return moment.strftime('%Y-%m-%d %H:%M:%S') if moment else str(created_at)
+
+    # Lists straight from the raw item; nothing to store
+    @property
+    def hashtags(self):
+        return self.raw_data.get("hashtags", [])
+
+    @property
+    def mentions(self):
+        return self.raw_data.get("userMentions", [])
+
+    @property
+    def media(self):
+        return self.raw_data.get("media", [])
+
+
+class Hotel(Record):
+    """Formatted Booking.com hotel; price_value / price_currency are parsed once on creation"""
+    FIELDS = ("hotel_number", "search", "check_in", "check_out", "adults", "children", "rooms",
+              "name", "address", "city", "country", "price", "currency", "price_value",
+              "price_currency", "stars", "review_score", "review_count", "url", "image", "raw_data")
+    KEYS = FIELDS
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_raw(cls, item, idx, currency="USD", search=""):
+        price_value, price_currency = parse_price(item.get("price"), item.get("currency") or currency)
+        return cls(
+            idx,
+            item.get("search", search),
+            item.get("checkIn"),
+            item.get("checkOut"),
+            item.get("adults"),
+            item.get("children"),
+            item.get("rooms"),
+            item.get("name", "Unknown"),
+            item.get("address", ""),
+            item.get("city", ""),
+            item.get("country", ""),
+            item.get("price", "N/A"),
+            item.get("currency", ""),
+            price_value,
+            price_currency,
+            item.get("stars", "N/A"),
+            item.get("reviewScore", "N/A"),
+            item.get("reviewCount", "N/A"),
+            item.get("url", ""),
+            item.get("mainPhotoUrl", ""),
+            item,
+        )
+
+
+class Place(Record):
+    """Formatted Google Maps place"""
+    FIELDS = ("place_number", "name", "address", "category", "rating", "reviews", "url",
+              "website", "phone", "is_new", "raw_data")
+    KEYS = FIELDS
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_raw(cls, item, idx, is_new=False):
+        return cls(
+            idx,
+            item.get("title", ""),
+            item.get("address", ""),
+            item.get("category", ""),
+            item.get("totalScore", ""),
+            item.get("reviewsCount", 0),
+            item.get("url", ""),
+            item.get("website", ""),
+            item.get("phone", ""),
+            is_new,
+            item,
+        )
+
+
+def _dict_post(post, idx, is_new):
+    """The plain-dict Instagram record built before InstagramPost (benchmark baseline)"""
+    timestamp = post.get('timestamp')
+    formatted_date = "Unknown"
+    if timestamp and isinstance(timestamp, (int, float)):
+        formatted_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+    return {
+        "post_number": idx,
+        "username": post.get('ownerUsername', 'Unknown'),
+        "full_name": post.get('ownerFullName', ''),
+        "posted_date": formatted_date,
+        "caption": post.get('caption', ''),
+        "likes": post.get('likesCount', 0),
+        "comments": post.get('commentsCount', 0),
+        "shares": post.get('sharesCount', 0),
+        "views": post.get('videoViewCount', 0),
+        "hashtags": _hashtag_text(post.get('hashtags')),
+        "post_url": post.get('url', ''),
+        "media_type": post.get('mediaType', ''),
+        "image_url": post.get('imageUrl') or post.get('displayUrl', ''),
+        "video_url": post.get('videoUrl', ''),
+        "is_new": is_new,
+        "raw_data": post
+    }
+
+
+# Memory benchmark: python -m apifyActors.records [records]
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    raw = [
+        {
+            "ownerUsername": f"user{i % 500}", "ownerFullName": f"User {i % 500}", "caption": f"caption {i}",
+            "likesCount": i % 1000, "commentsCount": i % 50, "videoViewCount": 0, "timestamp": 1700000000 + i,
+            "hashtags": ["travel", "goa", f"tag{i % 20}"], "url": f"https://www.instagram.com/p/{i}/",
+            "mediaType": "Image", "imageUrl": f"https://cdn.example/{i}.jpg", "videoUrl": "",
+        }
+        for i in range(count)
+    ]
+
+    def measure(build):
+        tracemalloc.start()
+        start = time.perf_counter()
+        records = [build(post, idx, False) for idx, post in enumerate(raw, 1)]
+        elapsed = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return records, size, elapsed
+
+    dicts, dict_bytes, dict_time = measure(_dict_post)
+    slotted, slot_bytes, slot_time = measure(InstagramPost.from_raw)
+    print(f"{count} Instagram posts (raw items excluded)")
+    print(f"  dict records:    {dict_bytes / 2**20:8.1f} MiB  {dict_bytes / count:6.0f} B/record  built in {dict_time:.2f} s")
+    print(f"  slotted records: {slot_bytes / 2**20:8.1f} MiB  {slot_bytes / count:6.0f} B/record  built in {slot_time:.2f} s")
+    print(f"  saving: {100 * (1 - slot_bytes / dict_bytes):.0f}% (derived fields not yet accessed)")
+    tracemalloc.start()
+    for post in slotted:
+        post["hashtags"], post["posted_date"]
+    print(f"  after reading every derived field: +{tracemalloc.get_traced_memory()[0] / 2**20:.1f} MiB")
+    tracemalloc.stop()
+    assert all(dict(s) == d for s, d in zip(slotted[:1000], dicts[:1000]))
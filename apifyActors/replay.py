@@ -0,0 +1,186 @@
+import gzip
+import itertools
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+try:
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+    pq = None
+
+# Where the dashboard looks for saved datasets to replay
+REPLAY_DIR = os.environ.get("SCRAPER_REPLAY_DIR", ".")
+# Characters read per step while streaming JSON; grows for items larger than this
+REPLAY_CHUNK_CHARS = int(os.environ.get("SCRAPER_REPLAY_CHUNK_CHARS", str(1 << 20)))
+# Rows per record batch read from memory-mapped Parquet files
+REPLAY_PARQUET_BATCH = int(os.environ.get("SCRAPER_REPLAY_PARQUET_BATCH", "1024"))
+
+REPLAY_EXTENSIONS = (".json", ".ndjson", ".jsonl", ".parquet", ".json.gz", ".ndjson.gz", ".jsonl.gz")
+
+_SEPARATORS = " \t\r\n,\ufeff"
+
+_ACTIVE = ContextVar("scraper_replay", default=None)
+
+
+def iter_json_items(fh, chunk_chars=None):
+    """
+    Stream the items of a JSON array, NDJSON/JSON Lines or concatenated JSON objects
+    from a text file handle, decoding one item at a time from a bounded buffer.
+    """
+    decoder = json.JSONDecoder()
+    chunk_chars = chunk_chars or REPLAY_CHUNK_CHARS
+    buffer, pos, eof = "", 0, False
+    in_array = None
+    while True:
+        while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                if in_array:
+                    raise ValueError("Unexpected end of file inside the JSON array")
+                return
+            more = fh.read(chunk_chars)
+            buffer, pos, eof = buffer[pos:] + more, 0, not more
+            continue
+        if in_array is None:
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+            continue
+        if in_array and buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # A value ending exactly at the buffer end may be cut off (e.g. a number)
+            if end == len(buffer) and not eof:
+                raise ValueError("item may continue in the next chunk")
+        except ValueError:
+            if eof:
+                raise
+            # Read at least as much again as is buffered, so huge items parse in O(size)
+            more = fh.read(max(chunk_chars, len(buffer) - pos))
+            buffer, pos, eof = buffer[pos:] + more, 0, not more
+            continue
+        yield item
+        pos = end
+        if pos > chunk_chars:
+            buffer, pos = buffer[pos:], 0
+
+
+def iter_parquet_items(path, batch_size=None):
+    """Stream the rows of a Parquet file as dicts, one memory-mapped record batch at a time"""
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Install pyarrow to replay Parquet files")
+    parquet = pq.ParquetFile(path, memory_map=True)
+    for batch in parquet.iter_batches(batch_size=batch_size or REPLAY_PARQUET_BATCH):
+        yield from batch.to_pylist()
+
+
+def iter_file_items(path, limit=None):
+    """
+    Stream the raw items saved in a JSON, NDJSON/JSONL (optionally .gz) or Parquet file.
+    Args:
+        path (str): File path
+        limit (int): Stop after this many items (None or 0 for all)
+    """
+    if path.endswith(".parquet"):
+        items = iter_parquet_items(path)
+    else:
+        items = _iter_text_file(path)
+    return itertools.islice(items, limit or None)
+
+
+def _iter_text_file(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        yield from iter_json_items(fh)
+
+
+def find_replay_files(directory=None):
+    """Saved datasets in a directory (not recursive), newest first"""
+    directory = directory or REPLAY_DIR
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(REPLAY_EXTENSIONS)]
+    except OSError:
+        return []
+    paths = [os.path.join(directory, name) for name in names]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+class ReplaySession:
+    """A saved dataset standing in for the actor runs started inside one replay_from block"""
+
+    def __init__(self, path, limit=None):
+        self.path = path
+        self.limit = limit
+        self.runs = 0
+        self._lock = threading.Lock()
+
+    def start_run(self, actor_id, run_input=None):
+        """
+        Return a finished run in place of an actor call.
+        Only the first run serves the file; sharded scrapers that start several runs get
+        the archive once in total instead of once per shard.
+        """
+        with self._lock:
+            self.runs += 1
+            number = self.runs
+        return {
+            "id": f"replay-{number}:{os.path.basename(self.path)}",
+            "defaultDatasetId": None,
+            "status": "SUCCEEDED",
+            "actId": actor_id,
+            "replay": self if number == 1 else None,
+        }
+
+    def items(self):
+        return iter_file_items(self.path, self.limit)
+
+
+@contextmanager
+def replay_from(path=None, limit=None):
+    """
+    Serve every actor run started inside the block (in this context and the threads it
+    spawns through run_shards) from a saved dataset instead of Apify. No-op without a path.
+    """
+    if not path:
+        yield None
+        return
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No saved dataset at {path}")
+    token = _ACTIVE.set(ReplaySession(path, limit))
+    try:
+        yield _ACTIVE.get()
+    finally:
+        _ACTIVE.reset(token)
+
+
+def active_replay():
+    """The ReplaySession of the enclosing replay_from block, or None"""
+    return _ACTIVE.get()
+
+
+def replay_items(run):
+    """Raw items of a run returned by ReplaySession.start_run"""
+    session = run.get("replay")
+    return session.items() if session is not None else iter(())
+
+
+# For testing
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "instagram_results.json"
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_file_items(path))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    print(f"{count} items from {path} in {elapsed:.2f} s, peak memory {peak / 2**20:.1f} MiB "
+          f"(file {os.path.getsize(path) / 2**20:.1f} MiB)")
@@ -0,0 +1,233 @@
+import math
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+RUN_STATS_DB = os.environ.get("SCRAPER_RUN_STATS_DB", os.path.join(".scraper_data", "run_stats.sqlite"))
+# Set to 0 to always start actors with their default memory and no timeout
+TUNING_ENABLED = os.environ.get("SCRAPER_ACTOR_TUNING", "1") != "0"
+# Finished runs of an actor needed before its memory and timeout are chosen from the model
+TUNING_MIN_RUNS = int(os.environ.get("SCRAPER_ACTOR_TUNING_MIN_RUNS", "5"))
+# Runs predicted to take longer than this get more memory, up to the maximum
+TARGET_RUN_S = float(os.environ.get("SCRAPER_ACTOR_TARGET_S", "120"))
+MIN_MEMORY_MB = int(os.environ.get("SCRAPER_ACTOR_MIN_MEMORY_MB", "256"))
+MAX_MEMORY_MB = int(os.environ.get("SCRAPER_ACTOR_MAX_MEMORY_MB", "4096"))
+# Timeout = predicted duration x factor, but never below the minimum
+TIMEOUT_FACTOR = float(os.environ.get("SCRAPER_ACTOR_TIMEOUT_FACTOR", "3"))
+MIN_TIMEOUT_S = int(os.environ.get("SCRAPER_ACTOR_MIN_TIMEOUT_S", "300"))
+
+# Most recent runs per actor the model is fitted on
+FIT_WINDOW = 200
+# How run time shrinks with memory: t ~ memory^-0.5, between network-bound actors
+# (no speed-up) and CPU-bound ones (Apify's CPU share grows linearly with memory)
+MEMORY_SCALING = 0.5
+REFERENCE_MEMORY_MB = 1024
+# Apify accepts powers of two from 128 MB
+MEMORY_TIERS = [128 * 2 ** k for k in range(9)]
+
+# Run input fields holding the requested number of results, and the lists it applies to
+LIMIT_FIELDS = ("maxItems", "resultsLimit", "count", "maxCrawlPages", "maxCrawledPlacesPerSearch")
+LIST_FIELDS = ("startUrls", "directUrls", "hashtags", "searchTerms", "twitterHandles", "searchStringsArray", "conversationIds")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS actor_runs (
+    id INTEGER PRIMARY KEY,
+    actor_id TEXT NOT NULL,
+    source TEXT,
+    run_id TEXT,
+    status TEXT,
+    result_limit INTEGER,
+    input_lists INTEGER,
+    input_size INTEGER,
+    memory_mbytes INTEGER,
+    timeout_secs INTEGER,
+    tuned INTEGER NOT NULL DEFAULT 0,
+    predicted_s REAL,
+    duration_s REAL,
+    wall_s REAL,
+    compute_units REAL,
+    usage_usd REAL,
+    started_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_actor_runs_actor ON actor_runs (actor_id, id);
+"""
+
+
+def connect(db_path=None):
+    db_path = db_path or RUN_STATS_DB
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def input_size(run_input):
+    """
+    Size of a run input: requested results x number of URLs / hashtags / search terms.
+    Returns: (result_limit, input_lists, input_size)
+    """
+    run_input = run_input or {}
+    limit = next((run_input[field] for field in LIMIT_FIELDS if isinstance(run_input.get(field), (int, float))), 1)
+    lists = sum(len(run_input[field]) for field in LIST_FIELDS if isinstance(run_input.get(field), list))
+    lists = max(1, lists)
+    return int(limit), lists, int(limit) * lists
+
+
+def fit_duration_model(rows):
+    """
+    Least-squares fit of run time at REFERENCE_MEMORY_MB against input size.
+    Args:
+        rows (list): (input_size, memory_mbytes, duration_s) tuples of finished runs
+    Returns:
+        (intercept_s, seconds_per_unit), or None without enough runs
+    """
+    points = [
+        (size, duration * (memory / REFERENCE_MEMORY_MB) ** MEMORY_SCALING)
+        for size, memory, duration in rows if size is not None and memory and duration is not None
+    ]
+    if len(points) < TUNING_MIN_RUNS:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x if var_x else 0.0
+    # Bigger inputs never run faster; refit as a plain average if the data says otherwise
+    slope = max(0.0, slope)
+    intercept = max(0.0, mean_y - slope * mean_x)
+    return intercept, slope
+
+
+def predict_duration(model, size, memory_mbytes):
+    intercept, slope = model
+    return (intercept + slope * size) * (REFERENCE_MEMORY_MB / memory_mbytes) ** MEMORY_SCALING
+
+
+def _memory_floor(rows):
+    """
+    Lowest memory worth trying: one tier below the smallest memory that has succeeded, but
+    above any memory that failed where a larger one succeeded.
+    """
+    ok = [memory for memory, status in rows if memory and status == "SUCCEEDED"]
+    floor = MIN_MEMORY_MB
+    if ok:
+        floor = max(floor, min(ok) // 2)
+        failed = [memory for memory, status in rows if memory and status == "FAILED" and memory < max(ok)]
+        if failed:
+            floor = max(floor, max(failed) * 2)
+    return floor
+
+
+def plan_run(actor_id, run_input, db_path=None):
+    """
+    Choose memory and timeout for an actor call from the actor's earlier runs.
+    Picks the smallest memory tier whose predicted run time stays within TARGET_RUN_S (or the
+    maximum memory), and a timeout of TIMEOUT_FACTOR x the prediction.
+    Returns:
+        dict: {result_limit, input_lists, input_size, memory_mbytes, timeout_secs, predicted_s, tuned};
+        memory/timeout/prediction are None until the actor has TUNING_MIN_RUNS finished runs
+    """
+    limit, lists, size = input_size(run_input)
+    plan = {"result_limit": limit, "input_lists": lists, "input_size": size,
+            "memory_mbytes": None, "timeout_secs": None, "predicted_s": None, "tuned": False}
+    if not TUNING_ENABLED or not os.path.exists(db_path or RUN_STATS_DB):
+        return plan
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT input_size, memory_mbytes, duration_s, status FROM actor_runs WHERE actor_id = ? ORDER BY id DESC LIMIT ?",
+            (actor_id, FIT_WINDOW),
+        ).fetchall()
+    finally:
+        conn.close()
+    # Timed-out runs count with the time they got: a lower bound that pushes predictions up
+    model = fit_duration_model([(s, m, d) for s, m, d, status in rows if status in ("SUCCEEDED", "TIMED-OUT")])
+    if model is None:
+        return plan
+    floor = _memory_floor([(m, status) for _, m, _, status in rows])
+    tiers = [tier for tier in MEMORY_TIERS if floor <= tier <= MAX_MEMORY_MB] or [MAX_MEMORY_MB]
+    memory = next((tier for tier in tiers if predict_duration(model, size, tier) <= TARGET_RUN_S), tiers[-1])
+    predicted = predict_duration(model, size, memory)
+    plan.update({
+        "memory_mbytes": memory,
+        "timeout_secs": max(MIN_TIMEOUT_S, math.ceil(predicted * TIMEOUT_FACTOR)),
+        "predicted_s": round(predicted, 2),
+        "tuned": True,
+    })
+    return plan
+
+
+def record_run(actor_id, run, plan, wall_s, source="", db_path=None):
+    """Store a finished run with its input size, memory, duration and cost; returns the actual run time"""
+    stats = run.get("stats") or {}
+    options = run.get("options") or {}
+    duration = stats.get("runTimeSecs")
+    if not isinstance(duration, (int, float)):
+        duration = wall_s
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute(
+                """INSERT INTO actor_runs (actor_id, source, run_id, status, result_limit, input_lists, input_size,
+                       memory_mbytes, timeout_secs, tuned, predicted_s, duration_s, wall_s, compute_units, usage_usd, started_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    actor_id, source, run.get("id"), run.get("status"),
+                    plan["result_limit"], plan["input_lists"], plan["input_size"],
+                    options.get("memoryMbytes") or plan["memory_mbytes"],
+                    options.get("timeoutSecs") or plan["timeout_secs"],
+                    int(plan["tuned"]), plan["predicted_s"], duration, wall_s,
+                    stats.get("computeUnits"), run.get("usageTotalUsd"),
+                    datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                ),
+            )
+    finally:
+        conn.close()
+    return duration
+
+
+def recent_runs(limit=50, db_path=None):
+    """Most recent actor runs with predicted vs actual run time, newest first"""
+    if not os.path.exists(db_path or RUN_STATS_DB):
+        return []
+    conn = connect(db_path)
+    try:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            """SELECT started_at, source, actor_id, status, input_size, memory_mbytes, timeout_secs, tuned,
+                      predicted_s, duration_s, compute_units, usage_usd
+               FROM actor_runs ORDER BY id DESC LIMIT ?""",
+            (limit,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def prediction_accuracy(db_path=None):
+    """Per actor: runs, tuned runs, mean absolute and relative prediction error, and average cost"""
+    if not os.path.exists(db_path or RUN_STATS_DB):
+        return []
+    conn = connect(db_path)
+    try:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            """SELECT actor_id, MAX(source) AS source, COUNT(*) AS runs, SUM(tuned) AS tuned_runs,
+                      ROUND(AVG(duration_s), 2) AS avg_duration_s,
+                      ROUND(AVG(CASE WHEN tuned THEN ABS(duration_s - predicted_s) END), 2) AS mean_abs_error_s,
+                      ROUND(100 * AVG(CASE WHEN tuned AND duration_s > 0 THEN ABS(duration_s - predicted_s) / duration_s END), 1) AS mean_abs_error_pct,
+                      ROUND(AVG(memory_mbytes)) AS avg_memory_mbytes,
+                      ROUND(AVG(compute_units), 4) AS avg_compute_units
+               FROM actor_runs GROUP BY actor_id ORDER BY runs DESC"""
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+# For testing
+if __name__ == "__main__":
+    for row in prediction_accuracy():
+        print(row)
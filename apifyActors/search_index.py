@@ -0,0 +1,264 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timezone
+from apifyActors.blob_store import item_body
+
+SEARCH_DB = os.environ.get("SCRAPER_SEARCH_DB", os.path.join(".scraper_data", "search_index.sqlite"))
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    title, body,
+    source UNINDEXED, doc_key UNINDEXED, url UNINDEXED, author UNINDEXED, indexed_at UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS document_keys (
+    source TEXT NOT NULL,
+    doc_key TEXT NOT NULL,
+    doc_rowid INTEGER NOT NULL,
+    content_hash BLOB NOT NULL,
+    PRIMARY KEY (source, doc_key)
+) WITHOUT ROWID;
+"""
+
+# Index source of each scraper (both Instagram scrapers share one source)
+SCRAPER_SOURCES = {
+    "website_content": "website",
+    "instagram_hashtag": "instagram",
+    "instagram_profile": "instagram",
+    "twitter": "twitter",
+    "facebook": "facebook",
+    "google_news": "news",
+}
+SOURCES = ["website", "instagram", "twitter", "facebook", "news"]
+
+# Highlight markers; Markdown bold so hits render directly in Streamlit
+HIGHLIGHT_START, HIGHLIGHT_END = "**", "**"
+
+
+def _website_doc(item):
+    return {
+        "doc_key": item.get("url"),
+        "title": item.get("title") or (item.get("metadata") or {}).get("title") or "",
+        "body": item_body(item, "markdown") or item_body(item, "text"),
+        "url": item.get("url"),
+        "author": None,
+    }
+
+
+def _instagram_doc(item):
+    return {
+        "doc_key": item.get("shortCode") or item.get("id") or item.get("url"),
+        "title": f"@{item.get('ownerUsername', '')}",
+        "body": item.get("caption") or "",
+        "url": item.get("url"),
+        "author": item.get("ownerUsername"),
+    }
+
+
+def _tweet_doc(item):
+    author = (item.get("author") or {}).get("username")
+    return {
+        "doc_key": item.get("id") or item.get("url"),
+        "title": f"@{author}" if author else "",
+        "body": item.get("fullText") or item.get("text") or "",
+        "url": item.get("url"),
+        "author": author,
+    }
+
+
+def _facebook_doc(item):
+    page_name = item.get("pageName") or (item.get("user") or {}).get("name")
+    return {
+        "doc_key": item.get("postId") or item.get("id") or item.get("url"),
+        "title": page_name or "",
+        "body": item.get("text") or "",
+        "url": item.get("url") or item.get("topLevelUrl"),
+        "author": page_name,
+    }
+
+
+def _news_doc(item):
+    publisher = item.get("source")
+    if isinstance(publisher, dict):
+        publisher = publisher.get("title") or publisher.get("name")
+    return {
+        "doc_key": item.get("link") or item.get("url"),
+        "title": item.get("title") or "",
+        "body": item.get("description") or item.get("snippet") or "",
+        "url": item.get("link") or item.get("url"),
+        "author": publisher,
+    }
+
+
+DOC_BUILDERS = {
+    "website": _website_doc,
+    "instagram": _instagram_doc,
+    "twitter": _tweet_doc,
+    "facebook": _facebook_doc,
+    "news": _news_doc,
+}
+
+
+def connect(db_path=None):
+    db_path = db_path or SEARCH_DB
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def index_results(scraper, results, db_path=None):
+    """
+    Add the raw items of a successful scrape to the full-text index.
+    Items are keyed by URL / shortCode / tweet id: unchanged items are skipped and changed
+    ones replace their previous version, so re-scraping the same pages keeps the index small.
+    Returns:
+        dict: {'indexed', 'unchanged'} item counts
+    """
+    source = SCRAPER_SOURCES.get(scraper)
+    if source is None or not results.get("success"):
+        return {"indexed": 0, "unchanged": 0}
+    build_doc = DOC_BUILDERS[source]
+    docs = {}
+    for item in results.get("raw_results", []):
+        doc = build_doc(item)
+        if doc["doc_key"] and (doc["title"] or doc["body"]):
+            doc["doc_key"] = str(doc["doc_key"])
+            docs[doc["doc_key"]] = doc
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    indexed = unchanged = 0
+    conn = connect(db_path)
+    try:
+        with conn:
+            for doc in docs.values():
+                content_hash = hashlib.blake2b(f"{doc['title']}\0{doc['body']}".encode("utf-8"), digest_size=16).digest()
+                row = conn.execute(
+                    "SELECT doc_rowid, content_hash FROM document_keys WHERE source = ? AND doc_key = ?",
+                    (source, doc["doc_key"]),
+                ).fetchone()
+                if row and row[1] == content_hash:
+                    unchanged += 1
+                    continue
+                if row:
+                    conn.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+                cursor = conn.execute(
+                    "INSERT INTO documents (title, body, source, doc_key, url, author, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (doc["title"], doc["body"], source, doc["doc_key"], doc["url"], doc["author"], now),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO document_keys (source, doc_key, doc_rowid, content_hash) VALUES (?, ?, ?, ?)",
+                    (source, doc["doc_key"], cursor.lastrowid, content_hash),
+                )
+                indexed += 1
+    finally:
+        conn.close()
+    return {"indexed": indexed, "unchanged": unchanged}
+
+
+def build_match_query(query):
+    """
+    Turn a user query into a safe FTS5 MATCH expression.
+    "Quoted text" becomes a phrase, AND/OR/NOT are kept as operators, a trailing * is a
+    prefix search, and every other word is quoted so punctuation cannot break the syntax.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        if phrase.strip():
+            parts.append('"' + phrase.strip().replace('"', '""') + '"')
+        elif word in ("AND", "OR", "NOT"):
+            parts.append(word)
+        elif word:
+            prefix = word.endswith("*")
+            word = word.rstrip("*").strip('"')
+            if word:
+                parts.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    while parts and parts[0] in ("AND", "OR", "NOT"):
+        parts.pop(0)
+    while parts and parts[-1] in ("AND", "OR", "NOT"):
+        parts.pop()
+    return " ".join(parts)
+
+
+def search(query, sources=None, limit=20, db_path=None):
+    """
+    Ranked full-text search over indexed pages, captions and tweets.
+    Args:
+        query (str): Words, "exact phrases", AND/OR/NOT, prefix*
+        sources (list): Restrict to some of SOURCES (all if empty)
+        limit (int): Maximum number of hits
+    Returns:
+        dict: 'hits' (best first, with highlighted 'title' and 'snippet'), 'total', 'elapsed_ms' or 'error'
+    """
+    match = build_match_query(query or "")
+    if not match:
+        return {"error": "Enter at least one search term."}
+    db_path = db_path or SEARCH_DB
+    if not os.path.exists(db_path):
+        return {"hits": [], "total": 0, "elapsed_ms": 0.0, "match": match}
+    where = "documents MATCH ?"
+    params = [match]
+    if sources:
+        where += f" AND source IN ({', '.join('?' * len(sources))})"
+        params += list(sources)
+    start = time.perf_counter()
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            f"""SELECT source, doc_key, url, author, indexed_at,
+                       highlight(documents, 0, ?, ?) AS title,
+                       snippet(documents, 1, ?, ?, '…', 32) AS snippet,
+                       bm25(documents, 5.0, 1.0) AS score
+                FROM documents WHERE {where}
+                ORDER BY score LIMIT ?""",
+            [HIGHLIGHT_START, HIGHLIGHT_END, HIGHLIGHT_START, HIGHLIGHT_END, *params, int(limit)],
+        ).fetchall()
+        total = conn.execute(f"SELECT COUNT(*) FROM documents WHERE {where}", params).fetchone()[0]
+    except sqlite3.OperationalError as e:
+        return {"error": f"Invalid search query: {str(e)}"}
+    finally:
+        conn.close()
+    columns = ["source", "doc_key", "url", "author", "indexed_at", "title", "snippet", "score"]
+    hits = [dict(zip(columns, row)) for row in rows]
+    for hit in hits:
+        hit["score"] = round(-hit["score"], 3)
+        hit["snippet"] = " ".join(hit["snippet"].split())
+    return {"hits": hits, "total": total, "elapsed_ms": (time.perf_counter() - start) * 1000, "match": match}
+
+
+def search_scraped_content(query, sources=None, limit=10, db_path=None):
+    """
+    Answer "which pages / posts mention X" from the index, without scraping.
+    Returns: dict with 'success', 'hits', 'summary' or 'error'.
+    """
+    result = search(query, sources, limit, db_path)
+    if "error" in result:
+        return result
+    if not result["hits"]:
+        return {"error": f"Nothing scraped so far mentions \"{query}\". Scrape some pages first."}
+    return {
+        "success": True,
+        "hits": result["hits"],
+        "summary": {
+            "query": query,
+            "sources": sources or SOURCES,
+            "total_matches": result["total"],
+            "elapsed_ms": round(result["elapsed_ms"], 1),
+        },
+    }
+
+
+def indexed_counts(db_path=None):
+    """Return the number of indexed documents per source"""
+    db_path = db_path or SEARCH_DB
+    if not os.path.exists(db_path):
+        return {}
+    conn = connect(db_path)
+    try:
+        return dict(conn.execute("SELECT source, COUNT(*) FROM document_keys GROUP BY source ORDER BY source").fetchall())
+    finally:
+        conn.close()
@@ -0,0 +1,291 @@
+import argparse
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from dotenv import load_dotenv
+load_dotenv()
+from apifyActors.export import EXPORT_FORMATS, iter_ndjson
+from apifyActors.intents import RESULT_KEYS, configure_gemini, extract_scraper_intent, result_items, run_scraper_from_intent
+from apifyActors.metrics import request_trace
+from apifyActors.parallel import DEFAULT_MAX_CONCURRENCY
+
+SERVICE_HOST = os.environ.get("SCRAPER_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("SCRAPER_SERVICE_PORT", "8765"))
+SERVICE_WORKERS = int(os.environ.get("SCRAPER_SERVICE_WORKERS", str(DEFAULT_MAX_CONCURRENCY)))
+# Finished jobs kept in memory for polling; the oldest are dropped first
+SERVICE_MAX_JOBS = int(os.environ.get("SCRAPER_SERVICE_MAX_JOBS", "200"))
+# Clients must send "Authorization: Bearer <key>" when this is set
+SERVICE_API_KEY = os.environ.get("SCRAPER_SERVICE_KEY", "")
+# Longest a status request may block waiting for a job to finish
+MAX_WAIT_S = 60
+
+FINISHED = ("succeeded", "failed")
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class JobManager:
+    """Scraper jobs run on a bounded worker pool and kept for polling by job id"""
+
+    def __init__(self, workers=None, max_jobs=None, api_token=None, gemini_api_key=None):
+        self.workers = workers or SERVICE_WORKERS
+        self.max_jobs = max_jobs or SERVICE_MAX_JOBS
+        self.api_token = api_token or os.environ.get("APIFY_API_TOKEN")
+        self.gemini_api_key = gemini_api_key or os.environ.get("GEMINI_API_KEY", "")
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scraper-job")
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._model = None
+
+    def parse_intent(self, message):
+        """Turn a chat message into a scraper intent with Gemini"""
+        if not self.gemini_api_key:
+            raise RuntimeError("GEMINI_API_KEY is not set on the service")
+        with self._lock:
+            if self._model is None:
+                self._model = configure_gemini(self.gemini_api_key)
+        return extract_scraper_intent(message, self._model)
+
+    def submit(self, intent, api_token=None):
+        """Queue a scraper intent ({scraper, parameters}); returns the job status"""
+        scraper = intent.get("scraper")
+        if scraper not in RESULT_KEYS:
+            raise ValueError(f"Unknown scraper {scraper!r}; expected one of {', '.join(RESULT_KEYS)}")
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "scraper": scraper,
+            "parameters": intent.get("parameters") or {},
+            "status": "queued",
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "elapsed_s": None,
+            "records": None,
+            "error": None,
+            "summary": None,
+            "_results": None,
+            "_done": threading.Event(),
+        }
+        with self._lock:
+            self.jobs[job["id"]] = job
+            self._evict()
+        self.executor.submit(self._run, job, api_token or self.api_token)
+        return self._public(job)
+
+    def _run(self, job, api_token):
+        job["status"] = "running"
+        job["started_at"] = _now()
+        start = time.perf_counter()
+        try:
+            with request_trace(f"service:{job['scraper']}"):
+                results = run_scraper_from_intent({"scraper": job["scraper"], "parameters": job["parameters"]}, api_token)
+        except Exception as e:
+            results = {"error": f"An error occurred: {str(e)}"}
+        job["elapsed_s"] = round(time.perf_counter() - start, 2)
+        job["finished_at"] = _now()
+        if results.get("success"):
+            job["_results"] = results
+            job["records"] = len(results.get(RESULT_KEYS[job["scraper"]]) or [])
+            job["summary"] = results.get("summary")
+            job["status"] = "succeeded"
+        else:
+            job["error"] = results.get("error", "Unknown error")
+            job["status"] = "failed"
+        job["_done"].set()
+
+    def _evict(self):
+        # Called with the lock held; running and queued jobs are never dropped
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in FINISHED]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[job_id]
+
+    @staticmethod
+    def _public(job):
+        return {key: value for key, value in job.items() if not key.startswith("_")}
+
+    def status(self, job_id, wait_s=0):
+        """Job status, optionally blocking up to wait_s seconds for it to finish; None if unknown"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if wait_s:
+            job["_done"].wait(min(wait_s, MAX_WAIT_S))
+        return self._public(job)
+
+    def results(self, job_id):
+        """Results dict of a succeeded job, or None"""
+        job = self.jobs.get(job_id)
+        return job["_results"] if job else None
+
+    def list_jobs(self):
+        with self._lock:
+            return [self._public(job) for job in reversed(self.jobs.values())]
+
+    def counts(self):
+        with self._lock:
+            statuses = [job["status"] for job in self.jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "succeeded", "failed")}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health                      service status and job counts
+    GET  /scrapers                    scraper names and their record keys
+    POST /intent   {"message"}        parse a chat message into a scraper intent
+    POST /jobs     {"scraper", "parameters"} or {"message"}   queue a job (202)
+    GET  /jobs                        recent jobs, newest first
+    GET  /jobs/<id>?wait=S            job status, waiting up to S seconds for it to finish
+    GET  /jobs/<id>/results?raw=1     NDJSON records (or raw items), streamed in chunks
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ScraperService/1.0"
+
+    @property
+    def manager(self):
+        return self.server.manager
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_ndjson(self, items):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", EXPORT_FORMATS["ndjson"])
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in iter_ndjson(items):
+                self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        payload = json.loads(self.rfile.read(length))
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+        return payload
+
+    def _authorized(self):
+        if not SERVICE_API_KEY:
+            return True
+        supplied = self.headers.get("Authorization") or ""
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {SERVICE_API_KEY}".encode("utf-8")):
+            return True
+        # The request body is never read, so the connection can't be reused for another request
+        self.close_connection = True
+        self._send_json(HTTPStatus.UNAUTHORIZED, {"error": "Missing or wrong service key"})
+        return False
+
+    def _route(self):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return parts, query
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parts, query = self._route()
+        if parts == ["health"]:
+            return self._send_json(HTTPStatus.OK, {"status": "ok", "workers": self.manager.workers, "jobs": self.manager.counts()})
+        if parts == ["scrapers"]:
+            return self._send_json(HTTPStatus.OK, {"scrapers": RESULT_KEYS})
+        if parts == ["jobs"]:
+            return self._send_json(HTTPStatus.OK, {"jobs": self.manager.list_jobs()})
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            try:
+                wait_s = float(query.get("wait", 0))
+            except ValueError:
+                return self._send_json(HTTPStatus.BAD_REQUEST, {"error": "wait must be a number of seconds"})
+            status = self.manager.status(parts[1], wait_s)
+            if status is None:
+                return self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown job {parts[1]}"})
+            if len(parts) == 2:
+                return self._send_json(HTTPStatus.OK, status)
+            if parts[2] == "results":
+                if status["status"] == "failed":
+                    return self._send_json(HTTPStatus.CONFLICT, status)
+                if status["status"] != "succeeded":
+                    return self._send_json(HTTPStatus.ACCEPTED, status)
+                results = self.manager.results(parts[1])
+                return self._send_ndjson(result_items(results, status["scraper"], query.get("raw") in ("1", "true")))
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for GET {self.path}"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        parts, _ = self._route()
+        try:
+            payload = self._read_json()
+        except ValueError as e:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON body: {str(e)}"})
+        if parts not in (["intent"], ["jobs"]):
+            return self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for POST {self.path}"})
+        intent = payload
+        if "message" in payload:
+            try:
+                intent = self.manager.parse_intent(payload["message"])
+            except Exception as e:
+                return self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": f"Intent parsing is unavailable: {str(e)}"})
+        if parts == ["intent"]:
+            return self._send_json(HTTPStatus.OK, intent)
+        try:
+            status = self.manager.submit(intent, self.headers.get("X-Apify-Token"))
+        except ValueError as e:
+            return self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(e), "intent": intent})
+        self._send_json(HTTPStatus.ACCEPTED, status)
+
+
+def make_server(host=None, port=None, manager=None):
+    """HTTP server bound to host:port, handling requests on threads and jobs on the manager's pool"""
+    server = ThreadingHTTPServer((host or SERVICE_HOST, SERVICE_PORT if port is None else port), ServiceHandler)
+    server.daemon_threads = True
+    server.manager = manager or JobManager()
+    return server
+
+
+def serve(host=None, port=None, workers=None):
+    server = make_server(host, port, JobManager(workers=workers))
+    host, port = server.server_address[:2]
+    print(f"Scraper service on http://{host}:{port} with {server.manager.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.manager.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m apifyActors.service", description="HTTP API for the scrapers.")
+    parser.add_argument("--host", default=SERVICE_HOST, help="Bind address (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Port (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="Jobs running at the same time (default: %(default)s)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
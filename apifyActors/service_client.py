@@ -0,0 +1,111 @@
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from dotenv import load_dotenv
+load_dotenv()
+from apifyActors.intents import RESULT_KEYS
+
+# Base URL of a running scraper service (python -m apifyActors.service); empty to scrape in-process
+SERVICE_URL = os.environ.get("SCRAPER_SERVICE_URL", "")
+# Seconds each status request may wait on the service for the job to finish
+SERVICE_POLL_WAIT_S = float(os.environ.get("SCRAPER_SERVICE_POLL_WAIT_S", "20"))
+SERVICE_TIMEOUT_S = float(os.environ.get("SCRAPER_SERVICE_TIMEOUT_S", "1800"))
+
+
+def _request(path, payload=None, base_url=None, headers=None, timeout=None):
+    """Send a JSON request; returns (HTTP status, response) where response is the open reply"""
+    base_url = (base_url or SERVICE_URL).rstrip("/")
+    request = urllib.request.Request(f"{base_url}{path}", method="POST" if payload is not None else "GET")
+    request.add_header("Accept", "application/json")
+    api_key = os.environ.get("SCRAPER_SERVICE_KEY")
+    if api_key:
+        request.add_header("Authorization", f"Bearer {api_key}")
+    for name, value in (headers or {}).items():
+        if value:
+            request.add_header(name, value)
+    data = None
+    if payload is not None:
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        request.add_header("Content-Type", "application/json")
+    try:
+        response = urllib.request.urlopen(request, data, timeout=timeout or SERVICE_POLL_WAIT_S + 30)
+    except urllib.error.HTTPError as e:
+        response = e
+    return response.status, response
+
+
+def _json(path, payload=None, base_url=None, headers=None):
+    status, response = _request(path, payload, base_url, headers)
+    with response:
+        return status, json.loads(response.read() or b"{}")
+
+
+def submit_job(intent, api_token=None, base_url=None):
+    """Queue a {scraper, parameters} intent on the service; returns the job status or {error}"""
+    status, body = _json("/jobs", intent, base_url, {"X-Apify-Token": api_token})
+    return body if status == 202 else {"error": body.get("error", f"Service answered HTTP {status}")}
+
+
+def job_status(job_id, wait_s=0, base_url=None):
+    return _json(f"/jobs/{job_id}?wait={wait_s}", base_url=base_url)[1]
+
+
+def iter_job_items(job_id, raw=False, base_url=None):
+    """Yield the records (or raw items) of a succeeded job as the NDJSON stream arrives"""
+    status, response = _request(f"/jobs/{job_id}/results{'?raw=1' if raw else ''}", base_url=base_url)
+    with response:
+        if status != 200:
+            raise RuntimeError(json.loads(response.read() or b"{}").get("error") or f"Job {job_id} has no results yet")
+        for line in response:
+            if line.strip():
+                yield json.loads(line)
+
+
+def run_remote(intent, api_token=None, base_url=None, timeout_s=None, on_status=None):
+    """
+    Run a scraper intent on the scraper service and wait for it.
+    Args:
+        intent (dict): {scraper, parameters}, as for run_scraper_from_intent
+        api_token (str): Apify API token passed to the service (it uses its own if None)
+        base_url (str): Service URL (default SCRAPER_SERVICE_URL)
+        timeout_s (float): Give up waiting after this many seconds
+        on_status (callable): Optional callback(status) after every poll
+    Returns:
+        dict: The same {success, <records>, summary, raw_results} shape as a local run, plus
+        'job_id'; or {error}
+    """
+    try:
+        job = submit_job(intent, api_token, base_url)
+        if "id" not in job:
+            return job
+        deadline = time.monotonic() + (timeout_s or SERVICE_TIMEOUT_S)
+        while job["status"] not in ("succeeded", "failed"):
+            if time.monotonic() > deadline:
+                return {"error": f"Timed out waiting for service job {job['id']}"}
+            job = job_status(job["id"], SERVICE_POLL_WAIT_S, base_url)
+            if "status" not in job:
+                return {"error": job.get("error") or "Lost track of the service job"}
+            if on_status is not None:
+                on_status(job)
+        if job["status"] == "failed":
+            return {"error": job.get("error") or "Unknown error", "job_id": job["id"]}
+        return {
+            "success": True,
+            RESULT_KEYS[job["scraper"]]: list(iter_job_items(job["id"], base_url=base_url)),
+            "summary": job.get("summary") or {},
+            "raw_results": list(iter_job_items(job["id"], raw=True, base_url=base_url)),
+            "job_id": job["id"],
+        }
+    except (OSError, ValueError, RuntimeError) as e:
+        return {"error": f"Could not reach the scraper service: {str(e)}"}
+
+
+# For testing
+if __name__ == "__main__":
+    results = run_remote({"scraper": "google_news", "parameters": {"query": "Tesla", "max_items": 5}})
+    if results.get("success"):
+        print(f"Job {results['job_id']}: {len(results['articles'])} articles")
+    else:
+        print(results.get("error"))
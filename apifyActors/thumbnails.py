@@ -0,0 +1,221 @@
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from apifyActors.parallel import run_shards
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+THUMB_DIR = os.environ.get("SCRAPER_THUMB_DIR", os.path.join(".scraper_data", "thumbnails"))
+# Set to 0 to only show thumbnails that are already cached (e.g. when offline)
+THUMBNAILS_ENABLED = os.environ.get("SCRAPER_THUMBNAILS", "1") != "0"
+# Longest edge of a thumbnail in pixels
+THUMB_SIZE = int(os.environ.get("SCRAPER_THUMB_SIZE", "320"))
+# Disk cache cap; the least recently shown thumbnails are evicted first
+THUMB_CACHE_MB = float(os.environ.get("SCRAPER_THUMB_CACHE_MB", "200"))
+THUMB_CONCURRENCY = int(os.environ.get("SCRAPER_THUMB_CONCURRENCY", "8"))
+THUMB_TIMEOUT_S = float(os.environ.get("SCRAPER_THUMB_TIMEOUT_S", "10"))
+
+# Images larger than this are not downloaded
+MAX_SOURCE_BYTES = 20 * 2 ** 20
+JPEG_QUALITY = 80
+# Eviction trims the cache to this share of the cap, so it does not run on every write
+LOW_WATER = 0.9
+# Failed URLs are not tried again for this long in the same process
+RETRY_AFTER_S = 600
+EXTENSION = ".thumb"
+
+_failed = {}
+
+
+def http_fetch(url, timeout=None):
+    """Default fetcher: download an http(s) image; returns its bytes"""
+    if not url.startswith(("http://", "https://")):
+        raise ValueError(f"Not an http(s) URL: {url}")
+    # Escape spaces and non-ASCII characters in CDN paths, keeping existing escapes
+    url = urllib.parse.quote(url, safe=":/?#[]@!$&'()*+,;=%~")
+    request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (thumbnail fetcher)", "Accept": "image/*"})
+    with urllib.request.urlopen(request, timeout=timeout or THUMB_TIMEOUT_S) as response:
+        data = response.read(MAX_SOURCE_BYTES + 1)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"Image is larger than {MAX_SOURCE_BYTES // 2 ** 20} MiB: {url}")
+    return data
+
+
+def downsize(data, size=None):
+    """
+    Shrink an image to at most size x size pixels, as JPEG.
+    Without Pillow the image is kept as downloaded.
+    """
+    if Image is None:
+        return data
+    size = size or THUMB_SIZE
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEGs can be decoded straight at a fraction of their size
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        return out.getvalue()
+
+
+def _thumb_path(url, thumb_dir):
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(thumb_dir, digest[:2], digest + EXTENSION)
+
+
+def cached_thumbnail(url, thumb_dir=None):
+    """Cached thumbnail bytes of an image URL (None if not cached); marks it as recently used"""
+    path = _thumb_path(url, thumb_dir or THUMB_DIR)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)
+    except OSError:
+        return None
+    return data
+
+
+def _store(url, data, thumb_dir):
+    path = _thumb_path(url, thumb_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file first so concurrent readers never see a partial thumbnail
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _cached_files(thumb_dir):
+    files = []
+    for root, _, names in os.walk(thumb_dir):
+        for name in names:
+            if name.endswith(EXTENSION):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+    return files
+
+
+def prune_cache(max_mb=None, thumb_dir=None):
+    """
+    Evict the least recently used thumbnails once the cache is over max_mb.
+    Returns: {thumbnails, bytes, evicted} after pruning
+    """
+    files = _cached_files(thumb_dir or THUMB_DIR)
+    total = sum(size for _, size, _ in files)
+    cap = (THUMB_CACHE_MB if max_mb is None else max_mb) * 2 ** 20
+    evicted = 0
+    if total > cap:
+        for _, size, path in sorted(files):
+            if total <= cap * LOW_WATER:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+    return {"thumbnails": len(files) - evicted, "bytes": total, "evicted": evicted}
+
+
+def cache_stats(thumb_dir=None):
+    """Number of cached thumbnails and their size on disk"""
+    files = _cached_files(thumb_dir or THUMB_DIR)
+    return {"thumbnails": len(files), "bytes": sum(size for _, size, _ in files)}
+
+
+def fetch_thumbnails(urls, fetcher=None, max_concurrency=None, size=None, thumb_dir=None):
+    """
+    Thumbnails of image URLs from the disk cache, downloading and downsizing the missing ones
+    concurrently.
+    Args:
+        urls (list): Image URLs (e.g. 'image_url' of posts, 'image' of hotels)
+        fetcher (callable): fetcher(url, timeout) -> image bytes (default http_fetch)
+        max_concurrency (int): Maximum number of downloads at the same time
+        size (int): Longest thumbnail edge in pixels
+    Returns:
+        dict: {success, thumbnails (url -> image bytes), summary} or {error}
+    """
+    thumb_dir = thumb_dir or THUMB_DIR
+    fetcher = fetcher or http_fetch
+    try:
+        urls = [url for url in dict.fromkeys(urls) if url]
+        start = time.perf_counter()
+        thumbnails = {}
+        missing = []
+        for url in urls:
+            data = cached_thumbnail(url, thumb_dir)
+            if data is not None:
+                thumbnails[url] = data
+            elif url not in _failed or time.monotonic() - _failed[url] >= RETRY_AFTER_S:
+                missing.append(url)
+        cached = len(thumbnails)
+        if not THUMBNAILS_ENABLED:
+            missing = []
+
+        def fetch(url):
+            data = downsize(fetcher(url, THUMB_TIMEOUT_S), size)
+            _store(url, data, thumb_dir)
+            return data
+
+        errors = []
+        for outcome in run_shards(fetch, missing, max_concurrency or THUMB_CONCURRENCY):
+            if outcome["error"]:
+                _failed[outcome["shard"]] = time.monotonic()
+                errors.append(outcome["error"])
+            else:
+                thumbnails[outcome["shard"]] = outcome["result"]
+        evicted = prune_cache(thumb_dir=thumb_dir)["evicted"] if len(missing) > len(errors) else 0
+        summary = {
+            "requested": len(urls),
+            "cached": cached,
+            "fetched": len(missing) - len(errors),
+            "failed": len(errors),
+            "skipped": len(urls) - cached - len(missing),
+            "errors": errors,
+            "evicted": evicted,
+            "elapsed_s": round(time.perf_counter() - start, 2)
+        }
+        return {"success": True, "thumbnails": thumbnails, "summary": summary}
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+
+def data_uri(data):
+    """data: URI of thumbnail bytes, for image columns of tables"""
+    if data.startswith(b"\x89PNG"):
+        mime = "image/png"
+    elif data.startswith(b"GIF8"):
+        mime = "image/gif"
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        mime = "image/webp"
+    else:
+        mime = "image/jpeg"
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+# For testing
+if __name__ == "__main__":
+    results = fetch_thumbnails(["https://apify.com/img/apify-logo/logo-for-large-screens.png"])
+    if results.get("success"):
+        print(results["summary"], cache_stats())
+    else:
+        print(results.get("error"))
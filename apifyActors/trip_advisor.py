@@ -2,24 +2,190 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from apify_client import ApifyClient
+from apifyActors.actor_client import call_actor, iter_records
+from apifyActors.parallel import DEFAULT_MAX_CONCURRENCY, run_actor_shards
+from apifyActors.records import to_float, to_int
 
-api_token = os.environ.get("APIFY_API_TOKEN")
-client = ApifyClient(api_token)
-
-# Prepare the Actor input
-run_input = {
-    "url": "https://www.tripadvisor.com/Hotels-g188082-Jungfrau_Region_Bernese_Oberland_Canton_of_Bern-Hotels.html",
-    "offset": 0,
-    "count": 100,
-    "proxy": {
-        "useApifyProxy": True,
-        "apifyProxyGroups": ["RESIDENTIAL"],
-    },
-}
-
-# Run the Actor and wait for it to finish
-run = client.actor("r6WbvwpdX4XIb61OM").call(run_input=run_input)
-
-# Fetch and print Actor results from the run's dataset (if there are any)
-for item in client.dataset(run["defaultDatasetId"]).iterate_items():
-    print(item)
\ No newline at end of file
+TRIPADVISOR_ACTOR_ID = "r6WbvwpdX4XIb61OM"
+DEFAULT_TRIPADVISOR_URL = "https://www.tripadvisor.com/Hotels-g188082-Jungfrau_Region_Bernese_Oberland_Canton_of_Bern-Hotels.html"
+DEFAULT_PAGE_SIZE = int(os.environ.get("SCRAPER_TRIPADVISOR_PAGE_SIZE", "50"))
+
+def build_tripadvisor_run_input(url=DEFAULT_TRIPADVISOR_URL, offset=0, count=100):
+    """Build the TripAdvisor actor input for one offset/count slice of a listing page"""
+    return {
+        "url": url,
+        "offset": offset,
+        "count": count,
+        "proxy": {
+            "useApifyProxy": True,
+            "apifyProxyGroups": ["RESIDENTIAL"],
+        },
+    }
+
+def format_tripadvisor_listing(item, idx):
+    """Turn one raw TripAdvisor listing into a typed record"""
+    return {
+        "listing_number": idx,
+        "name": item.get("name") or item.get("title", ""),
+        "category": item.get("category") or item.get("type", ""),
+        "rating": to_float(item.get("rating")),
+        "reviews": to_int(item.get("numberOfReviews", item.get("reviews"))),
+        "price": item.get("priceRange") or item.get("price") or "",
+        "location": item.get("locationString") or item.get("address", ""),
+        "url": item.get("url") or item.get("webUrl", ""),
+        "image_url": item.get("image") or item.get("photo", ""),
+        "raw_data": item
+    }
+
+def stream_tripadvisor(client, run, start_index=1):
+    """Yield typed listing records of a finished run while its dataset is downloaded"""
+    return iter_records(client, run, format_tripadvisor_listing, "tripadvisor", start_index)
+
+def _summarize(listings, url, run_id, dataset_id):
+    ratings = [listing["rating"] for listing in listings if listing["rating"] is not None]
+    return {
+        "total_listings": len(listings),
+        "url": url,
+        "average_rating": round(sum(ratings) / len(ratings), 2) if ratings else "N/A",
+        "total_reviews": sum(listing["reviews"] for listing in listings),
+        "run_id": run_id,
+        "dataset_id": dataset_id
+    }
+
+def scrape_tripadvisor(url=DEFAULT_TRIPADVISOR_URL, count=30, offset=0, api_token=None, on_record=None):
+    """
+    Scrape a TripAdvisor listing page (hotels, restaurants, attractions) and return formatted data.
+    Args:
+        url (str): TripAdvisor listing URL
+        count (int): Number of listings to fetch
+        offset (int): Listings to skip from the start of the page
+        api_token (str): Apify API token
+        on_record (callable): Optional callback(record) for each listing as it streams in
+    Returns:
+        dict: {success, listings, summary, raw_results} or {error}
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    try:
+        client = ApifyClient(api_token)
+        run_input = build_tripadvisor_run_input(url, offset, count)
+        run = call_actor(client, TRIPADVISOR_ACTOR_ID, run_input, "tripadvisor")
+        if run is None:
+            return {"error": "Failed to start the scraper. Please check your API token."}
+        listings = []
+        for record in stream_tripadvisor(client, run, offset + 1):
+            listings.append(record)
+            if on_record is not None:
+                on_record(record)
+        if not listings:
+            return {"error": "No results found. Please check the TripAdvisor URL."}
+        summary = _summarize(listings, url, run.get('id'), run.get('defaultDatasetId'))
+        return {
+            "success": True,
+            "listings": listings,
+            "summary": summary,
+            "raw_results": [listing["raw_data"] for listing in listings]
+        }
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+def plan_tripadvisor_pages(count, offset=0, page_size=DEFAULT_PAGE_SIZE):
+    """Split offset..offset+count into consecutive offset/count pages of at most page_size"""
+    page_size = max(1, int(page_size))
+    return [
+        {"offset": start, "count": min(page_size, offset + count - start), "label": f"{start + 1}-{min(start + page_size, offset + count)}"}
+        for start in range(offset, offset + count, page_size)
+    ]
+
+def scrape_tripadvisor_paginated(
+    url=DEFAULT_TRIPADVISOR_URL,
+    count=300,
+    offset=0,
+    page_size=DEFAULT_PAGE_SIZE,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    api_token=None,
+    on_record=None
+):
+    """
+    Scrape a large TripAdvisor pull as concurrent offset/count page runs.
+    Pages are handed to on_record in page order as soon as every earlier page has finished,
+    so the merged stream matches a single sequential run. Listings repeated across page
+    boundaries (the site can shift while pages run) are dropped by URL.
+    Args:
+        url (str): TripAdvisor listing URL
+        count (int): Total number of listings to fetch
+        offset (int): Listings to skip from the start of the page
+        page_size (int): Listings per actor run
+        max_concurrency (int): Maximum number of actor runs at the same time
+        api_token (str): Apify API token
+        on_record (callable): Optional callback(record) for each listing, in order
+    Returns:
+        dict: {success, listings, summary, raw_results} or {error}
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    try:
+        pages = plan_tripadvisor_pages(count, offset, page_size)
+        if not pages:
+            return {"error": "Nothing to scrape. Please request at least one listing."}
+        for idx, page in enumerate(pages):
+            page["index"] = idx
+
+        def run_page(page):
+            client = ApifyClient(api_token)
+            run_input = build_tripadvisor_run_input(url, page["offset"], page["count"])
+            run = call_actor(client, TRIPADVISOR_ACTOR_ID, run_input, "tripadvisor")
+            if run is None:
+                raise RuntimeError("Failed to start the scraper. Please check your API token.")
+            return run, list(stream_tripadvisor(client, run, page["offset"] + 1))
+
+        listings = []
+        seen_urls = set()
+        finished = {}
+        next_page = [0]
+
+        def flush(page, outcome):
+            # Release the contiguous prefix of finished pages, in page order
+            finished[page["index"]] = (outcome["result"] or (None, []))[1]
+            while next_page[0] in finished:
+                for record in finished.pop(next_page[0]):
+                    key = record["url"] or record["name"]
+                    if key and key in seen_urls:
+                        continue
+                    seen_urls.add(key)
+                    record["listing_number"] = offset + len(listings) + 1
+                    listings.append(record)
+                    if on_record is not None:
+                        on_record(record)
+                next_page[0] += 1
+
+        sharded = run_actor_shards(run_page, pages, max_concurrency, describe=lambda page, items: {"shard": page["label"]}, noun="pages", on_done=flush)
+        if not sharded.get("success"):
+            return sharded
+        if not listings:
+            return {"error": "No results found. Please check the TripAdvisor URL."}
+        summary = _summarize(listings, url, sharded["run_id"], None)
+        summary.update({
+            "shards": sharded["shards"],
+            "duplicates_removed": len(sharded["items"]) - len(listings),
+            "wall_time_s": sharded["wall_time_s"],
+            "total_shard_time_s": sharded["total_shard_time_s"]
+        })
+        return {
+            "success": True,
+            "listings": listings,
+            "summary": summary,
+            "raw_results": [listing["raw_data"] for listing in listings]
+        }
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+# For testing
+if __name__ == "__main__":
+    results = scrape_tripadvisor(count=10)
+    if results.get("success"):
+        print(f"Scraped {results['summary']['total_listings']} listings.")
+        for l in results['listings']:
+            print(f"{l['listing_number']}: {l['name']} - {l['rating']}⭐ ({l['reviews']} reviews)")
+    else:
+        print(results.get("error"))
@@ -2,7 +2,98 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from apify_client import ApifyClient
-from datetime import datetime
+import math
+from datetime import date, timedelta
+from apifyActors.actor_client import call_actor, download_items
+from apifyActors.metrics import span
+from apifyActors.dedup import dedupe_batch, filter_seen
+from apifyActors.parallel import DEFAULT_MAX_CONCURRENCY, run_actor_shards
+from apifyActors.records import Tweet
+from apifyActors.replay import active_replay
+from apifyActors.tweet_history import (
+    get_watermark, history_sizes, is_newer, merge_history,
+    query_key, tweet_sort_key, watermark_start_date
+)
+
+TWEET_ACTOR_ID = "61RPP7dywgiy0JPD0"
+
+def build_tweet_run_input(
+    start_urls=None,
+    search_terms=None,
+    twitter_handles=None,
+    conversation_ids=None,
+    max_items=100,
+    sort="Latest",
+    tweet_language="en",
+    author=None,
+    in_reply_to=None,
+    mentioning=None,
+    geotagged_near=None,
+    within_radius=None,
+    geocode=None,
+    place_object_id=None,
+    minimum_retweets=None,
+    minimum_favorites=None,
+    minimum_replies=None,
+    start=None,
+    end=None
+):
+    """Build the tweet scraper actor input; optional filters are only sent when set."""
+    run_input = {
+        "startUrls": start_urls or [],
+        "searchTerms": search_terms or [],
+        "twitterHandles": twitter_handles or [],
+        "conversationIds": conversation_ids or [],
+        "maxItems": max_items,
+        "sort": sort,
+        "tweetLanguage": tweet_language,
+        "customMapFunction": "(object) => { return {...object} }",
+    }
+    # Only add optional fields if they are not None or empty
+    if author:
+        run_input["author"] = author
+    if in_reply_to:
+        run_input["inReplyTo"] = in_reply_to
+    if mentioning:
+        run_input["mentioning"] = mentioning
+    if geotagged_near:
+        run_input["geotaggedNear"] = geotagged_near
+    if within_radius:
+        run_input["withinRadius"] = within_radius
+    if geocode:
+        run_input["geocode"] = geocode
+    if place_object_id:
+        run_input["placeObjectId"] = place_object_id
+    if minimum_retweets is not None:
+        run_input["minimumRetweets"] = minimum_retweets
+    if minimum_favorites is not None:
+        run_input["minimumFavorites"] = minimum_favorites
+    if minimum_replies is not None:
+        run_input["minimumReplies"] = minimum_replies
+    if start:
+        run_input["start"] = start
+    if end:
+        run_input["end"] = end
+    return run_input
+
+def format_tweets(raw_results, new_flags):
+    """Turn raw tweet items into the formatted records shown in the dashboard"""
+    with span("formatting", "twitter"):
+        tweets = [Tweet.from_raw(item, idx, is_new) for idx, (item, is_new) in enumerate(zip(raw_results, new_flags), 1)]
+    return tweets
+
+def summarize_tweets(tweets, new_flags, run_id=None, dataset_id=None):
+    """Summary statistics over formatted tweets"""
+    return {
+        "total_tweets": len(tweets),
+        "new_tweets": sum(new_flags),
+        "unique_authors": len(set(t["author"] for t in tweets)),
+        "total_likes": sum(t["likes"] for t in tweets),
+        "total_retweets": sum(t["retweets"] for t in tweets),
+        "total_replies": sum(t["replies"] for t in tweets),
+        "run_id": run_id,
+        "dataset_id": dataset_id
+    }
 
 def scrape_tweets(
     start_urls=None,
@@ -24,7 +115,8 @@ def scrape_tweets(
     minimum_replies=None,
     start=None,
     end=None,
-    api_token=None
+    api_token=None,
+    hide_seen=False
 ):
     """
     Scrape tweets and return formatted data.
@@ -34,82 +126,225 @@ def scrape_tweets(
         api_token = os.environ.get("APIFY_API_TOKEN")
     try:
         client = ApifyClient(api_token)
-        run_input = {
-            "startUrls": start_urls or [],
-            "searchTerms": search_terms or [],
-            "twitterHandles": twitter_handles or [],
-            "conversationIds": conversation_ids or [],
-            "maxItems": max_items,
-            "sort": sort,
-            "tweetLanguage": tweet_language,
-            "customMapFunction": "(object) => { return {...object} }",
-        }
-        # Only add optional fields if they are not None or empty
-        if author:
-            run_input["author"] = author
-        if in_reply_to:
-            run_input["inReplyTo"] = in_reply_to
-        if mentioning:
-            run_input["mentioning"] = mentioning
-        if geotagged_near:
-            run_input["geotaggedNear"] = geotagged_near
-        if within_radius:
-            run_input["withinRadius"] = within_radius
-        if geocode:
-            run_input["geocode"] = geocode
-        if place_object_id:
-            run_input["placeObjectId"] = place_object_id
-        if minimum_retweets is not None:
-            run_input["minimumRetweets"] = minimum_retweets
-        if minimum_favorites is not None:
-            run_input["minimumFavorites"] = minimum_favorites
-        if minimum_replies is not None:
-            run_input["minimumReplies"] = minimum_replies
-        if start:
-            run_input["start"] = start
-        if end:
-            run_input["end"] = end
-        run = client.actor("61RPP7dywgiy0JPD0").call(run_input=run_input)
+        run_input = build_tweet_run_input(
+            start_urls=start_urls,
+            search_terms=search_terms,
+            twitter_handles=twitter_handles,
+            conversation_ids=conversation_ids,
+            max_items=max_items,
+            sort=sort,
+            tweet_language=tweet_language,
+            author=author,
+            in_reply_to=in_reply_to,
+            mentioning=mentioning,
+            geotagged_near=geotagged_near,
+            within_radius=within_radius,
+            geocode=geocode,
+            place_object_id=place_object_id,
+            minimum_retweets=minimum_retweets,
+            minimum_favorites=minimum_favorites,
+            minimum_replies=minimum_replies,
+            start=start,
+            end=end
+        )
+        run = call_actor(client, TWEET_ACTOR_ID, run_input, "twitter")
         if run is None:
             return {"error": "Failed to start the scraper. Please check your API token."}
-        raw_results = list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        raw_results = download_items(client, run, "twitter")
         if not raw_results:
             return {"error": "No results found. Please try with different parameters."}
-        tweets = []
-        for idx, item in enumerate(raw_results, 1):
-            created_at = item.get('createdAt')
-            formatted_date = "Unknown"
-            if created_at:
-                try:
-                    formatted_date = datetime.fromisoformat(created_at.replace('Z', '+00:00')).strftime('%Y-%m-%d %H:%M:%S')
-                except:
-                    formatted_date = str(created_at)
-            tweets.append({
-                "tweet_number": idx,
-                "id": item.get("id", ""),
-                "text": item.get("fullText", ""),
-                "author": item.get("author", {}).get("username", ""),
-                "author_name": item.get("author", {}).get("name", ""),
-                "created_at": formatted_date,
-                "retweets": item.get("retweetCount", 0),
-                "likes": item.get("favoriteCount", 0),
-                "replies": item.get("replyCount", 0),
-                "url": item.get("url", ""),
-                "lang": item.get("lang", ""),
-                "hashtags": item.get("hashtags", []),
-                "mentions": item.get("userMentions", []),
-                "media": item.get("media", []),
-                "raw_data": item
-            })
-        summary = {
-            "total_tweets": len(tweets),
-            "unique_authors": len(set(t["author"] for t in tweets)),
-            "total_likes": sum(t["likes"] for t in tweets),
-            "total_retweets": sum(t["retweets"] for t in tweets),
-            "total_replies": sum(t["replies"] for t in tweets),
-            "run_id": run.get('id'),
-            "dataset_id": run.get('defaultDatasetId')
+        raw_results, new_flags = filter_seen("twitter", raw_results, hide_seen)
+        if not raw_results:
+            return {"error": "No new tweets since the last scrape."}
+        tweets = format_tweets(raw_results, new_flags)
+        return {
+            "success": True,
+            "tweets": tweets,
+            "summary": summarize_tweets(tweets, new_flags, run.get('id'), run.get('defaultDatasetId')),
+            "raw_results": raw_results
         }
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+def scrape_tweets_incremental(
+    start_urls=None,
+    search_terms=None,
+    twitter_handles=None,
+    max_items=100,
+    tweet_language="en",
+    api_token=None
+):
+    """
+    Fetch only tweets newer than each query's stored high-watermark.
+    Every handle / search term / URL runs as its own actor run with `start` set to the day of
+    its newest stored tweet; older tweets are dropped, the rest is merged into the stored
+    per-query history and the watermark advances. Nothing is stored unless every run
+    succeeds, and a query whose run returned a full page of new tweets keeps its watermark,
+    since older new tweets may have been cut off by max_items.
+    Returns: dict with 'success', 'tweets' (new tweets only), 'summary', 'raw_results' or 'error'.
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    queries = (
+        [("url", url) for url in start_urls or []]
+        + [("search", term) for term in search_terms or []]
+        + [("handle", handle) for handle in twitter_handles or []]
+    )
+    if not queries:
+        return {"error": "Please provide at least one Twitter handle, search term or URL."}
+    try:
+        client = ApifyClient(api_token)
+        fresh_by_id = {}
+        fresh_by_query = {}
+        query_stats = {}
+        run_ids = []
+        for kind, value in queries:
+            key = query_key(kind, value)
+            watermark = get_watermark(key)
+            run_input = build_tweet_run_input(
+                start_urls=[value] if kind == "url" else None,
+                search_terms=[value] if kind == "search" else None,
+                twitter_handles=[value] if kind == "handle" else None,
+                max_items=max_items,
+                sort="Latest",
+                tweet_language=tweet_language,
+                start=watermark_start_date(watermark)
+            )
+            run = call_actor(client, TWEET_ACTOR_ID, run_input, "twitter")
+            if run is None:
+                return {"error": "Failed to start the scraper. Please check your API token."}
+            run_ids.append(run.get('id'))
+            items = download_items(client, run, "twitter")
+            fresh = [item for item in items if is_newer(item, watermark)]
+            fresh_by_query[key] = fresh
+            query_stats[key] = {
+                "since": watermark["newest_created_at"] if watermark else None,
+                "fetched": len(items),
+                "new": len(fresh),
+                # A full page of new tweets may mean older new tweets were cut off by max_items
+                "possibly_truncated": len(fresh) >= max_items,
+            }
+            for item in fresh:
+                fresh_by_id.setdefault(str(item.get("id", "")), item)
+        # Only now that every query's run succeeded; a truncated page keeps the old watermark
+        # and a replayed dataset leaves history and watermarks untouched
+        if active_replay() is None:
+            for key, fresh in fresh_by_query.items():
+                merge_history(key, fresh, advance_watermark=not query_stats[key]["possibly_truncated"])
+        stored = history_sizes(list(query_stats))
+        for key, count in stored.items():
+            query_stats[key]["stored"] = count
+        raw_results = sorted(fresh_by_id.values(), key=tweet_sort_key, reverse=True)
+        if not raw_results:
+            return {"error": "No new tweets since the last scrape."}
+        raw_results, new_flags = filter_seen("twitter", raw_results)
+        tweets = format_tweets(raw_results, new_flags)
+        summary = summarize_tweets(tweets, new_flags, ",".join(filter(None, run_ids)))
+        summary["queries"] = query_stats
+        return {
+            "success": True,
+            "tweets": tweets,
+            "summary": summary,
+            "raw_results": raw_results
+        }
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
+def plan_time_windows(start, end, shards):
+    """
+    Split the [start, end] date range (YYYY-MM-DD) into up to `shards` contiguous windows.
+    The actor filters by day, so windows are day-aligned and share their boundary day;
+    tweets on a boundary are removed again when merging by id.
+    """
+    first = date.fromisoformat(str(start)[:10])
+    last = date.fromisoformat(str(end)[:10])
+    days = (last - first).days
+    if days <= 0:
+        return [(first.isoformat(), last.isoformat())]
+    shards = max(1, min(int(shards), days))
+    bounds = [first + timedelta(days=round(i * days / shards)) for i in range(shards + 1)]
+    return [(bounds[i].isoformat(), bounds[i + 1].isoformat()) for i in range(shards)]
+
+def scrape_tweets_sharded(
+    start,
+    end,
+    shards=4,
+    start_urls=None,
+    search_terms=None,
+    twitter_handles=None,
+    split_handles=False,
+    max_items=1000,
+    sort="Latest",
+    tweet_language="en",
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    api_token=None,
+    hide_seen=False
+):
+    """
+    Scrape a large time range as parallel actor runs, one per time window.
+    With split_handles every handle also gets its own runs. max_items is spread evenly over
+    the shards; results are merged newest first and deduplicated by tweet id.
+    Returns: dict with 'success', 'tweets', 'summary' (incl. per-shard stats), 'raw_results' or 'error'.
+    """
+    if api_token is None:
+        api_token = os.environ.get("APIFY_API_TOKEN")
+    if not start or not end:
+        return {"error": "Sharded mode needs both a start and an end date."}
+    try:
+        windows = plan_time_windows(start, end, shards)
+        if split_handles and twitter_handles:
+            groups = [{"twitter_handles": [handle]} for handle in twitter_handles]
+            if start_urls or search_terms:
+                groups.append({"start_urls": start_urls, "search_terms": search_terms})
+        else:
+            groups = [{"start_urls": start_urls, "search_terms": search_terms, "twitter_handles": twitter_handles}]
+        plan = [dict(group, start=window_start, end=window_end) for window_start, window_end in windows for group in groups]
+        per_shard_items = math.ceil(max_items / len(plan))
+
+        def run_shard(shard):
+            client = ApifyClient(api_token)
+            run_input = build_tweet_run_input(
+                start_urls=shard.get("start_urls"),
+                search_terms=shard.get("search_terms"),
+                twitter_handles=shard.get("twitter_handles"),
+                max_items=per_shard_items,
+                sort=sort,
+                tweet_language=tweet_language,
+                start=shard["start"],
+                end=shard["end"]
+            )
+            run = call_actor(client, TWEET_ACTOR_ID, run_input, "twitter")
+            if run is None:
+                raise RuntimeError("Failed to start the scraper. Please check your API token.")
+            return run, download_items(client, run, "twitter")
+
+        sharded = run_actor_shards(
+            run_shard,
+            plan,
+            max_concurrency,
+            describe=lambda shard, items: {
+                "window": f"{shard['start']} → {shard['end']}",
+                "handles": ", ".join(shard.get("twitter_handles") or []),
+            }
+        )
+        if not sharded.get("success"):
+            return sharded
+        fetched = sharded["items"]
+        unique = dedupe_batch("twitter", fetched)
+        merged = sorted(unique, key=tweet_sort_key, reverse=True)[:max_items]
+        if not merged:
+            return {"error": "No results found. Please try with different parameters."}
+        raw_results, new_flags = filter_seen("twitter", merged, hide_seen)
+        if not raw_results:
+            return {"error": "No new tweets since the last scrape."}
+        tweets = format_tweets(raw_results, new_flags)
+        summary = summarize_tweets(tweets, new_flags, sharded["run_id"])
+        summary.update({
+            "shards": sharded["shards"],
+            "duplicates_removed": len(fetched) - len(unique),
+            "wall_time_s": sharded["wall_time_s"],
+            "total_shard_time_s": sharded["total_shard_time_s"],
+        })
         return {
             "success": True,
             "tweets": tweets,
@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+TWEET_HISTORY_DB = os.environ.get("SCRAPER_TWEET_HISTORY_DB", os.path.join(".scraper_data", "tweet_history.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweet_watermarks (
+    query_key TEXT PRIMARY KEY,
+    newest_created_at TEXT NOT NULL,
+    newest_id TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tweet_history (
+    query_key TEXT NOT NULL,
+    tweet_id TEXT NOT NULL,
+    created_at TEXT,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (query_key, tweet_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_tweet_history_time ON tweet_history (query_key, created_at);
+"""
+
+
+def parse_tweet_time(value):
+    """Parse a tweet's createdAt (ISO 8601 or Twitter's 'Wed Oct 10 20:19:24 +0000 2018') as aware UTC"""
+    if not value:
+        return None
+    text = str(value)
+    try:
+        moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            moment = datetime.strptime(text, "%a %b %d %H:%M:%S %z %Y")
+        except ValueError:
+            return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def tweet_sort_key(item):
+    """Order tweets by creation time, then by (snowflake) id"""
+    moment = parse_tweet_time(item.get("createdAt"))
+    tweet_id = str(item.get("id", ""))
+    return (moment.isoformat() if moment else "", int(tweet_id) if tweet_id.isdigit() else 0)
+
+
+def query_key(kind, value):
+    """Normalized key of one incremental query, e.g. ("handle", "@Apify") -> "handle:apify" """
+    value = str(value).strip()
+    if kind == "handle":
+        value = value.lstrip("@").lower()
+    elif kind == "search":
+        value = " ".join(value.lower().split())
+    return f"{kind}:{value}"
+
+
+def connect(db_path=None):
+    db_path = db_path or TWEET_HISTORY_DB
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def get_watermark(key, db_path=None):
+    """Return {'newest_created_at', 'newest_id'} for a query, or None before its first run"""
+    conn = connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT newest_created_at, newest_id FROM tweet_watermarks WHERE query_key = ?", (key,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return {"newest_created_at": row[0], "newest_id": row[1]} if row else None
+
+
+def watermark_start_date(watermark):
+    """Day to pass as the actor's `start` filter (the actor filters by date, not by time)"""
+    if not watermark:
+        return None
+    return watermark["newest_created_at"][:10]
+
+
+def is_newer(item, watermark):
+    """True if a raw tweet is strictly newer than the watermark"""
+    if not watermark:
+        return True
+    created_at, tweet_id = tweet_sort_key(item)
+    newest_id = watermark.get("newest_id") or ""
+    return (created_at, tweet_id) > (watermark["newest_created_at"], int(newest_id) if newest_id.isdigit() else 0)
+
+
+def merge_history(key, items, advance_watermark=True, db_path=None):
+    """
+    Merge new tweets into the stored history of a query and advance its watermark.
+    With advance_watermark=False the tweets are stored but the watermark stays, e.g. when
+    max_items may have cut off tweets between the watermark and the oldest fetched one.
+    Returns: number of tweets that were not stored yet
+    """
+    if not items:
+        return 0
+    rows = []
+    for item in items:
+        moment = parse_tweet_time(item.get("createdAt"))
+        rows.append((key, str(item.get("id", "")), moment.isoformat() if moment else None, json.dumps(item, ensure_ascii=False, default=str)))
+    newest = max(items, key=tweet_sort_key)
+    newest_created_at, _ = tweet_sort_key(newest)
+    conn = connect(db_path)
+    try:
+        with conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO tweet_history (query_key, tweet_id, created_at, raw) VALUES (?, ?, ?, ?)", rows)
+            inserted = conn.total_changes - before
+            if newest_created_at and advance_watermark:
+                conn.execute(
+                    """INSERT INTO tweet_watermarks (query_key, newest_created_at, newest_id, updated_at)
+                       VALUES (?, ?, ?, ?)
+                       ON CONFLICT (query_key) DO UPDATE SET
+                           newest_created_at = excluded.newest_created_at,
+                           newest_id = excluded.newest_id,
+                           updated_at = excluded.updated_at
+                       WHERE excluded.newest_created_at >= tweet_watermarks.newest_created_at""",
+                    (key, newest_created_at, str(newest.get("id", "")), datetime.now(timezone.utc).isoformat()),
+                )
+    finally:
+        conn.close()
+    return inserted
+
+
+def history_sizes(keys, db_path=None):
+    """Return the number of stored tweets per query"""
+    conn = connect(db_path)
+    try:
+        return {
+            key: conn.execute("SELECT COUNT(*) FROM tweet_history WHERE query_key = ?", (key,)).fetchone()[0]
+            for key in keys
+        }
+    finally:
+        conn.close()
@@ -2,16 +2,26 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from apify_client import ApifyClient
+from apifyActors.actor_client import call_actor, download_items
+from apifyActors.metrics import span
+from apifyActors.page_monitor import detect_changes
+from apifyActors.blob_store import compact_item
+from apifyActors.replay import active_replay
 from datetime import datetime
 
 def scrape_website_content(
     start_urls=None,
     results_limit=20,
     save_markdown=True,
-    api_token=None
+    api_token=None,
+    monitor=False
 ):
     """
     Scrape website content and return formatted data.
+    Every page is compared with the last crawl of its URL; with monitor=True only new and
+    changed pages are kept (and passed on to history, search index and the UI).
+    Page bodies (markdown/text/html) are moved to the compressed blob store: pages carry
+    'markdown_hash'/'text_hash' and raw items '<field>_blob' digests (see blob_store.hydrate_item).
     Returns: dict with 'success', 'pages', 'summary', 'raw_results' or 'error'.
     """
     if api_token is None:
@@ -24,24 +34,46 @@ def scrape_website_content(
             "saveMarkdown": save_markdown,
             # ... (other default params can be added as needed)
         }
-        run = client.actor("aYG0l9s7dbB7j3gbS").call(run_input=run_input)
+        run = call_actor(client, "aYG0l9s7dbB7j3gbS", run_input, "website_content")
         if run is None:
             return {"error": "Failed to start the scraper. Please check your API token."}
-        raw_results = list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        raw_results = download_items(client, run, "website_content")
         if not raw_results:
             return {"error": "No results found. Please try with different parameters."}
-        pages = []
-        for idx, item in enumerate(raw_results, 1):
-            pages.append({
-                "page_number": idx,
-                "url": item.get("url", ""),
-                "title": item.get("title", ""),
-                "markdown": item.get("markdown", ""),
-                "text": item.get("text", ""),
-                "raw_data": item
-            })
+        with span("change_detection", "website_content"):
+            # A replayed crawl is compared with the stored state but does not overwrite it
+            changes = detect_changes(raw_results, record=active_replay() is None)
+        crawled = len(raw_results)
+        counts = {status: sum(1 for c in changes if c["status"] == status) for status in ("new", "changed", "unchanged")}
+        if monitor:
+            kept = [(item, change) for item, change in zip(raw_results, changes) if change["status"] != "unchanged"]
+            raw_results = [item for item, _ in kept]
+            changes = [change for _, change in kept]
+            if not raw_results:
+                return {"error": f"No pages changed since the last crawl ({crawled} pages checked)."}
+        with span("blob_store", "website_content"):
+            raw_results = [compact_item(item) for item in raw_results]
+        with span("formatting", "website_content"):
+            pages = []
+            for idx, (item, change) in enumerate(zip(raw_results, changes), 1):
+                pages.append({
+                    "page_number": idx,
+                    "url": item.get("url", ""),
+                    "title": item.get("title", ""),
+                    "markdown_hash": item.get("markdown_blob"),
+                    "text_hash": item.get("text_blob"),
+                    "change_status": change["status"],
+                    "version": change["version"],
+                    "last_changed": change["last_changed"],
+                    "diff": change["diff"],
+                    "raw_data": item
+                })
         summary = {
             "total_pages": len(pages),
+            "crawled_pages": crawled,
+            "new_pages": counts["new"],
+            "changed_pages": counts["changed"],
+            "unchanged_pages": counts["unchanged"],
             "start_urls": start_urls,
             "run_id": run.get('id'),
             "dataset_id": run.get('defaultDatasetId')
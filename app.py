@@ -1,152 +1,40 @@
 import streamlit as st
 import pandas as pd
-from apifyActors.instagram_hashtage import scrape_instagram_posts
-from apifyActors.booking import scrape_booking
+from apifyActors.instagram_hashtage import scrape_instagram_posts, scrape_instagram_hashtags_parallel
+from apifyActors.booking import scrape_booking, scrape_booking_batch, hotels_frame
 from apifyActors.instagram import scrape_instagram_profile
-from apifyActors.tweet import scrape_tweets
+from apifyActors.tweet import scrape_tweets, scrape_tweets_incremental, scrape_tweets_sharded
 from apifyActors.website_content import scrape_website_content
-from apifyActors.google_maps import scrape_google_maps
-import json
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    genai = None
+from apifyActors.google_maps import scrape_google_maps, scrape_google_maps_sharded
+from apifyActors.facebook import scrape_facebook_posts
+from apifyActors.google_news import scrape_google_news
+from apifyActors.trip_advisor import scrape_tripadvisor, scrape_tripadvisor_paginated, DEFAULT_TRIPADVISOR_URL, DEFAULT_PAGE_SIZE
+from apifyActors.metrics import span, observe, request_trace, recent_requests, stage_summary, prometheus_text
+from apifyActors.profiling import resolve_mode, start_rerun_profile, finish_rerun_profile, slowest_reruns
+from apifyActors.history_store import ingest_results, run_query, table_counts, PRESET_QUERIES
+from apifyActors.geo_index import GridIndex, load_points, points_frame, map_figure
+from apifyActors.charts import BUCKETS, METRICS, load_engagement, engagement_figure
+from apifyActors.search_index import SOURCES, index_results, indexed_counts, search as search_content
+from apifyActors.page_monitor import recent_changes, page_history
+from apifyActors.blob_store import get_text, hydrate_item
+from apifyActors.article_details import cached_details, fetch_article_details
+from apifyActors.intents import RESULT_KEYS, configure_gemini, extract_scraper_intent, run_scraper_from_intent
+from apifyActors.service_client import SERVICE_URL, run_remote
+from apifyActors.actor_client import collect_run_warnings
+from apifyActors.run_stats import TUNING_MIN_RUNS, prediction_accuracy, recent_runs
+from apifyActors.replay import REPLAY_DIR, active_replay, find_replay_files, replay_from
+from apifyActors.export import EXPORT_FORMATS, export_buffer
+from apifyActors.thumbnails import THUMB_SIZE, data_uri, fetch_thumbnails
+import math
 import re
-from datetime import datetime
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Configure Gemini
-def configure_gemini(api_key):
-    """Configure Gemini with API key"""
-    if not GEMINI_AVAILABLE:
-        raise ImportError("google-generativeai package is not installed")
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel('gemini-2.0-flash-exp')
-
-def extract_scraper_intent(user_message, model):
-    """Use Gemini to extract scraper intent from user message"""
-    
-    system_prompt = """
-    You are an AI assistant that helps users run web scrapers. Your job is to understand user requests and extract the appropriate scraper and parameters.
-    
-    Available scrapers:
-    1. instagram_hashtag - Scrape Instagram posts by hashtags
-    2. instagram_profile - Scrape Instagram profile posts
-    3. booking - Scrape Booking.com hotels
-    4. twitter - Scrape Twitter tweets
-    5. website_content - Scrape website content
-    6. google_maps - Scrape Google Maps places
-    
-    Return ONLY a JSON object with this exact structure:
-    {
-        "scraper": "scraper_name",
-        "parameters": {
-            "param1": "value1",
-            "param2": "value2"
-        },
-        "confidence": 0.95,
-        "explanation": "Brief explanation of what will be scraped"
-    }
-    
-    Parameter examples:
-    - instagram_hashtag: {"hashtags": ["goa", "travel"], "results_limit": 20}
-    - instagram_profile: {"profile_urls": ["https://instagram.com/username"], "results_limit": 20}
-    - booking: {"search": "New York", "max_items": 10, "currency": "USD", "rooms": 1, "adults": 2, "children": 0, "min_max_price": "0-999999"}
-    - twitter: {"start_urls": ["https://twitter.com/apify"], "search_terms": ["web scraping"], "twitter_handles": ["elonmusk"], "max_items": 20}
-    - website_content: {"start_urls": ["https://docs.apify.com"], "results_limit": 10, "save_markdown": true}
-    - google_maps: {"search_strings": ["restaurant"], "location_query": "New York, USA", "max_places": 20}
-    
-    If the user's request doesn't match any scraper, return:
-    {
-        "scraper": "none",
-        "parameters": {},
-        "confidence": 0.0,
-        "explanation": "I couldn't understand which scraper you want to use. Please be more specific."
-    }
-    """
-    
-    try:
-        response = model.generate_content(f"{system_prompt}\n\nUser request: {user_message}")
-        # Extract JSON from response
-        json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group())
-        else:
-            return {
-                "scraper": "none",
-                "parameters": {},
-                "confidence": 0.0,
-                "explanation": "I couldn't parse the response properly."
-            }
-    except Exception as e:
-        return {
-            "scraper": "none",
-            "parameters": {},
-            "confidence": 0.0,
-            "explanation": f"Error processing request: {str(e)}"
-        }
-
-def run_scraper_from_intent(intent, api_token):
-    """Run the appropriate scraper based on extracted intent"""
-    
-    scraper = intent.get("scraper")
-    parameters = intent.get("parameters", {})
-    
-    if scraper == "instagram_hashtag":
-        hashtags = parameters.get("hashtags", [])
-        results_limit = parameters.get("results_limit", 20)
-        return scrape_instagram_posts(api_token, hashtags, results_limit)
-    
-    elif scraper == "instagram_profile":
-        profile_urls = parameters.get("profile_urls", [])
-        results_limit = parameters.get("results_limit", 20)
-        return scrape_instagram_profile(profile_urls, results_limit, api_token)
-    
-    elif scraper == "booking":
-        return scrape_booking(
-            search=parameters.get("search", "New York"),
-            max_items=parameters.get("max_items", 10),
-            currency=parameters.get("currency", "USD"),
-            rooms=parameters.get("rooms", 1),
-            adults=parameters.get("adults", 2),
-            children=parameters.get("children", 0),
-            min_max_price=parameters.get("min_max_price", "0-999999"),
-            api_token=api_token
-        )
-    
-    elif scraper == "twitter":
-        return scrape_tweets(
-            start_urls=parameters.get("start_urls", []),
-            search_terms=parameters.get("search_terms", []),
-            twitter_handles=parameters.get("twitter_handles", []),
-            max_items=parameters.get("max_items", 20),
-            api_token=api_token
-        )
-    
-    elif scraper == "website_content":
-        return scrape_website_content(
-            start_urls=parameters.get("start_urls", []),
-            results_limit=parameters.get("results_limit", 10),
-            save_markdown=parameters.get("save_markdown", True),
-            api_token=api_token
-        )
-    
-    elif scraper == "google_maps":
-        return scrape_google_maps(
-            search_strings=parameters.get("search_strings", []),
-            location_query=parameters.get("location_query", "New York, USA"),
-            max_places=parameters.get("max_places", 20),
-            api_token=api_token
-        )
-    
-    else:
-        return {"success": False, "error": "Unknown scraper type"}
-
 def format_scraper_results(results, scraper_type):
     """Format scraper results for chat display"""
     if not results.get("success"):
@@ -159,7 +47,7 @@ def format_scraper_results(results, scraper_type):
 ✅ **Instagram Scraping Complete!**
 
 📊 **Summary:**
-- Total Posts: {summary.get('total_posts', 0)}
+- Total Posts: {summary.get('total_posts', 0)} ({summary.get('new_posts', 0)} new)
 - Unique Users: {summary.get('unique_users', 0)}
 - Total Likes: {summary.get('total_likes', 0)}
 - Total Comments: {summary.get('total_comments', 0)}
@@ -180,6 +68,7 @@ def format_scraper_results(results, scraper_type):
 - City: {summary.get('city', 'N/A')}
 - Total Hotels: {summary.get('total_hotels', 0)}
 - Price Range: {summary.get('min_price', 0)} - {summary.get('max_price', 0)} {summary.get('currency', 'USD')}
+{chr(10).join([f"- {row['search']}" + (f" {row['check_in']}→{row['check_out']}" if row['check_in'] else "") + f": median {row['median_price']} {row['price_currency']} ({row['hotels']} hotels)" for row in summary.get('by_search', [])])}
 
 🏨 **Top Hotels:**
 {chr(10).join([f"• {hotel.get('name', 'N/A')} - {hotel.get('price', 0)} {hotel.get('currency', 'USD')} ({hotel.get('stars', 0)}⭐)" for hotel in hotels[:5]])}
@@ -194,7 +83,7 @@ def format_scraper_results(results, scraper_type):
 ✅ **Twitter Scraping Complete!**
 
 🐦 **Summary:**
-- Total Tweets: {summary.get('total_tweets', 0)}
+- Total Tweets: {summary.get('total_tweets', 0)} ({summary.get('new_tweets', 0)} new)
 - Unique Authors: {summary.get('unique_authors', 0)}
 - Total Likes: {summary.get('total_likes', 0)}
 - Total Retweets: {summary.get('total_retweets', 0)}
@@ -213,10 +102,11 @@ def format_scraper_results(results, scraper_type):
 
 🌐 **Summary:**
 - Total Pages: {summary.get('total_pages', 0)}
+- Changed Since Last Crawl: {summary.get('changed_pages', 0)} changed, {summary.get('new_pages', 0)} new, {summary.get('unchanged_pages', 0)} unchanged
 - Start URLs: {summary.get('start_urls', 'N/A')}
 
 📄 **Scraped Pages:**
-{chr(10).join([f"• {page.get('title', 'N/A')} - {page.get('url', 'N/A')}" for page in pages[:5]])}
+{chr(10).join([f"• {page.get('title', 'N/A')} - {page.get('url', 'N/A')} ({page.get('change_status', 'new')})" for page in pages[:5]])}
 
 🔗 **Download Options Available in Dashboard**
         """
@@ -228,7 +118,7 @@ def format_scraper_results(results, scraper_type):
 ✅ **Google Maps Scraping Complete!**
 
 📍 **Summary:**
-- Total Places: {summary.get('total_places', 0)}
+- Total Places: {summary.get('total_places', 0)} ({summary.get('new_places', 0)} new)
 - Location: {summary.get('location_query', 'N/A')}
 - Search Terms: {summary.get('search_strings', 'N/A')}
 
@@ -238,9 +128,792 @@ def format_scraper_results(results, scraper_type):
 🔗 **Download Options Available in Dashboard**
         """
     
+    elif scraper_type == "facebook":
+        summary = results.get("summary", {})
+        posts = results.get("posts", [])
+        return f"""
+✅ **Facebook Scraping Complete!**
+
+📘 **Summary:**
+- Total Posts: {summary.get('total_posts', 0)}
+- Pages: {', '.join(summary.get('pages', [])) or 'N/A'}
+- Total Likes: {summary.get('total_likes', 0)} | Comments: {summary.get('total_comments', 0)} | Shares: {summary.get('total_shares', 0)}
+
+📝 **Top Posts:**
+{chr(10).join([f"• {post.get('page_name', 'N/A')}: {(post.get('text') or '')[:100]}... ({post.get('likes', 0)} likes)" for post in posts[:5]])}
+
+🔗 **Download Options Available in Dashboard**
+        """
+    
+    elif scraper_type == "google_news":
+        summary = results.get("summary", {})
+        articles = results.get("articles", [])
+        return f"""
+✅ **Google News Scraping Complete!**
+
+📰 **Summary:**
+- Query: {summary.get('query', 'N/A')}
+- Total Articles: {summary.get('total_articles', 0)} from {summary.get('sources', 0)} sources
+
+🗞️ **Latest Headlines:**
+{chr(10).join([f"• [{article.get('title', 'N/A')}]({article.get('url', '')}) - {article.get('source', '')}" for article in articles[:5]])}
+
+🔗 **Download Options Available in Dashboard**
+        """
+    
+    elif scraper_type == "tripadvisor":
+        summary = results.get("summary", {})
+        listings = results.get("listings", [])
+        return f"""
+✅ **TripAdvisor Scraping Complete!**
+
+🦉 **Summary:**
+- Total Listings: {summary.get('total_listings', 0)}
+- Average Rating: {summary.get('average_rating', 'N/A')}
+- Total Reviews: {summary.get('total_reviews', 0)}
+
+🏆 **Top Listings:**
+{chr(10).join([f"• {listing.get('name', 'N/A')} - {listing.get('rating', 'N/A')}⭐ ({listing.get('reviews', 0)} reviews)" for listing in listings[:5]])}
+
+🔗 **Download Options Available in Dashboard**
+        """
+    
+    elif scraper_type == "search_index":
+        summary = results.get("summary", {})
+        hits = results.get("hits", [])
+        return f"""
+🔎 **Search Results for "{summary.get('query', '')}"**
+
+📚 **{summary.get('total_matches', 0)} matching pages/posts** (searched in {summary.get('elapsed_ms', 0)} ms, no re-scraping)
+
+{chr(10).join([f"• [{hit.get('title') or hit.get('url')}]({hit.get('url')}) ({hit.get('source')}): {hit.get('snippet', '')}" for hit in hits])}
+        """
+    
     else:
         return "✅ Scraping completed successfully! Check the dashboard for detailed results."
 
+@st.cache_resource(max_entries=1)
+def cached_geo_index(place_rows, hotel_rows):
+    """Spatial index over the stored places and hotels, rebuilt only when the history grows"""
+    with span("geo_index_build", "map"):
+        return GridIndex(load_points())
+
+@st.cache_data(max_entries=4)
+def cached_engagement(source, row_count):
+    """Typed engagement frame of one source, reloaded only when the history grows"""
+    with span("dataframe_build", "charts"):
+        return load_engagement(source)
+
+# Longest list of stored points offered as map search centers
+MAX_CENTER_CHOICES = 200
+
+@contextmanager
+def fragment_span(source):
+    """Time a fragment as "fragment_rerun", but only when it reruns on its own, not as part of a full script run"""
+    if st.session_state.get("full_run_active"):
+        yield
+    else:
+        with span("fragment_rerun", source):
+            yield
+
+@contextmanager
+def rerun_profile():
+    """Time one full script run as "script_rerun", with opt-in profiling (?profile=sample|cprofile or SCRAPER_PROFILE)"""
+    # Whole-script run time, to compare with the fragment_rerun spans of widgets that rerun only their section
+    rerun_start = time.perf_counter()
+    # Fragments rendered while this is set are part of the full run, not fragment-only reruns
+    st.session_state.full_run_active = True
+    # The query parameter profiles a single rerun, so it is dropped from the URL once read
+    profile = start_rerun_profile(resolve_mode(st.query_params.get("profile")))
+    if "profile" in st.query_params:
+        del st.query_params["profile"]
+    try:
+        yield
+    finally:
+        st.session_state.full_run_active = False
+        observe("script_rerun", time.perf_counter() - rerun_start, "app")
+        finish_rerun_profile(profile)
+
+@st.fragment
+def show_nearby_search(geo_index):
+    """Radius search around a stored point; its widgets rerun only this section"""
+    with fragment_span("map"):
+        if len(geo_index):
+            points = geo_index.frame
+            max_markers = st.slider("Max markers on the map", min_value=200, max_value=10000, value=2000, step=200, help="Larger sets are clustered server-side", key="geo_max_markers")
+            st.header("📍 Nearby Search")
+            # Only the first matches get a label, however many points are stored
+            center_query = st.text_input("Find center", placeholder="Part of a place or hotel name", key="geo_center_query").strip()
+            matches = points[points["name"].str.contains(center_query, case=False, regex=False, na=False)] if center_query else points
+            choices = [None] + matches.index[:MAX_CENTER_CHOICES].tolist()
+            center_choice = st.selectbox(
+                "Center",
+                choices,
+                index=1 if len(choices) > 1 else 0,
+                format_func=lambda idx: "Custom coordinates" if idx is None else f"{points.at[idx, 'kind']}: {points.at[idx, 'name']}",
+                key="geo_center"
+            )
+            if len(matches) > MAX_CENTER_CHOICES:
+                st.caption(f"Listing the first {MAX_CENTER_CHOICES} of {len(matches)} matching points; type more of the name to narrow them down")
+            if center_choice is None:
+                center_lat = st.number_input("Latitude", min_value=-90.0, max_value=90.0, value=float(points["lat"].iloc[0]), format="%.6f", key="geo_lat")
+                center_lng = st.number_input("Longitude", min_value=-180.0, max_value=180.0, value=float(points["lng"].iloc[0]), format="%.6f", key="geo_lng")
+            else:
+                center_lat, center_lng = float(points.at[center_choice, "lat"]), float(points.at[center_choice, "lng"])
+            radius_km = st.slider("Radius (km)", min_value=0.1, max_value=25.0, value=1.0, step=0.1, key="geo_radius")
+            kind_filter = st.radio("Show", ["All", "Places", "Hotels"], horizontal=True, key="geo_kind")
+            with span("geo_query", "map"):
+                nearby = geo_index.nearby(center_lat, center_lng, radius_km * 1000, kind={"All": None, "Places": "place", "Hotels": "hotel"}[kind_filter])
+            st.caption(f"{len(nearby)} of {len(points)} stored points within {radius_km} km")
+            if len(nearby):
+                st.plotly_chart(map_figure(nearby, max_markers, center=(center_lat, center_lng), zoom=max(1, 14 - math.log2(radius_km))), use_container_width=True)
+                st.dataframe(nearby, use_container_width=True)
+            with st.expander(f"🌍 All stored points ({len(points)})"):
+                st.plotly_chart(map_figure(points, max_markers, zoom=3), use_container_width=True)
+        else:
+            st.info("No places or hotels with coordinates yet. Run a Google Maps or Booking.com scrape first.")
+
+@st.fragment
+def show_engagement_charts():
+    """Engagement chart controls and chart; its widgets rerun only this section"""
+    with fragment_span("charts"):
+        counts = table_counts()
+        chart_source = st.radio("Source", ["Instagram", "Twitter", "Facebook"], horizontal=True, key="chart_source")
+        source_key, table = {"Instagram": ("instagram", "instagram_posts"), "Twitter": ("twitter", "tweets"), "Facebook": ("facebook", "facebook_posts")}[chart_source]
+        engagement = cached_engagement(source_key, counts.get(table, 0))
+        if len(engagement):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                bucket = st.selectbox("Time bucket", list(BUCKETS), index=2, key="chart_bucket")
+            with col2:
+                agg = st.selectbox("Aggregation", ["sum", "mean", "median", "max"], key="chart_agg", disabled=BUCKETS[bucket] is None)
+            with col3:
+                max_points = st.slider("Max points per chart", min_value=200, max_value=10000, value=2000, step=200, key="chart_max_points")
+            metrics = st.multiselect("Metrics", METRICS[source_key], default=METRICS[source_key], key=f"chart_metrics_{source_key}")
+            authors = sorted(a for a in engagement["author"].dropna().unique())
+            selected_authors = st.multiselect("Accounts (all if empty)", authors, key=f"chart_authors_{source_key}")
+            if selected_authors:
+                engagement = engagement[engagement["author"].isin(selected_authors)]
+            if metrics and len(engagement):
+                with span("chart_build", source_key):
+                    fig, stats = engagement_figure(engagement, metrics, BUCKETS[bucket], agg, max_points)
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"{stats['records']} records → {stats['buckets']} points → {stats['plotted']} plotted")
+        else:
+            st.info("No stored posts or tweets with timestamps yet. Run an Instagram, Twitter or Facebook scrape first.")
+
+def show_points_map(kind, raw_results):
+    """Map of the scraped places/hotels that carry coordinates"""
+    with span("dataframe_build", "map"):
+        points = points_frame(kind, raw_results)
+    if len(points):
+        with st.expander(f"🗺️ Map ({len(points)} with coordinates)", expanded=True):
+            st.plotly_chart(map_figure(points), use_container_width=True)
+
+@st.fragment
+def show_news_articles(articles, api_token):
+    """Headline list whose selected articles get their details fetched on demand (reruns only this section)"""
+    labels = {f"{article['article_number']}. {article['title']}": article['url'] for article in articles if article['url']}
+    selected = st.multiselect(
+        "📄 Open articles",
+        list(labels),
+        help="Details of the selected articles are fetched in one batch and cached per URL",
+        key="news_selected"
+    )
+    if st.button("📄 Fetch details", key="news_details_btn", disabled=not selected):
+        with st.spinner("🔄 Fetching article details..."), request_trace("dashboard:google_news_details"):
+            fetched = fetch_article_details([labels[label] for label in selected], api_token=api_token)
+        if fetched.get("success"):
+            summary = fetched['summary']
+            st.caption(f"{summary['cached']} from cache, {summary['fetched']} fetched in {summary['batches']} batch(es), {summary['not_found']} not found ({summary['elapsed_s']} s)")
+        else:
+            st.error(f"❌ {fetched.get('error')}")
+    details = cached_details([article['url'] for article in articles])
+    for article in articles:
+        st.subheader(f"{article['article_number']}. {article['title']}")
+        st.write(f"🗞️ {article['source']} | 📅 {article['published_at'] or 'N/A'}")
+        if article['description']:
+            st.write(article['description'])
+        if article['url']:
+            st.write(f"🔗 [Read Article]({article['url']})")
+        detail = details.get(article['url'])
+        if detail:
+            with st.expander("📄 Article details"):
+                if detail['author']:
+                    st.write(f"✍️ {detail['author']}")
+                if detail['description']:
+                    st.write(f"_{detail['description']}_")
+                st.markdown(get_text(detail['text_hash']) or "_No article text found._")
+        st.markdown("---")
+
+def paginate(items, key_prefix):
+    """Page size and page selectors; returns the items on the selected page"""
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Per page", [10, 25, 50, 100], index=1, key=f"{key_prefix}_page_size")
+    pages = max(1, math.ceil(len(items) / page_size))
+    page_key = f"{key_prefix}_page"
+    # A filter or a larger page size can leave the stored page past the end
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (page - 1) * page_size
+    st.caption(f"Showing {min(start + 1, len(items))}-{min(start + page_size, len(items))} of {len(items)} (page {page} of {pages})")
+    return items[start:start + page_size]
+
+def thumbnails_for(urls, source):
+    """Thumbnails of image URLs from the disk cache, fetching the missing ones in one bounded batch"""
+    with span("thumbnails", source):
+        fetched = fetch_thumbnails(urls)
+    return fetched.get("thumbnails", {})
+
+def show_thumbnail(thumbnails, url, label="🖼️ View Image"):
+    """Inline thumbnail of an image URL, or a link to the image when it could not be fetched"""
+    if thumbnails.get(url):
+        st.image(thumbnails[url], width=THUMB_SIZE)
+    elif url:
+        st.write(f"[{label}]({url})")
+
+@st.fragment
+def show_instagram_posts(posts, key_prefix):
+    """Filterable, sortable, paged Instagram post cards; their widgets rerun only this section"""
+    with fragment_span(key_prefix):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            min_likes = st.number_input("Minimum likes", min_value=0, value=0, key=f"{key_prefix}_min_likes")
+        with col2:
+            sort_by = st.selectbox("Sort by", ["Post Number", "Most Liked", "Most Commented", "Latest"], key=f"{key_prefix}_sort")
+        with col3:
+            show_media_links = st.checkbox("Show media links", value=True, key=f"{key_prefix}_media")
+        filtered_posts = [post for post in posts if post['likes'] >= min_likes]
+        if sort_by == "Most Liked":
+            filtered_posts.sort(key=lambda x: x['likes'], reverse=True)
+        elif sort_by == "Most Commented":
+            filtered_posts.sort(key=lambda x: x['comments'], reverse=True)
+        elif sort_by == "Latest":
+            filtered_posts.sort(key=lambda x: x['posted_date'], reverse=True)
+        page = paginate(filtered_posts, key_prefix)
+        thumbnails = thumbnails_for([post['image_url'] for post in page], key_prefix)
+        for post in page:
+            st.subheader(f"Post {post['post_number']}" + (" 🆕" if post['is_new'] else ""))
+            user_cols = st.columns([2, 2, 2])
+            user_cols[0].write(f"👤 **User:** @{post['username']}")
+            if post['full_name']:
+                user_cols[1].write(f"📝 **Full Name:** {post['full_name']}")
+            user_cols[2].write(f"📅 **Posted:** {post['posted_date']}")
+            if post['caption']:
+                st.write(f"**Caption:** {post['caption']}")
+            if thumbnails.get(post['image_url']):
+                st.image(thumbnails[post['image_url']], width=THUMB_SIZE)
+            metric_cols = st.columns(4)
+            metric_cols[0].metric("❤️ Likes", post['likes'])
+            metric_cols[1].metric("💬 Comments", post['comments'])
+            metric_cols[2].metric("🔄 Shares", post['shares'])
+            metric_cols[3].metric("👁️ Views", post['views'])
+            if post['hashtags']:
+                st.write(f"🏷️ **Hashtags:** {post['hashtags']}")
+            if post['media_type']:
+                st.write(f"📷 **Media Type:** {post['media_type']}")
+            if post['post_url']:
+                st.write(f"🔗 [View Original Post]({post['post_url']})")
+            if show_media_links:
+                if post['image_url']:
+                    st.write(f"🖼️ [View Image]({post['image_url']})")
+                if post['video_url']:
+                    st.write(f"🎥 [View Video]({post['video_url']})")
+            st.markdown("---")
+
+@st.fragment
+def show_tweets(tweets, key_prefix):
+    """Sortable, paged tweet cards; their widgets rerun only this section"""
+    with fragment_span(key_prefix):
+        sort_by = st.selectbox("Sort by", ["Tweet Number", "Most Liked", "Most Retweeted", "Latest"], key=f"{key_prefix}_sort")
+        ordered = list(tweets)
+        if sort_by == "Most Liked":
+            ordered.sort(key=lambda x: x['likes'], reverse=True)
+        elif sort_by == "Most Retweeted":
+            ordered.sort(key=lambda x: x['retweets'], reverse=True)
+        elif sort_by == "Latest":
+            ordered.sort(key=lambda x: x['created_at'] if x['created_at'] != "Unknown" else "", reverse=True)
+        page = paginate(ordered, key_prefix)
+        thumbnails = thumbnails_for([media.get('mediaUrl') for tweet in page for media in tweet['media'] or [] if media.get('type') == 'photo'], key_prefix)
+        for tweet in page:
+            st.subheader(f"Tweet {tweet['tweet_number']} by @{tweet['author']}" + (" 🆕" if tweet['is_new'] else ""))
+            st.write(f"📝 {tweet['text']}")
+            st.write(f"📅 {tweet['created_at']}")
+            st.write(f"❤️ {tweet['likes']} | 🔁 {tweet['retweets']} | 💬 {tweet['replies']}")
+            if tweet['hashtags']:
+                st.write(f"🏷️ Hashtags: {' '.join(['#'+h for h in tweet['hashtags']])}")
+            if tweet['url']:
+                st.write(f"🔗 [View Tweet]({tweet['url']})")
+            if tweet['media']:
+                for media in tweet['media']:
+                    if media.get('type') == 'photo':
+                        show_thumbnail(thumbnails, media.get('mediaUrl'), "🖼️ View Photo")
+                    elif media.get('type') == 'video':
+                        st.write(f"🎥 [View Video]({media.get('mediaUrl')})")
+            st.markdown("---")
+
+@st.fragment
+def show_hotels(hotels, key_prefix):
+    """Paged hotel cards; thumbnails are fetched for the shown page only"""
+    with fragment_span(key_prefix):
+        page = paginate(hotels, key_prefix)
+        thumbnails = thumbnails_for([hotel['image'] for hotel in page], key_prefix)
+        for hotel in page:
+            st.subheader(f"Hotel {hotel['hotel_number']}: {hotel['name']}")
+            st.write(f"📍 {hotel['address']}, {hotel['city']}, {hotel['country']}")
+            st.write(f"💲 Price: {hotel['price_value'] if hotel['price_value'] is not None else 'N/A'} {hotel['price_currency'] or ''}")
+            st.write(f"⭐ Stars: {hotel['stars']} | 🏆 Review Score: {hotel['review_score']} ({hotel['review_count']} reviews)")
+            if hotel['url']:
+                st.write(f"🔗 [View Hotel]({hotel['url']})")
+            show_thumbnail(thumbnails, hotel['image'], "🖼️ View Photo")
+            st.markdown("---")
+
+@st.fragment
+def show_hotel_table(df, key_prefix):
+    """Paged hotel table with a photo column for the shown rows only"""
+    with fragment_span(key_prefix):
+        page = paginate(df, key_prefix)
+        thumbnails = thumbnails_for(list(page["image"].fillna("")), key_prefix)
+        table = page.copy()
+        table.insert(0, "photo", [data_uri(thumbnails[url]) if thumbnails.get(url) else None for url in page["image"]])
+        st.dataframe(
+            table,
+            use_container_width=True,
+            row_height=60,
+            column_config={
+                "photo": st.column_config.ImageColumn("photo"),
+                "url": st.column_config.LinkColumn("url"),
+                "image": st.column_config.LinkColumn("image")
+            }
+        )
+
+@st.fragment
+def show_facebook_posts(posts, key_prefix):
+    """Paged Facebook post cards; thumbnails are fetched for the shown page only"""
+    with fragment_span(key_prefix):
+        page = paginate(posts, key_prefix)
+        thumbnails = thumbnails_for([post['image_url'] for post in page], key_prefix)
+        for post in page:
+            st.subheader(f"Post {post['post_number']} by {post['page_name']}")
+            st.write(f"📝 {post['text']}")
+            st.write(f"📅 {post['posted_at'] or 'N/A'}")
+            st.write(f"👍 {post['likes']} | 💬 {post['comments']} | 🔁 {post['shares']}")
+            if post['url']:
+                st.write(f"🔗 [View Post]({post['url']})")
+            show_thumbnail(thumbnails, post['image_url'])
+            st.markdown("---")
+
+@st.fragment
+def show_tripadvisor_listings(listings, key_prefix):
+    """Paged TripAdvisor listing cards; thumbnails are fetched for the shown page only"""
+    with fragment_span(key_prefix):
+        page = paginate(listings, key_prefix)
+        thumbnails = thumbnails_for([listing['image_url'] for listing in page], key_prefix)
+        for listing in page:
+            st.subheader(f"{listing['listing_number']}. {listing['name']}")
+            if listing['location']:
+                st.write(f"📍 {listing['location']}")
+            st.write(f"⭐ Rating: {listing['rating'] if listing['rating'] is not None else 'N/A'} | 💬 Reviews: {listing['reviews']}" + (f" | 💲 {listing['price']}" if listing['price'] else ""))
+            if listing['url']:
+                st.write(f"🔗 [View on TripAdvisor]({listing['url']})")
+            show_thumbnail(thumbnails, listing['image_url'])
+            st.markdown("---")
+
+def show_shard_stats(summary, title="🧩 Shards", stats_key="shards", expanded=False):
+    """Expander with the wall time, summed run time and per-shard table of a sharded scrape"""
+    with st.expander(title, expanded=expanded):
+        timing = f"**Wall time:** {summary['wall_time_s']} s | **Sum of run times:** {summary['total_shard_time_s']} s"
+        if "duplicates_removed" in summary:
+            timing += f" | **Duplicates removed:** {summary['duplicates_removed']}"
+        st.write(timing)
+        st.dataframe(pd.DataFrame(summary[stats_key]), use_container_width=True)
+
+def streaming_progress(noun):
+    """on_record callback showing how many records have streamed in so far"""
+    placeholder = st.empty()
+    received = []
+    def on_record(record):
+        received.append(record)
+        if len(received) == 1 or len(received) % 10 == 0:
+            placeholder.caption(f"📥 {len(received)} {noun} received...")
+    return on_record
+
+def raw_json_downloads(raw_results, file_stem, transform=None):
+    """
+    Pretty JSON and NDJSON download buttons for raw results.
+    Files are only encoded when a button is clicked, item by item, instead of on every rerun.
+    """
+    def export(fmt):
+        def build():
+            with span("export", file_stem):
+                items = map(transform, raw_results) if transform else raw_results
+                return export_buffer(items, fmt)
+        return build
+    st.download_button(
+        label="📥 Download Raw JSON",
+        data=export("json"),
+        file_name=f"{file_stem}.json",
+        mime=EXPORT_FORMATS["json"]
+    )
+    st.download_button(
+        label="📥 Download Raw NDJSON",
+        data=export("ndjson"),
+        file_name=f"{file_stem}.ndjson",
+        mime=EXPORT_FORMATS["ndjson"]
+    )
+
+def show_scrape_results(view, results, info=None):
+    """
+    Render the results of a dashboard scrape and keep them in the session state, so a
+    rerun from any widget outside the result fragments renders them again
+    """
+    info = info or {}
+    st.session_state.last_scrape = {"view": view, "results": results, "info": info}
+    if view == "instagram_hashtag":
+        with span("render", "instagram_hashtag"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_posts']} posts!")
+                st.header("📊 Summary Statistics")
+                col1, col2, col3, col4, col5 = st.columns(5)
+                col1.metric("Total Posts", results['summary']['total_posts'])
+                col5.metric("New Posts", results['summary']['new_posts'])
+                col2.metric("Unique Users", results['summary']['unique_users'])
+                col3.metric("Total Likes", results['summary']['total_likes'])
+                col4.metric("Total Comments", results['summary']['total_comments'])
+                if results['summary'].get('hashtags'):
+                    show_shard_stats(results['summary'], "#️⃣ Per-hashtag Breakdown", stats_key="hashtags", expanded=True)
+                st.header("📱 Scraped Posts")
+                show_instagram_posts(results['posts'], "manual_hashtag")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "instagram_hashtag"):
+                        df = pd.DataFrame(results['posts'])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="instagram_formatted_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "instagram_raw_data")
+                with st.expander("🔧 Run Information"):
+                    st.json({
+                        "Run ID": results['summary']['run_id'],
+                        "Dataset ID": results['summary']['dataset_id'],
+                        "Hashtags Scraped": info["hashtags"],
+                        "Results Limit": info["results_limit"]
+                    })
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "instagram_profile":
+        with span("render", "instagram_profile"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_posts']} posts!")
+                st.header("📊 Summary Statistics")
+                col1, col2, col3, col4, col5 = st.columns(5)
+                col1.metric("Total Posts", results['summary']['total_posts'])
+                col5.metric("New Posts", results['summary']['new_posts'])
+                col2.metric("Unique Users", results['summary']['unique_users'])
+                col3.metric("Total Likes", results['summary']['total_likes'])
+                col4.metric("Total Comments", results['summary']['total_comments'])
+                st.header("📱 Scraped Posts")
+                show_instagram_posts(results['posts'], "manual_profile")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "instagram_profile"):
+                        df = pd.DataFrame(results['posts'])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="instagram_profile_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "instagram_profile_raw_data")
+                with st.expander("🔧 Run Information"):
+                    st.json({
+                        "Run ID": results['summary']['run_id'],
+                        "Dataset ID": results['summary']['dataset_id'],
+                        "Profile URLs": info["profile_urls"],
+                        "Results Limit": info["results_limit"]
+                    })
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "booking_batch":
+        with span("render", "booking"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_hotels']} hotels from {len(results['summary']['shards'])} searches!")
+                st.header("🏨 Booking.com Hotels")
+                st.write(f"**Destinations:** {results['summary']['city']}")
+                st.write(f"**Min Price:** {results['summary']['min_price']} {results['summary']['currency']} | **Max Price:** {results['summary']['max_price']} {results['summary']['currency']}")
+                if results['summary']['other_currencies']:
+                    st.warning(f"⚠️ Some prices came back in {', '.join(results['summary']['other_currencies'])}; they are kept apart from {results['summary']['currency']} prices.")
+                st.subheader("💲 Prices by Search")
+                st.dataframe(pd.DataFrame(results['summary']['by_search']), use_container_width=True)
+                show_shard_stats(results['summary'])
+                show_points_map("hotel", results['raw_results'])
+                st.subheader("🏨 All Hotels")
+                with span("dataframe_build", "booking"):
+                    df = hotels_frame(results['hotels'])
+                show_hotel_table(df, "manual_booking_batch")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=df.to_csv(index=False),
+                        file_name="booking_hotels_batch_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "booking_batch_raw_data")
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "booking":
+        with span("render", "booking"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_hotels']} hotels!")
+                st.header("🏨 Booking.com Hotels")
+                st.write(f"**City:** {results['summary']['city']}")
+                st.write(f"**Min Price:** {results['summary']['min_price']} {results['summary']['currency']} | **Max Price:** {results['summary']['max_price']} {results['summary']['currency']}")
+                st.write(f"**Total Hotels:** {results['summary']['total_hotels']}")
+                show_points_map("hotel", results['raw_results'])
+                show_hotels(results['hotels'], "manual_booking_results")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "booking"):
+                        df = pd.DataFrame(results['hotels'])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="booking_hotels_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "booking_raw_data")
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "twitter":
+        with span("render", "twitter"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_tweets']} tweets!")
+                st.header("🐦 Tweets")
+                st.write(f"**Unique Authors:** {results['summary']['unique_authors']} | **New Tweets:** {results['summary']['new_tweets']}")
+                st.write(f"**Total Likes:** {results['summary']['total_likes']} | **Total Retweets:** {results['summary']['total_retweets']} | **Total Replies:** {results['summary']['total_replies']}")
+                if results['summary'].get('queries'):
+                    truncated = [key for key, stats in results['summary']['queries'].items() if stats['possibly_truncated']]
+                    if truncated:
+                        st.warning(f"⚠️ {', '.join(truncated)} returned a full page of new tweets, so older new tweets may be missing; their watermark was kept. Raise Max Tweets and refresh again.")
+                    with st.expander("🔁 Incremental Refresh per Query"):
+                        st.dataframe(pd.DataFrame.from_dict(results['summary']['queries'], orient="index"), use_container_width=True)
+                if results['summary'].get('shards'):
+                    show_shard_stats(results['summary'])
+                show_tweets(results['tweets'], "manual_twitter")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "twitter"):
+                        df = pd.DataFrame(results['tweets'])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="tweets_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "tweets_raw_data")
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "website_content":
+        with span("render", "website_content"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_pages']} pages!")
+                st.header("🌐 Website Pages")
+                st.write(f"**Start URLs:** {results['summary']['start_urls']}")
+                st.write(f"**Total Pages:** {results['summary']['total_pages']} of {results['summary']['crawled_pages']} crawled")
+                st.write(f"**Changed Since Last Crawl:** ✏️ {results['summary']['changed_pages']} changed | 🆕 {results['summary']['new_pages']} new | {results['summary']['unchanged_pages']} unchanged")
+                for page in results['pages']:
+                    badge = {"new": " 🆕", "changed": " ✏️"}.get(page['change_status'], "")
+                    st.subheader(f"Page {page['page_number']}: {page['title']}{badge}")
+                    st.write(f"🔗 [View Page]({page['url']})")
+                    if page['change_status'] == "changed":
+                        with st.expander(f"✏️ Changes since last crawl (version {page['version']})"):
+                            st.code(page['diff'], language="diff")
+                    if page['markdown_hash']:
+                        st.markdown("**Markdown Content:**")
+                        st.markdown(get_text(page['markdown_hash']))
+                    elif page['text_hash']:
+                        st.markdown("**Text Content:**")
+                        st.write(get_text(page['text_hash']))
+                    st.markdown("---")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "website_content"):
+                        df = pd.DataFrame([
+                            dict(page, markdown=get_text(page['markdown_hash']) or "", text=get_text(page['text_hash']) or "")
+                            for page in results['pages']
+                        ])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="website_content_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "website_content_raw_data", hydrate_item)
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "google_maps":
+        with span("render", "google_maps"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_places']} places!")
+                st.header("📍 Google Maps Places")
+                st.write(f"**Search Strings:** {results['summary']['search_strings']}")
+                st.write(f"**Location Query:** {results['summary']['location_query']}")
+                st.write(f"**Total Places:** {results['summary']['total_places']} | **New Places:** {results['summary']['new_places']}")
+                show_points_map("place", results['raw_results'])
+                if results['summary'].get('shards'):
+                    show_shard_stats(results['summary'])
+                for place in results['places']:
+                    st.subheader(f"Place {place['place_number']}: {place['name']}" + (" 🆕" if place['is_new'] else ""))
+                    st.write(f"📍 Address: {place['address']}")
+                    st.write(f"🏷️ Category: {place['category']}")
+                    st.write(f"⭐ Rating: {place['rating']} | 💬 Reviews: {place['reviews']}")
+                    if place['url']:
+                        st.write(f"🔗 [View on Google Maps]({place['url']})")
+                    if place['website']:
+                        st.write(f"🌐 [Website]({place['website']})")
+                    if place['phone']:
+                        st.write(f"📞 {place['phone']}")
+                    st.markdown("---")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "google_maps"):
+                        df = pd.DataFrame(results['places'])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="google_maps_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "google_maps_raw_data")
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "facebook":
+        with span("render", "facebook"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_posts']} posts!")
+                st.header("📘 Facebook Posts")
+                st.write(f"**Pages:** {', '.join(results['summary']['pages'])}")
+                st.write(f"**Total Likes:** {results['summary']['total_likes']} | **Total Comments:** {results['summary']['total_comments']} | **Total Shares:** {results['summary']['total_shares']}")
+                show_facebook_posts(results['posts'], "manual_facebook_results")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "facebook"):
+                        df = pd.DataFrame(results['posts'])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="facebook_posts_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "facebook_raw_data")
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "google_news":
+        with span("render", "google_news"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_articles']} articles!")
+                st.header("📰 Google News Articles")
+                st.write(f"**Query:** {results['summary']['query']} | **Edition:** {results['summary']['language']} | **Sources:** {results['summary']['sources']}")
+                show_news_articles(results['articles'], os.environ.get("APIFY_API_TOKEN", ""))
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "google_news"):
+                        df = pd.DataFrame(results['articles'])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="google_news_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "google_news_raw_data")
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+    elif view == "tripadvisor":
+        with span("render", "tripadvisor"):
+            if results.get("success"):
+                st.success(f"✅ Successfully scraped {results['summary']['total_listings']} listings!")
+                st.header("🦉 TripAdvisor Listings")
+                st.write(f"**Average Rating:** {results['summary']['average_rating']} | **Total Reviews:** {results['summary']['total_reviews']}")
+                if results['summary'].get('shards'):
+                    show_shard_stats(results['summary'], "🧩 Pages")
+                show_tripadvisor_listings(results['listings'], "manual_tripadvisor_results")
+                st.header("💾 Download Data")
+                col1, col2 = st.columns(2)
+                with col1:
+                    with span("dataframe_build", "tripadvisor"):
+                        df = pd.DataFrame(results['listings'])
+                        csv_data = df.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=csv_data,
+                        file_name="tripadvisor_data.csv",
+                        mime="text/csv"
+                    )
+                with col2:
+                    raw_json_downloads(results['raw_results'], "tripadvisor_raw_data")
+            else:
+                st.error(f"❌ {results.get('error')}")
+                st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+
+def save_to_history(scraper, results, params):
+    """Store successful results in the local history database and search index without interrupting the UI"""
+    if not results.get("success") or active_replay() is not None:
+        # Replayed archives are not new scrapes
+        return 0
+    try:
+        with span("search_index", scraper):
+            index_results(scraper, results)
+    except Exception as e:
+        st.warning(f"⚠️ Could not add results to the search index: {str(e)}")
+    try:
+        with span("history_ingest", scraper):
+            return ingest_results(scraper, results, params)
+    except Exception as e:
+        st.warning(f"⚠️ Could not save results to history: {str(e)}")
+        return 0
+
 # Initialize session state for chat
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
@@ -255,149 +928,173 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Create tabs for different interfaces
-tab1, tab2 = st.tabs(["🤖 AI Chatbot", "⚙️ Manual Dashboard"])
+def main():
+    # Create tabs for different interfaces
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🤖 AI Chatbot", "⚙️ Manual Dashboard", "🗄️ History", "⏱️ Performance", "🗺️ Map", "📈 Charts"])
 
-with tab1:
-    st.title("🤖 AI-Powered Scraper Chatbot")
-    st.markdown("**Chat with me to run scrapers using natural language!**")
-    
-    # Helpful tips section
-    with st.expander("💡 How to use the chatbot", expanded=True):
-        st.markdown("""
-        **🎯 How it works:**
-        1. **Enter your API keys** in the sidebar (Apify + Gemini)
-        2. **Type natural language requests** like "Find hotels in Paris"
-        3. **The AI understands your intent** and runs the right scraper
-        4. **Get formatted results** with summaries and download options
+    with tab1:
+        st.title("🤖 AI-Powered Scraper Chatbot")
+        st.markdown("**Chat with me to run scrapers using natural language!**")
         
-        **💬 Pro Tips:**
-        - Be specific: "Get 20 posts with hashtag #travel" instead of just "scrape Instagram"
-        - Include limits: "Find 10 hotels in Tokyo" 
-        - Use natural language: "Search for restaurants near me" or "Get tweets about AI"
-        - Combine parameters: "Find hotels in London for 2 adults and 1 child"
+        # Helpful tips section
+        with st.expander("💡 How to use the chatbot", expanded=True):
+            st.markdown("""
+            **🎯 How it works:**
+            1. **Enter your API keys** in the sidebar (Apify + Gemini)
+            2. **Type natural language requests** like "Find hotels in Paris"
+            3. **The AI understands your intent** and runs the right scraper
+            4. **Get formatted results** with summaries and download options
+            
+            **💬 Pro Tips:**
+            - Be specific: "Get 20 posts with hashtag #travel" instead of just "scrape Instagram"
+            - Include limits: "Find 10 hotels in Tokyo" 
+            - Use natural language: "Search for restaurants near me" or "Get tweets about AI"
+            - Combine parameters: "Find hotels in London for 2 adults and 1 child"
+            
+            **🔧 Advanced Features:**
+            - View detailed results in expandable sections
+            - Download data as CSV or JSON
+            - Filter and sort results in the manual dashboard
+            """)
         
-        **🔧 Advanced Features:**
-        - View detailed results in expandable sections
-        - Download data as CSV or JSON
-        - Filter and sort results in the manual dashboard
-        """)
-    
-    # Fetch API keys from environment
-    apify_token = os.environ.get("APIFY_API_TOKEN", "")
-    gemini_api_key = os.environ.get("GEMINI_API_KEY", "")
-
-    # Instead, initialize Gemini automatically if gemini_api_key is present
-    if gemini_api_key and not st.session_state.gemini_model:
-        try:
-            st.session_state.gemini_model = configure_gemini(gemini_api_key)
-            st.success("✅ Gemini initialized successfully!")
-        except Exception as e:
-            st.error(f"❌ Error initializing Gemini: {str(e)}")
-    
-    # Chat interface
-    st.markdown("---")
-    
-    # Display chat history
-    for message in st.session_state.chat_history:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-    
-    # Sample prompts section
-    st.markdown("### 💡 Sample Prompts")
-    
-    # Create expandable sections for each scraper with sample prompts
-    with st.expander("📱 Instagram Hashtag Scraper"):
-        st.markdown("""
-        **Sample Prompts:**
-        - "Scrape Instagram posts with hashtag #Goa"
-        - "Get 50 posts with hashtag #travel"
-        - "Find Instagram posts with hashtags #food and #delicious"
-        - "Scrape 30 posts with hashtag #photography"
-        - "Get Instagram posts with hashtag #fitness limit to 25 results"
-        """)
-    
-    with st.expander("👤 Instagram Profile Scraper"):
-        st.markdown("""
-        **Sample Prompts:**
-        - "Scrape Instagram profile @humansofny"
-        - "Get posts from https://www.instagram.com/natgeo/"
-        - "Scrape 40 posts from @elonmusk profile"
-        - "Get posts from multiple profiles: @taylorswift13 and @beyonce"
-        - "Scrape Instagram profile posts from @nike limit to 15"
-        """)
-    
-    with st.expander("🏨 Booking.com Scraper"):
-        st.markdown("""
-        **Sample Prompts:**
-        - "Find hotels in New York on Booking.com"
-        - "Search for hotels in Paris with max 20 results"
-        - "Get hotels in Tokyo with USD currency"
-        - "Find hotels in London for 2 adults and 1 child"
-        - "Search hotels in Dubai with price range 100-500 USD"
-        - "Get 15 hotels in Singapore with 4-star minimum"
-        """)
-    
-    with st.expander("🐦 Twitter Scraper"):
-        st.markdown("""
-        **Sample Prompts:**
-        - "Scrape tweets from @elonmusk"
-        - "Get tweets about AI from @OpenAI"
-        - "Search tweets with term 'web scraping'"
-        - "Get tweets from multiple handles: @elonmusk, @taylorswift13"
-        - "Scrape tweets from https://twitter.com/apify"
-        - "Search tweets about 'climate change' limit to 30"
-        - "Get tweets with hashtag #AI from @Google"
-        """)
-    
-    with st.expander("🌐 Website Content Scraper"):
-        st.markdown("""
-        **Sample Prompts:**
-        - "Extract content from https://docs.apify.com"
-        - "Scrape website content from https://www.wikipedia.org"
-        - "Get content from https://www.bbc.com/news"
-        - "Extract text from multiple URLs: https://example.com and https://test.com"
-        - "Scrape 20 pages from https://docs.python.org"
-        - "Get markdown content from https://github.com"
-        """)
-    
-    with st.expander("📍 Google Maps Scraper"):
-        st.markdown("""
-        **Sample Prompts:**
-        - "Find restaurants in New York on Google Maps"
-        - "Search for hotels in London"
-        - "Get coffee shops in San Francisco"
-        - "Find gyms in Tokyo limit to 25 places"
-        - "Search for museums in Paris"
-        - "Get shopping malls in Dubai"
-        - "Find hospitals in Singapore"
-        """)
-    
-    st.markdown("---")
-    
-    # Chat input
-    if prompt := st.chat_input("Ask me to run a scraper (e.g., 'Scrape Instagram posts with hashtag #Goa' or 'Find hotels in New York on Booking.com')"):
-        # Add user message to chat
-        st.session_state.chat_history.append({"role": "user", "content": prompt, "timestamp": datetime.now()})
+        # Fetch API keys from environment
+        apify_token = os.environ.get("APIFY_API_TOKEN", "")
+        gemini_api_key = os.environ.get("GEMINI_API_KEY", "")
+
+        # Instead, initialize Gemini automatically if gemini_api_key is present
+        if gemini_api_key and not st.session_state.gemini_model:
+            try:
+                st.session_state.gemini_model = configure_gemini(gemini_api_key)
+                st.success("✅ Gemini initialized successfully!")
+            except Exception as e:
+                st.error(f"❌ Error initializing Gemini: {str(e)}")
         
-        with st.chat_message("user"):
-            st.markdown(prompt)
+        # Chat interface
+        st.markdown("---")
         
-        # Check if Gemini is initialized
-        if not st.session_state.gemini_model:
-            with st.chat_message("assistant"):
-                st.error("❌ Please initialize Gemini first by entering your API key in the sidebar!")
-        elif not apify_token:
-            with st.chat_message("assistant"):
-                st.error("❌ Please enter your Apify API token in the sidebar!")
-        else:
-            with st.chat_message("assistant"):
-                with st.spinner("🤔 Analyzing your request..."):
-                    # Extract intent using Gemini
-                    intent = extract_scraper_intent(prompt, st.session_state.gemini_model)
-                    
-                    if intent["scraper"] == "none":
-                        response = f"""❌ {intent['explanation']}
+        # Display chat history
+        for message in st.session_state.chat_history:
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+        
+        # Sample prompts section
+        st.markdown("### 💡 Sample Prompts")
+        
+        # Create expandable sections for each scraper with sample prompts
+        with st.expander("📱 Instagram Hashtag Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Scrape Instagram posts with hashtag #Goa"
+            - "Get 50 posts with hashtag #travel"
+            - "Find Instagram posts with hashtags #food and #delicious"
+            - "Scrape 30 posts with hashtag #photography"
+            - "Get Instagram posts with hashtag #fitness limit to 25 results"
+            """)
+        
+        with st.expander("👤 Instagram Profile Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Scrape Instagram profile @humansofny"
+            - "Get posts from https://www.instagram.com/natgeo/"
+            - "Scrape 40 posts from @elonmusk profile"
+            - "Get posts from multiple profiles: @taylorswift13 and @beyonce"
+            - "Scrape Instagram profile posts from @nike limit to 15"
+            """)
+        
+        with st.expander("🏨 Booking.com Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Find hotels in New York on Booking.com"
+            - "Search for hotels in Paris with max 20 results"
+            - "Get hotels in Tokyo with USD currency"
+            - "Find hotels in London for 2 adults and 1 child"
+            - "Search hotels in Dubai with price range 100-500 USD"
+            - "Get 15 hotels in Singapore with 4-star minimum"
+            - "Compare hotel prices in Paris, Rome and Barcelona for June 1-3"
+            """)
+        
+        with st.expander("🐦 Twitter Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Scrape tweets from @elonmusk"
+            - "Get tweets about AI from @OpenAI"
+            - "Search tweets with term 'web scraping'"
+            - "Get tweets from multiple handles: @elonmusk, @taylorswift13"
+            - "Scrape tweets from https://twitter.com/apify"
+            - "Search tweets about 'climate change' limit to 30"
+            - "Get tweets with hashtag #AI from @Google"
+            """)
+        
+        with st.expander("🌐 Website Content Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Extract content from https://docs.apify.com"
+            - "Scrape website content from https://www.wikipedia.org"
+            - "Get content from https://www.bbc.com/news"
+            - "Extract text from multiple URLs: https://example.com and https://test.com"
+            - "Scrape 20 pages from https://docs.python.org"
+            - "Get markdown content from https://github.com"
+            """)
+        
+        with st.expander("📍 Google Maps Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Find restaurants in New York on Google Maps"
+            - "Search for hotels in London"
+            - "Get coffee shops in San Francisco"
+            - "Find gyms in Tokyo limit to 25 places"
+            - "Search for museums in Paris"
+            - "Get shopping malls in Dubai"
+            - "Find hospitals in Singapore"
+            """)
+        
+        with st.expander("📘 Facebook Posts Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Get posts from https://www.facebook.com/humansofnewyork/"
+            - "Scrape 30 Facebook posts from NASA's page"
+            """)
+        
+        with st.expander("📰 Google News Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Get the latest news about Tesla"
+            - "Find 20 Google News articles about climate change in German"
+            """)
+        
+        with st.expander("🦉 TripAdvisor Scraper"):
+            st.markdown("""
+            **Sample Prompts:**
+            - "Scrape hotels from https://www.tripadvisor.com/Hotels-g187147-Paris_Ile_de_France-Hotels.html"
+            - "Get 50 listings from this TripAdvisor page: <url>"
+            """)
+        
+        st.markdown("---")
+        
+        # Chat input
+        if prompt := st.chat_input("Ask me to run a scraper (e.g., 'Scrape Instagram posts with hashtag #Goa' or 'Find hotels in New York on Booking.com')"):
+            # Add user message to chat
+            st.session_state.chat_history.append({"role": "user", "content": prompt, "timestamp": datetime.now()})
+            
+            with st.chat_message("user"):
+                st.markdown(prompt)
+            
+            # Check if Gemini is initialized
+            if not st.session_state.gemini_model:
+                with st.chat_message("assistant"):
+                    st.error("❌ Please initialize Gemini first by entering your API key in the sidebar!")
+            elif not apify_token:
+                with st.chat_message("assistant"):
+                    st.error("❌ Please enter your Apify API token in the sidebar!")
+            else:
+                with st.chat_message("assistant"), request_trace("chat") as trace:
+                    with st.spinner("🤔 Analyzing your request..."):
+                        # Extract intent using Gemini
+                        intent = extract_scraper_intent(prompt, st.session_state.gemini_model)
+                        trace["label"] = f"chat:{intent['scraper']}"
+                        
+                        if intent["scraper"] == "none":
+                            response = f"""❌ {intent['explanation']}
 
 **💡 Quick Reference - Available Commands:**
 
@@ -407,6 +1104,10 @@ with tab1:
 🐦 **Twitter:** "Scrape tweets from @elonmusk"
 🌐 **Website Content:** "Extract content from https://docs.apify.com"
 📍 **Google Maps:** "Find restaurants in New York on Google Maps"
+📘 **Facebook:** "Get posts from https://www.facebook.com/humansofnewyork/"
+📰 **Google News:** "Get the latest news about Tesla"
+🦉 **TripAdvisor:** "Scrape hotels from <TripAdvisor listing URL>"
+🔎 **Search Scraped Content:** "Which pages mention rate limiting?"
 
 **💬 Try these examples:**
 • "Scrape 20 posts with hashtag #travel"
@@ -415,607 +1116,719 @@ with tab1:
 • "Find coffee shops in San Francisco"
 • "Extract content from https://www.wikipedia.org"
 """
-                        st.markdown(response)
-                        st.session_state.chat_history.append({"role": "assistant", "content": response, "timestamp": datetime.now()})
-                    else:
-                        # Show what we're going to do
-                        st.info(f"🎯 **Intent Detected:** {intent['explanation']}")
-                        
-                        with st.spinner(f"🔄 Running {intent['scraper']} scraper..."):
-                            # Run the scraper
-                            results = run_scraper_from_intent(intent, apify_token)
-                            
-                            # Format and display results
-                            formatted_results = format_scraper_results(results, intent["scraper"])
-                            st.markdown(formatted_results)
-                            
-                            # Add to chat history
-                            st.session_state.chat_history.append({"role": "assistant", "content": formatted_results, "timestamp": datetime.now()})
+                            st.markdown(response)
+                            st.session_state.chat_history.append({"role": "assistant", "content": response, "timestamp": datetime.now()})
+                        else:
+                            # Show what we're going to do
+                            st.info(f"🎯 **Intent Detected:** {intent['explanation']}")
                             
-                            # Show detailed results in expandable section
-                            if results.get("success"):
-                                with st.expander("📊 View Detailed Results"):
-                                    if intent["scraper"] in ["instagram_hashtag", "instagram_profile"]:
-                                        df = pd.DataFrame(results.get("posts", []))
-                                        st.dataframe(df)
-                                    elif intent["scraper"] == "booking":
-                                        df = pd.DataFrame(results.get("hotels", []))
-                                        st.dataframe(df)
-                                    elif intent["scraper"] == "twitter":
-                                        df = pd.DataFrame(results.get("tweets", []))
-                                        st.dataframe(df)
-                                    elif intent["scraper"] == "website_content":
-                                        df = pd.DataFrame(results.get("pages", []))
-                                        st.dataframe(df)
-                                    elif intent["scraper"] == "google_maps":
-                                        df = pd.DataFrame(results.get("places", []))
-                                        st.dataframe(df)
-    
-    # Clear chat button
-    if st.button("🗑️ Clear Chat History"):
-        st.session_state.chat_history = []
-        st.rerun()
+                            with st.spinner(f"🔄 Running {intent['scraper']} scraper..."):
+                                # Run the scraper, on the scraper service when one is configured
+                                if SERVICE_URL:
+                                    with span("service_job", intent["scraper"]):
+                                        results = run_remote(intent, apify_token or None)
+                                    if results.get("job_id"):
+                                        st.caption(f"🔌 Service job {results['job_id']} at {SERVICE_URL}")
+                                else:
+                                    with collect_run_warnings() as run_warnings:
+                                        results = run_scraper_from_intent(intent, apify_token)
+                                    for warning in run_warnings:
+                                        st.warning(f"⏱️ {warning}")
+                                save_to_history(intent["scraper"], results, intent.get("parameters", {}))
+                                
+                                # Format and display results
+                                formatted_results = format_scraper_results(results, intent["scraper"])
+                                st.markdown(formatted_results)
+                                
+                                # Add to chat history
+                                st.session_state.chat_history.append({"role": "assistant", "content": formatted_results, "timestamp": datetime.now()})
+                                
+                                # Show detailed results in expandable section
+                                if results.get("success"):
+                                    with st.expander("📊 View Detailed Results"):
+                                        result_key = RESULT_KEYS.get(intent["scraper"])
+                                        if result_key:
+                                            with span("dataframe_build", intent["scraper"]):
+                                                df = pd.DataFrame(results.get(result_key, []))
+                                            with span("render", intent["scraper"]):
+                                                st.dataframe(df)
+        
+        # Clear chat button
+        if st.button("🗑️ Clear Chat History"):
+            st.session_state.chat_history = []
+            st.rerun()
 
-with tab2:
-    st.title("🕸️ MCP Multi-Scraper Dashboard")
-    
-    with st.sidebar:
-        st.header("⚙️ Configuration")
-        data_source = st.selectbox("Select Data Source", [
-            "Instagram Hashtag", "Instagram Profile", "Booking.com", "Twitter", "Website Content", "Google Maps"
-        ])
+    with tab2:
+        st.title("🕸️ MCP Multi-Scraper Dashboard")
+        
+        with st.sidebar:
+            st.header("⚙️ Configuration")
+            data_source = st.selectbox("Select Data Source", [
+                "Instagram Hashtag", "Instagram Profile", "Booking.com", "Twitter", "Website Content", "Google Maps",
+                "Facebook", "Google News", "TripAdvisor"
+            ])
 
-        # Fetch API keys from environment
-        apify_token = os.environ.get("APIFY_API_TOKEN", "")
+            # Fetch API keys from environment
+            apify_token = os.environ.get("APIFY_API_TOKEN", "")
 
-        if data_source == "Instagram Hashtag":
-            hashtags_input = st.text_input(
-                "Hashtags (comma-separated)",
-                value="Goa",
-                help="Enter hashtags separated by commas",
-                key="manual_hashtags"
-            )
-            results_limit = st.slider(
-                "Number of Results",
-                min_value=5,
-                max_value=100,
-                value=20,
-                help="Maximum number of posts to scrape",
-                key="manual_hashtag_results"
-            )
-            scrape_button = st.button("🚀 Run Instagram Hashtag Scraper", key="insta_hashtag_btn", use_container_width=True)
-        elif data_source == "Instagram Profile":
-            profile_urls_input = st.text_area(
-                "Instagram Profile URLs (one per line)",
-                value="https://www.instagram.com/humansofny/",
-                help="Enter one or more Instagram profile URLs, one per line",
-                key="manual_profile_urls"
-            )
-            results_limit = st.slider(
-                "Number of Results",
-                min_value=5,
-                max_value=100,
-                value=20,
-                help="Maximum number of posts to scrape",
-                key="manual_profile_results"
-            )
-            scrape_button = st.button("🚀 Run Instagram Profile Scraper", key="insta_profile_btn", use_container_width=True)
-        elif data_source == "Booking.com":
-            search = st.text_input("Search City/Location", value="New York", key="manual_booking_search")
-            max_items = st.slider("Max Hotels", min_value=1, max_value=50, value=10, key="manual_booking_max")
-            currency = st.text_input("Currency", value="USD", key="manual_booking_currency")
-            rooms = st.number_input("Rooms", min_value=1, value=1, key="manual_booking_rooms")
-            adults = st.number_input("Adults", min_value=1, value=2, key="manual_booking_adults")
-            children = st.number_input("Children", min_value=0, value=0, key="manual_booking_children")
-            min_max_price = st.text_input("Min-Max Price", value="0-999999", key="manual_booking_price")
-            scrape_button = st.button("🚀 Run Booking Scraper", key="booking_btn", use_container_width=True)
-        elif data_source == "Twitter":
-            start_urls_input = st.text_area(
-                "Start URLs (one per line)",
-                value="https://twitter.com/apify",
-                help="Enter Twitter URLs to scrape, one per line",
-                key="manual_twitter_urls"
-            )
-            search_terms_input = st.text_area(
-                "Search Terms (one per line)",
-                value="web scraping",
-                help="Enter search terms, one per line",
-                key="manual_twitter_terms"
-            )
-            twitter_handles_input = st.text_input(
-                "Twitter Handles (comma-separated)",
-                value="elonmusk,taylorswift13",
-                help="Enter Twitter handles separated by commas",
-                key="manual_twitter_handles"
-            )
-            max_items = st.slider("Max Tweets", min_value=1, max_value=100, value=20, key="manual_twitter_max")
-            scrape_button = st.button("🚀 Run Twitter Scraper", key="twitter_btn", use_container_width=True)
-        elif data_source == "Website Content":
-            website_urls_input = st.text_area(
-                "Website URLs (one per line)",
-                value="https://docs.apify.com/academy/web-scraping-for-beginners",
-                help="Enter one or more website URLs, one per line",
-                key="manual_website_urls"
-            )
-            results_limit = st.slider(
-                "Number of Pages",
-                min_value=1,
-                max_value=100,
-                value=10,
-                help="Maximum number of pages to scrape",
-                key="manual_website_results"
-            )
-            save_markdown = st.checkbox("Save as Markdown", value=True, key="manual_website_markdown")
-            scrape_button = st.button("🚀 Run Website Content Scraper", key="website_content_btn", use_container_width=True)
-        elif data_source == "Google Maps":
-            gmaps_search_strings = st.text_area(
-                "Search Terms (one per line)",
-                value="restaurant",
-                help="Enter search terms for Google Maps, one per line",
-                key="manual_gmaps_search"
-            )
-            gmaps_location = st.text_input(
-                "Location Query",
-                value="New York, USA",
-                help="Enter the location to search in Google Maps",
-                key="manual_gmaps_location"
-            )
-            gmaps_max_places = st.slider(
-                "Max Places",
-                min_value=1,
-                max_value=100,
-                value=20,
-                help="Maximum number of places to scrape",
-                key="manual_gmaps_max"
-            )
-            scrape_button = st.button("🚀 Run Google Maps Scraper", key="gmaps_btn", use_container_width=True)
+            replay_path, replay_limit = None, None
+            if st.checkbox(
+                "📼 Replay a saved dataset",
+                value=False,
+                help="Stream raw items from a saved JSON / NDJSON / Parquet file through this scraper's formatting and display instead of starting an Apify run",
+                key="manual_replay"
+            ):
+                # Only files in REPLAY_DIR can be picked, never an arbitrary server path
+                replay_files = find_replay_files()
+                replay_path = st.selectbox(
+                    "Dataset file",
+                    replay_files,
+                    format_func=os.path.basename,
+                    help=f"Saved .json, .ndjson/.jsonl (optionally .gz) or .parquet files in {REPLAY_DIR} (set SCRAPER_REPLAY_DIR to change it)",
+                    key="manual_replay_path"
+                )
+                if not replay_files:
+                    st.caption(f"No saved datasets in {REPLAY_DIR}")
+                replay_limit = st.number_input("Max items (0 = all)", min_value=0, value=0, step=100, key="manual_replay_limit")
 
-    if scrape_button:
-        if not apify_token:
-            st.error("❌ Please enter your Apify API token!")
-        else:
             if data_source == "Instagram Hashtag":
-                if not hashtags_input.strip():
-                    st.error("❌ Please enter at least one hashtag!")
-                else:
-                    hashtags = [tag.strip() for tag in hashtags_input.split(",") if tag.strip()]
-                    with st.spinner("🔄 Running Instagram Hashtag scraper..."):
-                        results = scrape_instagram_posts(apify_token, hashtags, results_limit)
-                        if results.get("success"):
-                            st.success(f"✅ Successfully scraped {results['summary']['total_posts']} posts!")
-                            st.header("📊 Summary Statistics")
-                            col1, col2, col3, col4 = st.columns(4)
-                            col1.metric("Total Posts", results['summary']['total_posts'])
-                            col2.metric("Unique Users", results['summary']['unique_users'])
-                            col3.metric("Total Likes", results['summary']['total_likes'])
-                            col4.metric("Total Comments", results['summary']['total_comments'])
-                            st.header("📱 Scraped Posts")
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                min_likes = st.number_input("Minimum likes", min_value=0, value=0, key="manual_hashtag_min_likes")
-                            with col2:
-                                sort_by = st.selectbox("Sort by", ["Post Number", "Most Liked", "Most Commented", "Latest"], key="manual_hashtag_sort")
-                            with col3:
-                                show_media_links = st.checkbox("Show media links", value=True, key="manual_hashtag_media")
-                            filtered_posts = [post for post in results['posts'] if post['likes'] >= min_likes]
-                            if sort_by == "Most Liked":
-                                filtered_posts.sort(key=lambda x: x['likes'], reverse=True)
-                            elif sort_by == "Most Commented":
-                                filtered_posts.sort(key=lambda x: x['comments'], reverse=True)
-                            elif sort_by == "Latest":
-                                filtered_posts.sort(key=lambda x: x['posted_date'], reverse=True)
-                            for post in filtered_posts:
-                                st.subheader(f"Post {post['post_number']}")
-                                user_cols = st.columns([2, 2, 2])
-                                user_cols[0].write(f"👤 **User:** @{post['username']}")
-                                if post['full_name']:
-                                    user_cols[1].write(f"📝 **Full Name:** {post['full_name']}")
-                                user_cols[2].write(f"📅 **Posted:** {post['posted_date']}")
-                                if post['caption']:
-                                    st.write(f"**Caption:** {post['caption']}")
-                                metric_cols = st.columns(4)
-                                metric_cols[0].metric("❤️ Likes", post['likes'])
-                                metric_cols[1].metric("💬 Comments", post['comments'])
-                                metric_cols[2].metric("🔄 Shares", post['shares'])
-                                metric_cols[3].metric("👁️ Views", post['views'])
-                                if post['hashtags']:
-                                    st.write(f"🏷️ **Hashtags:** {post['hashtags']}")
-                                if post['media_type']:
-                                    st.write(f"📷 **Media Type:** {post['media_type']}")
-                                if post['post_url']:
-                                    st.write(f"🔗 [View Original Post]({post['post_url']})")
-                                if show_media_links:
-                                    if post['image_url']:
-                                        st.write(f"🖼️ [View Image]({post['image_url']})")
-                                    if post['video_url']:
-                                        st.write(f"🎥 [View Video]({post['video_url']})")
-                                st.markdown("---")
-                            st.header("💾 Download Data")
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                df = pd.DataFrame(results['posts'])
-                                csv_data = df.to_csv(index=False)
-                                st.download_button(
-                                    label="📥 Download as CSV",
-                                    data=csv_data,
-                                    file_name="instagram_formatted_data.csv",
-                                    mime="text/csv"
-                                )
-                            with col2:
-                                st.download_button(
-                                    label="📥 Download Raw JSON",
-                                    data=json.dumps(results['raw_results'], indent=4, ensure_ascii=False),
-                                    file_name="instagram_raw_data.json",
-                                    mime="application/json"
-                                )
-                            with st.expander("🔧 Run Information"):
-                                st.json({
-                                    "Run ID": results['summary']['run_id'],
-                                    "Dataset ID": results['summary']['dataset_id'],
-                                    "Hashtags Scraped": hashtags,
-                                    "Results Limit": results_limit
-                                })
-                        else:
-                            st.error(f"❌ {results.get('error')}")
-                            st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+                hashtags_input = st.text_input(
+                    "Hashtags (comma-separated)",
+                    value="Goa",
+                    help="Enter hashtags separated by commas. With one run per hashtag, 'tag:50' sets that hashtag's own limit",
+                    key="manual_hashtags"
+                )
+                results_limit = st.slider(
+                    "Number of Results",
+                    min_value=5,
+                    max_value=100,
+                    value=20,
+                    help="Maximum number of posts to scrape",
+                    key="manual_hashtag_results"
+                )
+                hashtag_parallel = st.checkbox(
+                    "⚡ One run per hashtag",
+                    value=False,
+                    help="Run each hashtag as its own concurrent actor run with its own limit, merged without duplicate posts",
+                    key="manual_hashtag_parallel"
+                )
+                if hashtag_parallel:
+                    hashtag_concurrency = st.slider("Max parallel runs", min_value=1, max_value=16, value=4, key="manual_hashtag_concurrency")
+                hide_seen = st.checkbox("Hide already-seen posts", value=False, help="Only show posts not returned by an earlier scrape", key="manual_hashtag_hide_seen")
+                scrape_button = st.button("🚀 Run Instagram Hashtag Scraper", key="insta_hashtag_btn", use_container_width=True)
             elif data_source == "Instagram Profile":
-                profile_urls = [url.strip() for url in profile_urls_input.splitlines() if url.strip()]
-                if not profile_urls:
-                    st.error("❌ Please enter at least one Instagram profile URL!")
-                else:
-                    with st.spinner("🔄 Running Instagram Profile scraper..."):
-                        results = scrape_instagram_profile(profile_urls, results_limit, apify_token)
-                        if results.get("success"):
-                            st.success(f"✅ Successfully scraped {results['summary']['total_posts']} posts!")
-                            st.header("📊 Summary Statistics")
-                            col1, col2, col3, col4 = st.columns(4)
-                            col1.metric("Total Posts", results['summary']['total_posts'])
-                            col2.metric("Unique Users", results['summary']['unique_users'])
-                            col3.metric("Total Likes", results['summary']['total_likes'])
-                            col4.metric("Total Comments", results['summary']['total_comments'])
-                            st.header("📱 Scraped Posts")
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                min_likes = st.number_input("Minimum likes", min_value=0, value=0, key="profile_min_likes")
-                            with col2:
-                                sort_by = st.selectbox("Sort by", ["Post Number", "Most Liked", "Most Commented", "Latest"], key="profile_sort_by")
-                            with col3:
-                                show_media_links = st.checkbox("Show media links", value=True, key="profile_show_media")
-                            filtered_posts = [post for post in results['posts'] if post['likes'] >= min_likes]
-                            if sort_by == "Most Liked":
-                                filtered_posts.sort(key=lambda x: x['likes'], reverse=True)
-                            elif sort_by == "Most Commented":
-                                filtered_posts.sort(key=lambda x: x['comments'], reverse=True)
-                            elif sort_by == "Latest":
-                                filtered_posts.sort(key=lambda x: x['posted_date'], reverse=True)
-                            for post in filtered_posts:
-                                st.subheader(f"Post {post['post_number']}")
-                                user_cols = st.columns([2, 2, 2])
-                                user_cols[0].write(f"👤 **User:** @{post['username']}")
-                                if post['full_name']:
-                                    user_cols[1].write(f"📝 **Full Name:** {post['full_name']}")
-                                user_cols[2].write(f"📅 **Posted:** {post['posted_date']}")
-                                if post['caption']:
-                                    st.write(f"**Caption:** {post['caption']}")
-                                metric_cols = st.columns(4)
-                                metric_cols[0].metric("❤️ Likes", post['likes'])
-                                metric_cols[1].metric("💬 Comments", post['comments'])
-                                metric_cols[2].metric("🔄 Shares", post['shares'])
-                                metric_cols[3].metric("👁️ Views", post['views'])
-                                if post['hashtags']:
-                                    st.write(f"🏷️ **Hashtags:** {post['hashtags']}")
-                                if post['media_type']:
-                                    st.write(f"📷 **Media Type:** {post['media_type']}")
-                                if post['post_url']:
-                                    st.write(f"🔗 [View Original Post]({post['post_url']})")
-                                if show_media_links:
-                                    if post['image_url']:
-                                        st.write(f"🖼️ [View Image]({post['image_url']})")
-                                    if post['video_url']:
-                                        st.write(f"🎥 [View Video]({post['video_url']})")
-                                st.markdown("---")
-                            st.header("💾 Download Data")
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                df = pd.DataFrame(results['posts'])
-                                csv_data = df.to_csv(index=False)
-                                st.download_button(
-                                    label="📥 Download as CSV",
-                                    data=csv_data,
-                                    file_name="instagram_profile_data.csv",
-                                    mime="text/csv"
-                                )
-                            with col2:
-                                st.download_button(
-                                    label="📥 Download Raw JSON",
-                                    data=json.dumps(results['raw_results'], indent=4, ensure_ascii=False),
-                                    file_name="instagram_profile_raw_data.json",
-                                    mime="application/json"
-                                )
-                            with st.expander("🔧 Run Information"):
-                                st.json({
-                                    "Run ID": results['summary']['run_id'],
-                                    "Dataset ID": results['summary']['dataset_id'],
-                                    "Profile URLs": profile_urls,
-                                    "Results Limit": results_limit
-                                })
-                        else:
-                            st.error(f"❌ {results.get('error')}")
-                            st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+                profile_urls_input = st.text_area(
+                    "Instagram Profile URLs (one per line)",
+                    value="https://www.instagram.com/humansofny/",
+                    help="Enter one or more Instagram profile URLs, one per line",
+                    key="manual_profile_urls"
+                )
+                results_limit = st.slider(
+                    "Number of Results",
+                    min_value=5,
+                    max_value=100,
+                    value=20,
+                    help="Maximum number of posts to scrape",
+                    key="manual_profile_results"
+                )
+                hide_seen = st.checkbox("Hide already-seen posts", value=False, help="Only show posts not returned by an earlier scrape", key="manual_profile_hide_seen")
+                scrape_button = st.button("🚀 Run Instagram Profile Scraper", key="insta_profile_btn", use_container_width=True)
             elif data_source == "Booking.com":
-                with st.spinner("🔄 Running Booking.com scraper..."):
-                    results = scrape_booking(
-                        search=search,
-                        max_items=max_items,
-                        currency=currency,
-                        rooms=rooms,
-                        adults=adults,
-                        children=children,
-                        min_max_price=min_max_price,
-                        api_token=apify_token
+                booking_mode = st.radio(
+                    "Mode",
+                    ["Single search", "Multi-destination batch"],
+                    help="Batch mode runs every destination x date range x guest combination as a parallel actor run",
+                    key="manual_booking_mode"
+                )
+                if booking_mode == "Single search":
+                    search = st.text_input("Search City/Location", value="New York", key="manual_booking_search")
+                else:
+                    booking_destinations_input = st.text_area(
+                        "Destinations (one per line)",
+                        value="Paris\nRome\nBarcelona",
+                        key="manual_booking_destinations"
                     )
-                    if results.get("success"):
-                        st.success(f"✅ Successfully scraped {results['summary']['total_hotels']} hotels!")
-                        st.header("🏨 Booking.com Hotels")
-                        st.write(f"**City:** {results['summary']['city']}")
-                        st.write(f"**Min Price:** {results['summary']['min_price']} {results['summary']['currency']} | **Max Price:** {results['summary']['max_price']} {results['summary']['currency']}")
-                        st.write(f"**Total Hotels:** {results['summary']['total_hotels']}")
-                        for hotel in results['hotels']:
-                            st.subheader(f"Hotel {hotel['hotel_number']}: {hotel['name']}")
-                            st.write(f"📍 {hotel['address']}, {hotel['city']}, {hotel['country']}")
-                            st.write(f"💲 Price: {hotel['price']} {hotel['currency']}")
-                            st.write(f"⭐ Stars: {hotel['stars']} | 🏆 Review Score: {hotel['review_score']} ({hotel['review_count']} reviews)")
-                            if hotel['url']:
-                                st.write(f"🔗 [View Hotel]({hotel['url']})")
-                            if hotel['image']:
-                                st.image(hotel['image'], width=300)
-                            st.markdown("---")
-                        st.header("💾 Download Data")
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            df = pd.DataFrame(results['hotels'])
-                            csv_data = df.to_csv(index=False)
-                            st.download_button(
-                                label="📥 Download as CSV",
-                                data=csv_data,
-                                file_name="booking_hotels_data.csv",
-                                mime="text/csv"
-                            )
-                        with col2:
-                            st.download_button(
-                                label="📥 Download Raw JSON",
-                                data=json.dumps(results['raw_results'], indent=4, ensure_ascii=False),
-                                file_name="booking_raw_data.json",
-                                mime="application/json"
-                            )
-                    else:
-                        st.error(f"❌ {results.get('error')}")
-                        st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
-            elif data_source == "Twitter":
-                start_urls = [url.strip() for url in start_urls_input.splitlines() if url.strip()]
-                search_terms = [term.strip() for term in search_terms_input.splitlines() if term.strip()]
-                twitter_handles = [h.strip() for h in twitter_handles_input.split(",") if h.strip()]
-                with st.spinner("🔄 Running Twitter scraper..."):
-                    results = scrape_tweets(
-                        start_urls=start_urls,
-                        search_terms=search_terms,
-                        twitter_handles=twitter_handles,
-                        max_items=max_items,
-                        api_token=apify_token
+                    booking_dates_input = st.text_area(
+                        "Date ranges (one per line, optional)",
+                        value="",
+                        help="Check-in and check-out per line, e.g. 2025-06-01 2025-06-03",
+                        key="manual_booking_dates"
                     )
-                    if results.get("success"):
-                        st.success(f"✅ Successfully scraped {results['summary']['total_tweets']} tweets!")
-                        st.header("🐦 Tweets")
-                        st.write(f"**Unique Authors:** {results['summary']['unique_authors']}")
-                        st.write(f"**Total Likes:** {results['summary']['total_likes']} | **Total Retweets:** {results['summary']['total_retweets']} | **Total Replies:** {results['summary']['total_replies']}")
-                        for tweet in results['tweets']:
-                            st.subheader(f"Tweet {tweet['tweet_number']} by @{tweet['author']}")
-                            st.write(f"📝 {tweet['text']}")
-                            st.write(f"📅 {tweet['created_at']}")
-                            st.write(f"❤️ {tweet['likes']} | 🔁 {tweet['retweets']} | 💬 {tweet['replies']}")
-                            if tweet['hashtags']:
-                                st.write(f"🏷️ Hashtags: {' '.join(['#'+h for h in tweet['hashtags']])}")
-                            if tweet['url']:
-                                st.write(f"🔗 [View Tweet]({tweet['url']})")
-                            if tweet['media']:
-                                for media in tweet['media']:
-                                    if media.get('type') == 'photo':
-                                        st.image(media.get('mediaUrl'))
-                                    elif media.get('type') == 'video':
-                                        st.write(f"🎥 [View Video]({media.get('mediaUrl')})")
-                            st.markdown("---")
-                        st.header("💾 Download Data")
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            df = pd.DataFrame(results['tweets'])
-                            csv_data = df.to_csv(index=False)
-                            st.download_button(
-                                label="📥 Download as CSV",
-                                data=csv_data,
-                                file_name="tweets_data.csv",
-                                mime="text/csv"
-                            )
-                        with col2:
-                            st.download_button(
-                                label="📥 Download Raw JSON",
-                                data=json.dumps(results['raw_results'], indent=4, ensure_ascii=False),
-                                file_name="tweets_raw_data.json",
-                                mime="application/json"
-                            )
-                    else:
-                        st.error(f"❌ {results.get('error')}")
-                        st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
+                    booking_concurrency = st.slider("Max parallel runs", min_value=1, max_value=16, value=4, key="manual_booking_concurrency")
+                max_items = st.slider("Max Hotels", min_value=1, max_value=50, value=10, key="manual_booking_max")
+                currency = st.text_input("Currency", value="USD", key="manual_booking_currency")
+                rooms = st.number_input("Rooms", min_value=1, value=1, key="manual_booking_rooms")
+                adults = st.number_input("Adults", min_value=1, value=2, key="manual_booking_adults")
+                children = st.number_input("Children", min_value=0, value=0, key="manual_booking_children")
+                min_max_price = st.text_input("Min-Max Price", value="0-999999", key="manual_booking_price")
+                scrape_button = st.button("🚀 Run Booking Scraper", key="booking_btn", use_container_width=True)
+            elif data_source == "Twitter":
+                start_urls_input = st.text_area(
+                    "Start URLs (one per line)",
+                    value="https://twitter.com/apify",
+                    help="Enter Twitter URLs to scrape, one per line",
+                    key="manual_twitter_urls"
+                )
+                search_terms_input = st.text_area(
+                    "Search Terms (one per line)",
+                    value="web scraping",
+                    help="Enter search terms, one per line",
+                    key="manual_twitter_terms"
+                )
+                twitter_handles_input = st.text_input(
+                    "Twitter Handles (comma-separated)",
+                    value="elonmusk,taylorswift13",
+                    help="Enter Twitter handles separated by commas",
+                    key="manual_twitter_handles"
+                )
+                max_items = st.slider("Max Tweets", min_value=1, max_value=100, value=20, key="manual_twitter_max")
+                hide_seen = st.checkbox("Hide already-seen tweets", value=False, help="Only show tweets not returned by an earlier scrape", key="manual_twitter_hide_seen")
+                twitter_mode = st.radio(
+                    "Mode",
+                    ["Standard", "Incremental refresh", "Sharded by time window"],
+                    help="Incremental: only tweets newer than the last run of each handle, search term and URL. "
+                         "Sharded: split a date range into parallel actor runs.",
+                    key="manual_twitter_mode"
+                )
+                if twitter_mode == "Sharded by time window":
+                    shard_start = st.date_input("Start date", value=datetime.now().date() - timedelta(days=30), key="manual_twitter_shard_start")
+                    shard_end = st.date_input("End date", value=datetime.now().date(), key="manual_twitter_shard_end")
+                    max_items = st.number_input("Max Tweets (all shards)", min_value=1, max_value=100000, value=1000, key="manual_twitter_shard_max")
+                    shard_count = st.slider("Time windows", min_value=1, max_value=30, value=4, key="manual_twitter_shards")
+                    shard_concurrency = st.slider("Max parallel runs", min_value=1, max_value=16, value=4, key="manual_twitter_concurrency")
+                    split_handles = st.checkbox("Also split by handle", value=False, key="manual_twitter_split_handles")
+                scrape_button = st.button("🚀 Run Twitter Scraper", key="twitter_btn", use_container_width=True)
             elif data_source == "Website Content":
-                website_urls = [url.strip() for url in website_urls_input.splitlines() if url.strip()]
-                with st.spinner("🔄 Running Website Content scraper..."):
-                    results = scrape_website_content(
-                        start_urls=website_urls,
-                        results_limit=results_limit,
-                        save_markdown=save_markdown,
-                        api_token=apify_token
+                website_urls_input = st.text_area(
+                    "Website URLs (one per line)",
+                    value="https://docs.apify.com/academy/web-scraping-for-beginners",
+                    help="Enter one or more website URLs, one per line",
+                    key="manual_website_urls"
+                )
+                results_limit = st.slider(
+                    "Number of Pages",
+                    min_value=1,
+                    max_value=100,
+                    value=10,
+                    help="Maximum number of pages to scrape",
+                    key="manual_website_results"
+                )
+                save_markdown = st.checkbox("Save as Markdown", value=True, key="manual_website_markdown")
+                monitor_pages = st.checkbox("Only changed pages (monitoring)", value=False, help="Keep only pages that are new or changed since the last crawl of the same URL", key="manual_website_monitor")
+                scrape_button = st.button("🚀 Run Website Content Scraper", key="website_content_btn", use_container_width=True)
+            elif data_source == "Google Maps":
+                gmaps_search_strings = st.text_area(
+                    "Search Terms (one per line)",
+                    value="restaurant",
+                    help="Enter search terms for Google Maps, one per line",
+                    key="manual_gmaps_search"
+                )
+                gmaps_location = st.text_input(
+                    "Location Query",
+                    value="New York, USA",
+                    help="Enter the location to search in Google Maps",
+                    key="manual_gmaps_location"
+                )
+                gmaps_max_places = st.slider(
+                    "Max Places",
+                    min_value=1,
+                    max_value=100,
+                    value=20,
+                    help="Maximum number of places to scrape",
+                    key="manual_gmaps_max"
+                )
+                hide_seen = st.checkbox("Hide already-seen places", value=False, help="Only show places not returned by an earlier scrape", key="manual_gmaps_hide_seen")
+                gmaps_mode = st.radio(
+                    "Mode",
+                    ["Standard", "Sharded by sub-area", "Sharded by map grid"],
+                    help="Sharded: one parallel actor run per search term and sub-area, each with its own Max Places limit. "
+                         "Results are merged without duplicate places.",
+                    key="manual_gmaps_mode"
+                )
+                if gmaps_mode == "Sharded by sub-area":
+                    gmaps_sub_areas_input = st.text_area(
+                        "Sub-areas (one per line)",
+                        value="Manhattan, New York, USA\nBrooklyn, New York, USA",
+                        help="Neighborhoods or districts searched instead of the location query",
+                        key="manual_gmaps_sub_areas"
                     )
-                    if results.get("success"):
-                        st.success(f"✅ Successfully scraped {results['summary']['total_pages']} pages!")
-                        st.header("🌐 Website Pages")
-                        st.write(f"**Start URLs:** {results['summary']['start_urls']}")
-                        st.write(f"**Total Pages:** {results['summary']['total_pages']}")
-                        for page in results['pages']:
-                            st.subheader(f"Page {page['page_number']}: {page['title']}")
-                            st.write(f"🔗 [View Page]({page['url']})")
-                            if page['markdown']:
-                                st.markdown("**Markdown Content:**")
-                                st.markdown(page['markdown'])
-                            elif page['text']:
-                                st.markdown("**Text Content:**")
-                                st.write(page['text'])
-                            st.markdown("---")
-                        st.header("💾 Download Data")
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            df = pd.DataFrame(results['pages'])
-                            csv_data = df.to_csv(index=False)
-                            st.download_button(
-                                label="📥 Download as CSV",
-                                data=csv_data,
-                                file_name="website_content_data.csv",
-                                mime="text/csv"
+                elif gmaps_mode == "Sharded by map grid":
+                    gmaps_bbox_input = st.text_input(
+                        "Bounding box (south, west, north, east)",
+                        value="40.70, -74.02, 40.80, -73.93",
+                        help="Latitude/longitude corners of the area to cover",
+                        key="manual_gmaps_bbox"
+                    )
+                    gmaps_grid_rows = st.slider("Grid rows", min_value=1, max_value=8, value=2, key="manual_gmaps_grid_rows")
+                    gmaps_grid_cols = st.slider("Grid columns", min_value=1, max_value=8, value=2, key="manual_gmaps_grid_cols")
+                if gmaps_mode != "Standard":
+                    gmaps_concurrency = st.slider("Max parallel runs", min_value=1, max_value=16, value=4, key="manual_gmaps_concurrency")
+                scrape_button = st.button("🚀 Run Google Maps Scraper", key="gmaps_btn", use_container_width=True)
+            elif data_source == "Facebook":
+                facebook_urls_input = st.text_area(
+                    "Page / Profile URLs (one per line)",
+                    value="https://www.facebook.com/humansofnewyork/",
+                    help="Enter one or more Facebook page or profile URLs, one per line",
+                    key="manual_facebook_urls"
+                )
+                facebook_limit = st.slider("Max Posts", min_value=1, max_value=100, value=20, key="manual_facebook_max")
+                scrape_button = st.button("🚀 Run Facebook Scraper", key="facebook_btn", use_container_width=True)
+            elif data_source == "Google News":
+                news_query = st.text_input("Search Query", value="Tesla", key="manual_news_query")
+                news_language = st.text_input("Edition (COUNTRY:lang)", value="US:en", help="e.g. US:en, GB:en, DE:de", key="manual_news_language")
+                news_max = st.slider("Max Articles", min_value=1, max_value=200, value=50, key="manual_news_max")
+                news_details_upfront = st.checkbox(
+                    "Fetch all article details up front",
+                    value=False,
+                    help="Slower: opens every article inside the run. Leave off to get headlines first and fetch details only for the articles you open",
+                    key="manual_news_details"
+                )
+                scrape_button = st.button("🚀 Run Google News Scraper", key="news_btn", use_container_width=True)
+            elif data_source == "TripAdvisor":
+                tripadvisor_url = st.text_input(
+                    "Listing URL",
+                    value=DEFAULT_TRIPADVISOR_URL,
+                    help="TripAdvisor hotels, restaurants or attractions listing page",
+                    key="manual_tripadvisor_url"
+                )
+                tripadvisor_count = st.slider("Max Listings", min_value=1, max_value=1000, value=30, key="manual_tripadvisor_count")
+                tripadvisor_parallel = st.checkbox(
+                    "⚡ Parallel pages",
+                    value=False,
+                    help="Split the pull into offset ranges run as concurrent actor runs, merged back in order",
+                    key="manual_tripadvisor_parallel"
+                )
+                if tripadvisor_parallel:
+                    tripadvisor_page_size = st.slider("Listings per run", min_value=10, max_value=200, value=DEFAULT_PAGE_SIZE, step=10, key="manual_tripadvisor_page_size")
+                    tripadvisor_concurrency = st.slider("Max parallel runs", min_value=1, max_value=16, value=4, key="manual_tripadvisor_concurrency")
+                scrape_button = st.button("🚀 Run TripAdvisor Scraper", key="tripadvisor_btn", use_container_width=True)
+
+        if scrape_button:
+            if not apify_token and not replay_path:
+                st.error("❌ Please enter your Apify API token!")
+            elif replay_path and not os.path.isfile(replay_path):
+                st.error(f"❌ No saved dataset at {replay_path}")
+            else:
+                # Runs that timed out are reported above their (partial) results
+                run_warning_box = st.container()
+                with replay_from(replay_path, replay_limit), collect_run_warnings() as run_warnings:
+                    if data_source == "Instagram Hashtag":
+                        if not hashtags_input.strip():
+                            st.error("❌ Please enter at least one hashtag!")
+                        else:
+                            hashtags = []
+                            hashtag_limits = {}
+                            for entry in hashtags_input.split(","):
+                                tag, _, limit = entry.strip().partition(":")
+                                if tag.strip():
+                                    hashtags.append(tag.strip())
+                                    if limit.strip().isdigit():
+                                        hashtag_limits[tag.strip()] = int(limit)
+                            with st.spinner("🔄 Running Instagram Hashtag scraper..."), request_trace("dashboard:instagram_hashtag"):
+                                if hashtag_parallel:
+                                    results = scrape_instagram_hashtags_parallel(
+                                        apify_token,
+                                        hashtags,
+                                        results_limit,
+                                        per_hashtag_limits=hashtag_limits,
+                                        max_concurrency=hashtag_concurrency,
+                                        hide_seen=hide_seen
+                                    )
+                                else:
+                                    results = scrape_instagram_posts(apify_token, hashtags, results_limit, hide_seen=hide_seen)
+                                save_to_history("instagram_hashtag", results, {"hashtags": hashtags, "results_limit": results_limit})
+                                show_scrape_results("instagram_hashtag", results, {"hashtags": hashtags, "results_limit": results_limit})
+                    elif data_source == "Instagram Profile":
+                        profile_urls = [url.strip() for url in profile_urls_input.splitlines() if url.strip()]
+                        if not profile_urls:
+                            st.error("❌ Please enter at least one Instagram profile URL!")
+                        else:
+                            with st.spinner("🔄 Running Instagram Profile scraper..."), request_trace("dashboard:instagram_profile"):
+                                results = scrape_instagram_profile(profile_urls, results_limit, apify_token, hide_seen=hide_seen)
+                                save_to_history("instagram_profile", results, {"profile_urls": profile_urls, "results_limit": results_limit})
+                                show_scrape_results("instagram_profile", results, {"profile_urls": profile_urls, "results_limit": results_limit})
+                    elif data_source == "Booking.com" and booking_mode == "Multi-destination batch":
+                        booking_destinations = [d.strip() for d in booking_destinations_input.splitlines() if d.strip()]
+                        booking_dates = [tuple(re.findall(r"\d{4}-\d{2}-\d{2}", line)) for line in booking_dates_input.splitlines() if line.strip()]
+                        with st.spinner("🔄 Running Booking.com batch..."), request_trace("dashboard:booking"):
+                            if any(len(pair) != 2 for pair in booking_dates):
+                                results = {"error": "Each date range needs a check-in and a check-out date (YYYY-MM-DD)."}
+                            else:
+                                results = scrape_booking_batch(
+                                    destinations=booking_destinations,
+                                    date_ranges=booking_dates,
+                                    guest_options=[{"adults": adults, "children": children, "rooms": rooms}],
+                                    max_items=max_items,
+                                    currency=currency,
+                                    min_max_price=min_max_price,
+                                    max_concurrency=booking_concurrency,
+                                    api_token=apify_token
+                                )
+                            save_to_history("booking", results, {"destinations": booking_destinations, "date_ranges": booking_dates, "max_items": max_items, "currency": currency, "rooms": rooms, "adults": adults, "children": children, "min_max_price": min_max_price})
+                            show_scrape_results("booking_batch", results)
+                    elif data_source == "Booking.com":
+                        with st.spinner("🔄 Running Booking.com scraper..."), request_trace("dashboard:booking"):
+                            results = scrape_booking(
+                                search=search,
+                                max_items=max_items,
+                                currency=currency,
+                                rooms=rooms,
+                                adults=adults,
+                                children=children,
+                                min_max_price=min_max_price,
+                                api_token=apify_token
                             )
-                        with col2:
-                            st.download_button(
-                                label="📥 Download Raw JSON",
-                                data=json.dumps(results['raw_results'], indent=4, ensure_ascii=False),
-                                file_name="website_content_raw_data.json",
-                                mime="application/json"
+                            save_to_history("booking", results, {"search": search, "max_items": max_items, "currency": currency, "rooms": rooms, "adults": adults, "children": children, "min_max_price": min_max_price})
+                            show_scrape_results("booking", results)
+                    elif data_source == "Twitter":
+                        start_urls = [url.strip() for url in start_urls_input.splitlines() if url.strip()]
+                        search_terms = [term.strip() for term in search_terms_input.splitlines() if term.strip()]
+                        twitter_handles = [h.strip() for h in twitter_handles_input.split(",") if h.strip()]
+                        with st.spinner("🔄 Running Twitter scraper..."), request_trace("dashboard:twitter"):
+                            if twitter_mode == "Sharded by time window":
+                                results = scrape_tweets_sharded(
+                                    start=shard_start.isoformat(),
+                                    end=shard_end.isoformat(),
+                                    shards=shard_count,
+                                    start_urls=start_urls,
+                                    search_terms=search_terms,
+                                    twitter_handles=twitter_handles,
+                                    split_handles=split_handles,
+                                    max_items=max_items,
+                                    max_concurrency=shard_concurrency,
+                                    api_token=apify_token,
+                                    hide_seen=hide_seen
+                                )
+                            elif twitter_mode == "Incremental refresh":
+                                results = scrape_tweets_incremental(
+                                    start_urls=start_urls,
+                                    search_terms=search_terms,
+                                    twitter_handles=twitter_handles,
+                                    max_items=max_items,
+                                    api_token=apify_token
+                                )
+                            else:
+                                results = scrape_tweets(
+                                    start_urls=start_urls,
+                                    search_terms=search_terms,
+                                    twitter_handles=twitter_handles,
+                                    max_items=max_items,
+                                    api_token=apify_token,
+                                    hide_seen=hide_seen
+                                )
+                            save_to_history("twitter", results, {"start_urls": start_urls, "search_terms": search_terms, "twitter_handles": twitter_handles, "max_items": max_items})
+                            show_scrape_results("twitter", results)
+                    elif data_source == "Website Content":
+                        website_urls = [url.strip() for url in website_urls_input.splitlines() if url.strip()]
+                        with st.spinner("🔄 Running Website Content scraper..."), request_trace("dashboard:website_content"):
+                            results = scrape_website_content(
+                                start_urls=website_urls,
+                                results_limit=results_limit,
+                                save_markdown=save_markdown,
+                                api_token=apify_token,
+                                monitor=monitor_pages
                             )
-                    else:
-                        st.error(f"❌ {results.get('error')}")
-                        st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
-            elif data_source == "Google Maps":
-                gmaps_search_list = [s.strip() for s in gmaps_search_strings.splitlines() if s.strip()]
-                with st.spinner("🔄 Running Google Maps scraper..."):
-                    results = scrape_google_maps(
-                        search_strings=gmaps_search_list,
-                        location_query=gmaps_location,
-                        max_places=gmaps_max_places,
-                        api_token=apify_token
-                    )
-                    if results.get("success"):
-                        st.success(f"✅ Successfully scraped {results['summary']['total_places']} places!")
-                        st.header("📍 Google Maps Places")
-                        st.write(f"**Search Strings:** {results['summary']['search_strings']}")
-                        st.write(f"**Location Query:** {results['summary']['location_query']}")
-                        st.write(f"**Total Places:** {results['summary']['total_places']}")
-                        for place in results['places']:
-                            st.subheader(f"Place {place['place_number']}: {place['name']}")
-                            st.write(f"📍 Address: {place['address']}")
-                            st.write(f"🏷️ Category: {place['category']}")
-                            st.write(f"⭐ Rating: {place['rating']} | 💬 Reviews: {place['reviews']}")
-                            if place['url']:
-                                st.write(f"🔗 [View on Google Maps]({place['url']})")
-                            if place['website']:
-                                st.write(f"🌐 [Website]({place['website']})")
-                            if place['phone']:
-                                st.write(f"📞 {place['phone']}")
-                            st.markdown("---")
-                        st.header("💾 Download Data")
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            df = pd.DataFrame(results['places'])
-                            csv_data = df.to_csv(index=False)
-                            st.download_button(
-                                label="📥 Download as CSV",
-                                data=csv_data,
-                                file_name="google_maps_data.csv",
-                                mime="text/csv"
+                            save_to_history("website_content", results, {"start_urls": website_urls, "results_limit": results_limit, "save_markdown": save_markdown, "monitor": monitor_pages})
+                            show_scrape_results("website_content", results)
+                    elif data_source == "Google Maps":
+                        gmaps_search_list = [s.strip() for s in gmaps_search_strings.splitlines() if s.strip()]
+                        with st.spinner("🔄 Running Google Maps scraper..."), request_trace("dashboard:google_maps"):
+                            if gmaps_mode == "Standard":
+                                results = scrape_google_maps(
+                                    search_strings=gmaps_search_list,
+                                    location_query=gmaps_location,
+                                    max_places=gmaps_max_places,
+                                    api_token=apify_token,
+                                    hide_seen=hide_seen
+                                )
+                            else:
+                                gmaps_sub_areas, gmaps_bbox = None, None
+                                if gmaps_mode == "Sharded by sub-area":
+                                    gmaps_sub_areas = [a.strip() for a in gmaps_sub_areas_input.splitlines() if a.strip()]
+                                else:
+                                    try:
+                                        gmaps_bbox = tuple(float(v) for v in gmaps_bbox_input.split(","))
+                                    except ValueError:
+                                        gmaps_bbox = ()
+                                if gmaps_bbox is not None and len(gmaps_bbox) != 4:
+                                    results = {"error": "Bounding box must be four numbers: south, west, north, east."}
+                                else:
+                                    results = scrape_google_maps_sharded(
+                                        search_strings=gmaps_search_list,
+                                        location_query=gmaps_location,
+                                        sub_areas=gmaps_sub_areas,
+                                        bbox=gmaps_bbox,
+                                        grid_size=(gmaps_grid_rows, gmaps_grid_cols) if gmaps_bbox else (2, 2),
+                                        max_places=gmaps_max_places,
+                                        max_concurrency=gmaps_concurrency,
+                                        api_token=apify_token,
+                                        hide_seen=hide_seen
+                                    )
+                            save_to_history("google_maps", results, {"search_strings": gmaps_search_list, "location_query": gmaps_location, "max_places": gmaps_max_places})
+                            show_scrape_results("google_maps", results)
+                    elif data_source == "Facebook":
+                        facebook_urls = [url.strip() for url in facebook_urls_input.splitlines() if url.strip()]
+                        with st.spinner("🔄 Running Facebook scraper..."), request_trace("dashboard:facebook"):
+                            results = scrape_facebook_posts(
+                                profile_urls=facebook_urls,
+                                results_limit=facebook_limit,
+                                api_token=apify_token,
+                                on_record=streaming_progress("posts")
                             )
-                        with col2:
-                            st.download_button(
-                                label="📥 Download Raw JSON",
-                                data=json.dumps(results['raw_results'], indent=4, ensure_ascii=False),
-                                file_name="google_maps_raw_data.json",
-                                mime="application/json"
+                            save_to_history("facebook", results, {"profile_urls": facebook_urls, "results_limit": facebook_limit})
+                            show_scrape_results("facebook", results)
+                    elif data_source == "Google News":
+                        with st.spinner("🔄 Running Google News scraper..."), request_trace("dashboard:google_news"):
+                            results = scrape_google_news(
+                                query=news_query,
+                                language=news_language,
+                                max_items=news_max,
+                                fetch_article_details=news_details_upfront,
+                                api_token=apify_token,
+                                on_record=streaming_progress("articles")
                             )
-                    else:
-                        st.error(f"❌ {results.get('error')}")
-                        st.info("💡 Make sure your Apify API token is valid and you have sufficient credits.")
-    else:
-        st.info("""
-        ### 🚀 How to use this app:
-        1. **Select a data source** in the sidebar
-        2. **Enter the required parameters** for the selected scraper
-        3. **Click the run button** to start scraping
-        4. **View the formatted results** in the dashboard below
-        5. **Download your data** as CSV or JSON
-        """)
-        with st.expander("📋 Sample Data Structure (Instagram Hashtag)"):
-            st.json({
-                "post_number": 1,
-                "username": "example_user",
-                "full_name": "Example User",
-                "posted_date": "2024-01-15 14:30:00",
-                "caption": "Sample post caption",
-                "likes": 150,
-                "comments": 25,
-                "shares": 5,
-                "views": 1000,
-                "hashtags": "#example #sample",
-                "post_url": "https://instagram.com/p/example",
-                "media_type": "IMAGE",
-                "image_url": "https://example.com/image.jpg"
-            })
-        with st.expander("📋 Sample Data Structure (Instagram Profile)"):
-            st.json({
-                "post_number": 1,
-                "username": "profile_user",
-                "full_name": "Profile User",
-                "posted_date": "2024-01-15 14:30:00",
-                "caption": "Profile post caption",
-                "likes": 200,
-                "comments": 30,
-                "shares": 10,
-                "views": 1500,
-                "hashtags": "#profile #sample",
-                "post_url": "https://instagram.com/p/profilepost",
-                "media_type": "IMAGE",
-                "image_url": "https://example.com/profileimage.jpg"
-            })
-        with st.expander("📋 Sample Data Structure (Booking.com)"):
-            st.json({
-                "hotel_number": 1,
-                "name": "Sample Hotel",
-                "address": "123 Main St",
-                "city": "New York",
-                "country": "USA",
-                "price": 200,
-                "currency": "USD",
-                "stars": 4,
-                "review_score": 8.5,
-                "review_count": 1200,
-                "url": "https://booking.com/hotel/example",
-                "image": "https://example.com/hotel.jpg"
-            })
-        with st.expander("📋 Sample Data Structure (Twitter)"):
-            st.json({
-                "tweet_number": 1,
-                "id": "1234567890",
-                "text": "This is a sample tweet",
-                "author": "elonmusk",
-                "author_name": "Elon Musk",
-                "created_at": "2024-01-15 14:30:00",
-                "retweets": 100,
-                "likes": 500,
-                "replies": 20,
-                "url": "https://twitter.com/elonmusk/status/1234567890",
-                "lang": "en",
-                "hashtags": ["webscraping", "ai"],
-                "mentions": ["apify"],
-                "media": [{"type": "photo", "mediaUrl": "https://example.com/photo.jpg"}]
-            })
-        with st.expander("📋 Sample Data Structure (Website Content)"):
-            st.json({
-                "page_number": 1,
-                "url": "https://docs.apify.com/academy/web-scraping-for-beginners",
-                "title": "Web Scraping for Beginners",
-                "markdown": "# Web Scraping for Beginners\n...",
-                "text": "Web Scraping for Beginners ..."
-            })
+                            save_to_history("google_news", results, {"query": news_query, "language": news_language, "max_items": news_max})
+                            show_scrape_results("google_news", results)
+                    elif data_source == "TripAdvisor":
+                        with st.spinner("🔄 Running TripAdvisor scraper..."), request_trace("dashboard:tripadvisor"):
+                            if tripadvisor_parallel:
+                                results = scrape_tripadvisor_paginated(
+                                    url=tripadvisor_url,
+                                    count=tripadvisor_count,
+                                    page_size=tripadvisor_page_size,
+                                    max_concurrency=tripadvisor_concurrency,
+                                    api_token=apify_token,
+                                    on_record=streaming_progress("listings")
+                                )
+                            else:
+                                results = scrape_tripadvisor(
+                                    url=tripadvisor_url,
+                                    count=tripadvisor_count,
+                                    api_token=apify_token,
+                                    on_record=streaming_progress("listings")
+                                )
+                            save_to_history("tripadvisor", results, {"url": tripadvisor_url, "count": tripadvisor_count})
+                            show_scrape_results("tripadvisor", results)
+                for warning in run_warnings:
+                    run_warning_box.warning(f"⏱️ {warning}")
+        elif "last_scrape" in st.session_state:
+            # Any other widget reran the script: show the last scrape again
+            show_scrape_results(**st.session_state.last_scrape)
+        else:
+            st.info("""
+            ### 🚀 How to use this app:
+            1. **Select a data source** in the sidebar
+            2. **Enter the required parameters** for the selected scraper
+            3. **Click the run button** to start scraping
+            4. **View the formatted results** in the dashboard below
+            5. **Download your data** as CSV or JSON
+            """)
+            with st.expander("📋 Sample Data Structure (Instagram Hashtag)"):
+                st.json({
+                    "post_number": 1,
+                    "username": "example_user",
+                    "full_name": "Example User",
+                    "posted_date": "2024-01-15 14:30:00",
+                    "caption": "Sample post caption",
+                    "likes": 150,
+                    "comments": 25,
+                    "shares": 5,
+                    "views": 1000,
+                    "hashtags": "#example #sample",
+                    "post_url": "https://instagram.com/p/example",
+                    "media_type": "IMAGE",
+                    "image_url": "https://example.com/image.jpg"
+                })
+            with st.expander("📋 Sample Data Structure (Instagram Profile)"):
+                st.json({
+                    "post_number": 1,
+                    "username": "profile_user",
+                    "full_name": "Profile User",
+                    "posted_date": "2024-01-15 14:30:00",
+                    "caption": "Profile post caption",
+                    "likes": 200,
+                    "comments": 30,
+                    "shares": 10,
+                    "views": 1500,
+                    "hashtags": "#profile #sample",
+                    "post_url": "https://instagram.com/p/profilepost",
+                    "media_type": "IMAGE",
+                    "image_url": "https://example.com/profileimage.jpg"
+                })
+            with st.expander("📋 Sample Data Structure (Booking.com)"):
+                st.json({
+                    "hotel_number": 1,
+                    "name": "Sample Hotel",
+                    "address": "123 Main St",
+                    "city": "New York",
+                    "country": "USA",
+                    "price": 200,
+                    "currency": "USD",
+                    "stars": 4,
+                    "review_score": 8.5,
+                    "review_count": 1200,
+                    "url": "https://booking.com/hotel/example",
+                    "image": "https://example.com/hotel.jpg"
+                })
+            with st.expander("📋 Sample Data Structure (Twitter)"):
+                st.json({
+                    "tweet_number": 1,
+                    "id": "1234567890",
+                    "text": "This is a sample tweet",
+                    "author": "elonmusk",
+                    "author_name": "Elon Musk",
+                    "created_at": "2024-01-15 14:30:00",
+                    "retweets": 100,
+                    "likes": 500,
+                    "replies": 20,
+                    "url": "https://twitter.com/elonmusk/status/1234567890",
+                    "lang": "en",
+                    "hashtags": ["webscraping", "ai"],
+                    "mentions": ["apify"],
+                    "media": [{"type": "photo", "mediaUrl": "https://example.com/photo.jpg"}]
+                })
+            with st.expander("📋 Sample Data Structure (Website Content)"):
+                st.json({
+                    "page_number": 1,
+                    "url": "https://docs.apify.com/academy/web-scraping-for-beginners",
+                    "title": "Web Scraping for Beginners",
+                    "markdown_hash": "3f5a9c0e...",
+                    "text_hash": "b41d27aa...",
+                    "change_status": "new"
+                })
+
+    with tab3:
+        st.title("🗄️ Scrape History")
+        st.markdown("Every successful scrape is stored in a local SQLite database, so past runs can be queried without re-scraping.")
+        st.header("🔎 Full-text Search")
+        doc_counts = indexed_counts()
+        if doc_counts:
+            st.caption("Indexed: " + ", ".join(f"{count} {source}" for source, count in doc_counts.items()) + ". Use \"quotes\" for phrases, OR / NOT, and word* for prefixes.")
+            search_col1, search_col2 = st.columns([3, 1])
+            with search_col1:
+                search_query = st.text_input("Search pages, captions and tweets", key="fts_query")
+            with search_col2:
+                search_sources = st.multiselect("Sources", SOURCES, key="fts_sources")
+            if search_query:
+                with span("search_query", "history"):
+                    found = search_content(search_query, search_sources, limit=50)
+                if "error" in found:
+                    st.error(f"❌ {found['error']}")
+                else:
+                    st.caption(f"{found['total']} matches in {found['elapsed_ms']:.1f} ms")
+                    for hit in found["hits"]:
+                        st.markdown(f"**{hit['source']}** · [{hit['title'] or hit['url']}]({hit['url']}) · score {hit['score']}")
+                        st.markdown(f"> {hit['snippet']}")
+        else:
+            st.info("Nothing indexed yet. Website pages, Instagram captions and tweets are indexed after each successful scrape.")
+        changes = recent_changes(100)
+        if changes:
+            st.header("✏️ Website Changes")
+            st.caption("Pages whose content changed between crawls. Only the latest content and the diffs are stored.")
+            st.dataframe(pd.DataFrame(changes), use_container_width=True)
+            changed_url = st.selectbox("Show changes of", sorted({change["url"] for change in changes}), key="monitor_url")
+            for entry in page_history(changed_url):
+                with st.expander(f"Version {entry['version']} · {entry['changed_at']} · +{entry['added_lines']} / -{entry['removed_lines']} lines"):
+                    st.code(entry["diff"], language="diff")
+        st.header("🧮 SQL Query")
+        counts = table_counts()
+        if counts:
+            count_items = list(counts.items())
+            for start in range(0, len(count_items), 5):
+                for col, (table, count) in zip(st.columns(5), count_items[start:start + 5]):
+                    col.metric(table, count)
+            preset = st.selectbox("Preset query", list(PRESET_QUERIES), key="history_preset")
+            sql = st.text_area("SQL (read-only)", value=PRESET_QUERIES[preset], height=180, key=f"history_sql_{preset}")
+            if st.button("▶️ Run Query", key="history_run"):
+                query_result = run_query(sql)
+                if "error" in query_result:
+                    st.error(f"❌ {query_result['error']}")
+                else:
+                    st.caption(f"{len(query_result['rows'])} rows in {query_result['elapsed_ms']:.1f} ms")
+                    st.dataframe(pd.DataFrame(query_result["rows"], columns=query_result["columns"]), use_container_width=True)
+        else:
+            st.info("No history yet. Results are stored here after each successful scrape.")
+
+    with tab4:
+        st.title("⏱️ Performance")
+        st.markdown("Per-stage timings of recent chat and dashboard requests (Gemini intent, actor queue/run, dataset download, formatting, DataFrame build, rendering).")
+        recent_limit = st.slider("Requests to show", min_value=5, max_value=50, value=20, key="perf_recent_limit")
+        recent = recent_requests(recent_limit)
+        if recent:
+            st.header("🕒 Recent Requests")
+            rows = []
+            for request in recent:
+                row = {
+                    "Request": request["label"],
+                    "Started": request["started"].strftime('%Y-%m-%d %H:%M:%S'),
+                    "Total (s)": round(request["total"], 3),
+                }
+                row.update({stage: round(seconds, 3) for stage, seconds in request["stages"].items()})
+                rows.append(row)
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
+            st.header("📊 Stage Histograms")
+            st.dataframe(pd.DataFrame(stage_summary()), use_container_width=True)
+            with st.expander("📈 Prometheus Metrics"):
+                metrics_text = prometheus_text()
+                st.code(metrics_text)
+                st.download_button(
+                    label="📥 Download metrics.prom",
+                    data=metrics_text,
+                    file_name="metrics.prom",
+                    mime="text/plain"
+                )
+        else:
+            st.info("No requests recorded yet. Run a scraper from the chatbot or the dashboard to see timings here.")
+
+        st.header("🖱️ Interaction Latency")
+        reruns = [row for row in stage_summary() if row["stage"] in ("script_rerun", "fragment_rerun")]
+        if reruns:
+            st.markdown("Filter, sort and page widgets of the result lists, the map search and the charts rerun only their own section (`fragment_rerun`); every other widget reruns the whole script (`script_rerun`).")
+            st.dataframe(pd.DataFrame(reruns)[["stage", "source", "count", "p50_s", "p95_s"]], use_container_width=True)
+        else:
+            st.info("No reruns timed yet.")
+
+        st.header("🎛️ Actor Run Tuning")
+        accuracy = prediction_accuracy()
+        if accuracy:
+            st.markdown(f"Memory and timeout are chosen per call from earlier runs of the same actor once it has {TUNING_MIN_RUNS} recorded runs; the error columns compare predicted and actual run time of those tuned runs.")
+            st.dataframe(pd.DataFrame(accuracy), use_container_width=True)
+            with st.expander("🕒 Recent actor runs: predicted vs. actual"):
+                runs = pd.DataFrame(recent_runs(50))
+                runs["error_s"] = (runs["duration_s"] - runs["predicted_s"]).round(2)
+                st.dataframe(runs, use_container_width=True)
+        else:
+            st.info("No actor runs recorded yet. Every scrape records its input size, memory, run time and cost here.")
+
+        st.header("🔬 Slowest Profiled Reruns")
+        profiled_reruns = slowest_reruns()
+        if profiled_reruns:
+            st.dataframe(pd.DataFrame(profiled_reruns)[["id", "label", "mode", "started", "duration_s"]], use_container_width=True)
+            selected_profile = st.selectbox("Profile", [entry["id"] for entry in profiled_reruns], key="perf_profile_id")
+            for path in next(entry for entry in profiled_reruns if entry["id"] == selected_profile)["files"]:
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        st.download_button(
+                            label=f"📥 Download {os.path.basename(path)}",
+                            data=f.read(),
+                            file_name=os.path.basename(path),
+                            key=f"perf_download_{os.path.basename(path)}"
+                        )
+        else:
+            st.info("Profiling is off. Open the app with `?profile=sample` (or `?profile=cprofile`) to profile one rerun, or set `SCRAPER_PROFILE=1` to profile every rerun.")
+
+    with tab5:
+        st.title("🗺️ Places & Hotels Map")
+        st.markdown("Google Maps places and Booking.com hotels from the scrape history, with radius search around any of them.")
+        counts = table_counts()
+        geo_index = cached_geo_index(counts.get("maps_places", 0), counts.get("booking_hotels", 0))
+        show_nearby_search(geo_index)
+
+    with tab6:
+        st.title("📈 Engagement Charts")
+        st.markdown("Engagement of stored Instagram posts and tweets over time. Records are bucketed and aggregated before plotting, and long series are downsampled with LTTB.")
+        show_engagement_charts()
+
+
+with rerun_profile():
+    main()
@@ -0,0 +1,123 @@
+import json
+import os
+
+import pytest
+
+from apifyActors import batch_runner
+
+
+def fake_scraper(calls, failing=()):
+    def run(job, api_token):
+        calls.append(job["id"])
+        if job["id"] in failing:
+            return {"error": "actor failed"}
+        search = job["parameters"].get("search", "x")
+        hotels = [{"name": f"{search} {i}", "stars": 4, "raw_data": {}} for i in range(3)]
+        return {"success": True, "hotels": hotels, "summary": {"total_hotels": 3}, "raw_results": hotels}
+    return run
+
+
+def test_parse_jobs_applies_defaults_expands_and_names_jobs():
+    jobs = batch_runner.parse_jobs({
+        "defaults": {"retries": 0, "parameters": {"currency": "EUR"}},
+        "jobs": [
+            {"scraper": "booking", "each": {"search": ["Paris", "São Paulo"]}},
+            {"id": "news/tesla", "scraper": "google_news", "parameters": {"query": "Tesla"}},
+        ],
+    })
+    assert [job["id"] for job in jobs] == ["0001-booking-paris", "0002-booking-s-o-paulo", "news_tesla"]
+    assert jobs[0]["parameters"] == {"currency": "EUR", "search": "Paris"}
+    assert all(job["retries"] == 0 for job in jobs)
+
+
+@pytest.mark.parametrize("spec, message", [
+    ([{"scraper": "myspace"}], "Unknown scraper"),
+    ([{"parameters": {}}], "Unknown scraper"),
+    ([{"id": "a", "scraper": "booking"}, {"id": "a", "scraper": "twitter"}], "Duplicate job id"),
+])
+def test_parse_jobs_rejects_malformed_jobs(spec, message):
+    with pytest.raises(ValueError, match=message):
+        batch_runner.parse_jobs(spec)
+
+
+def test_load_job_file_rejects_invalid_json(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text('[{"scraper": "booking",', encoding="utf-8")
+    with pytest.raises(ValueError):
+        batch_runner.load_job_file(str(path))
+
+
+def test_resume_skips_done_jobs_of_a_partially_written_checkpoint(tmp_path, monkeypatch):
+    out_dir = str(tmp_path)
+    jobs = batch_runner.parse_jobs([{"id": name, "scraper": "booking", "retries": 0, "parameters": {"search": name}} for name in ("a", "b", "c")])
+    calls = []
+    monkeypatch.setattr(batch_runner, "run_scraper_from_intent", fake_scraper(calls, failing={"b"}))
+    first = batch_runner.run_batch(jobs, out_dir, api_token="t", max_concurrency=1)
+    assert first["summary"]["done"] == 2 and first["summary"]["failed"] == 1
+
+    # A crash cut the last checkpoint line in half; job c counts as not done
+    checkpoint = os.path.join(out_dir, batch_runner.CHECKPOINT_FILE)
+    with open(checkpoint, encoding="utf-8") as fh:
+        lines = [json.loads(line) for line in fh]
+    c_line = json.dumps(next(entry for entry in lines if entry["id"] == "c"))
+    with open(checkpoint, "w", encoding="utf-8") as fh:
+        for entry in lines:
+            if entry["id"] != "c":
+                fh.write(json.dumps(entry) + "\n")
+        fh.write(c_line[:len(c_line) // 2])
+    assert set(batch_runner.read_checkpoint(out_dir)) == {"a", "b"}
+
+    calls.clear()
+    monkeypatch.setattr(batch_runner, "run_scraper_from_intent", fake_scraper(calls))
+    second = batch_runner.run_batch(jobs, out_dir, api_token="t", max_concurrency=1)
+    assert sorted(calls) == ["b", "c"]
+    assert second["summary"] == dict(second["summary"], total_jobs=3, skipped=1, done=3, failed=0, records=9)
+    with open(os.path.join(out_dir, "c.ndjson"), encoding="utf-8") as fh:
+        assert [json.loads(line)["name"] for line in fh] == ["c 0", "c 1", "c 2"]
+
+
+def test_resume_reruns_done_jobs_whose_output_is_gone(tmp_path, monkeypatch):
+    out_dir = str(tmp_path)
+    jobs = batch_runner.parse_jobs([{"id": "a", "scraper": "booking"}])
+    calls = []
+    monkeypatch.setattr(batch_runner, "run_scraper_from_intent", fake_scraper(calls))
+    batch_runner.run_batch(jobs, out_dir, api_token="t")
+    os.remove(os.path.join(out_dir, "a.ndjson"))
+    batch_runner.run_batch(jobs, out_dir, api_token="t")
+    assert calls == ["a", "a"]
+
+
+def test_failed_jobs_are_retried_with_backoff(tmp_path, monkeypatch):
+    outcomes = [{"error": "first"}, {"error": "second"}, {"success": True, "hotels": [{"name": "h"}], "summary": {}}]
+    monkeypatch.setattr(batch_runner, "run_scraper_from_intent", lambda job, token: outcomes.pop(0))
+    sleeps = []
+    monkeypatch.setattr(batch_runner.time, "sleep", sleeps.append)
+    job = batch_runner.parse_jobs([{"id": "a", "scraper": "booking", "retries": 2}])[0]
+    entry = batch_runner.run_job(job, "t", str(tmp_path), backoff_s=1)
+    assert entry["status"] == "done" and entry["attempts"] == 3
+    assert sleeps == [1, 2]
+
+
+def test_mixed_type_parquet_columns_fall_back_to_strings():
+    pa = pytest.importorskip("pyarrow")
+    assert batch_runner._parquet_column([4, 5, None]).type == pa.int64()
+    mixed = batch_runner._parquet_column([4, "N/A", None, 3.5, True])
+    assert mixed.type == pa.string()
+    assert mixed.to_pylist() == ["4", "N/A", None, "3.5", "true"]
+    # Objects are stored as JSON text; plain lists stay lists unless the column mixes them with text
+    assert batch_runner._parquet_column([["a"], ["b", "c"]]).to_pylist() == [["a"], ["b", "c"]]
+    nested = batch_runner._parquet_column([{"lat": 1}, {"lat": 2, "lng": 3}, ["a"], [{"x": 1}]])
+    assert nested.to_pylist() == ['{"lat": 1}', '{"lat": 2, "lng": 3}', '["a"]', '[{"x": 1}]']
+
+
+def test_parquet_output_keeps_every_column(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "out.parquet")
+    items = [{"name": "a", "stars": 4}, {"name": "b", "stars": "N/A", "address": {"city": "Paris"}}]
+    assert batch_runner.write_output(items, path, "parquet") == 2
+    table = pq.read_table(path)
+    assert table.column_names == ["name", "stars", "address"]
+    assert table.to_pylist() == [
+        {"name": "a", "stars": "4", "address": None},
+        {"name": "b", "stars": "N/A", "address": '{"city": "Paris"}'},
+    ]
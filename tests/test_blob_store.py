@@ -0,0 +1,57 @@
+import pytest
+
+from apifyActors import blob_store
+
+
+@pytest.fixture(params=["gzip", "zstd"])
+def codec(request, monkeypatch):
+    if request.param == "zstd" and not blob_store.ZSTD_AVAILABLE:
+        pytest.skip("zstandard is not installed")
+    monkeypatch.setattr(blob_store, "BLOB_CODEC", request.param)
+    blob_store._read_blob.cache_clear()
+    return request.param
+
+
+def test_put_and_get_round_trip(tmp_path, codec):
+    blob_dir = str(tmp_path)
+    digest = blob_store.put_text("héllo " * 1000, blob_dir)
+    assert blob_store.get_text(digest, blob_dir) == "héllo " * 1000
+    # Identical bodies are stored once
+    assert blob_store.put_text("héllo " * 1000, blob_dir) == digest
+    assert blob_store.blob_stats(blob_dir)["blobs"] == 1
+    assert blob_store.put_text("", blob_dir) is None
+    assert blob_store.get_text(None, blob_dir) is None
+    assert blob_store.get_text("0" * 64, blob_dir) is None
+
+
+def test_compact_and_hydrate_items(tmp_path, codec):
+    blob_dir = str(tmp_path)
+    item = {"url": "https://a", "markdown": "# Title", "text": "Title", "html": None}
+    compact = blob_store.compact_item(item, blob_dir)
+    assert "markdown" not in compact and "text" not in compact
+    assert compact["html"] is None
+    assert blob_store.item_body(compact, "markdown", blob_dir) == "# Title"
+    assert blob_store.item_body(item, "text", blob_dir) == "Title"
+    assert blob_store.hydrate_item(compact, blob_dir) == {"url": "https://a", "markdown": "# Title", "text": "Title", "html": None}
+
+
+def test_blobs_of_either_codec_stay_readable(tmp_path, monkeypatch):
+    blob_dir = str(tmp_path)
+    monkeypatch.setattr(blob_store, "BLOB_CODEC", "gzip")
+    digest = blob_store.put_text("stored as gzip", blob_dir)
+    if blob_store.ZSTD_AVAILABLE:
+        monkeypatch.setattr(blob_store, "BLOB_CODEC", "zstd")
+        # Already stored under the other codec, so not written again
+        assert blob_store.put_text("stored as gzip", blob_dir) == digest
+        assert blob_store.blob_stats(blob_dir)["blobs"] == 1
+    blob_store._read_blob.cache_clear()
+    assert blob_store.get_text(digest, blob_dir) == "stored as gzip"
+
+
+def test_missing_blob_is_read_once_it_is_written(tmp_path):
+    blob_dir = str(tmp_path)
+    digest = blob_store.hashlib.sha256("written later".encode("utf-8")).hexdigest()
+    assert blob_store.get_text(digest, blob_dir) is None
+    # E.g. stored by another process after the first lookup
+    blob_store.put_text("written later", blob_dir)
+    assert blob_store.get_text(digest, blob_dir) == "written later"
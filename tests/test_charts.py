@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from apifyActors.charts import downsample, lttb
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000, dtype="float64")
+    y = np.zeros(1000)
+    y[400] = 50.0
+    y[700] = -30.0
+    kept = lttb(x, y, 20)
+    assert len(kept) == 20
+    assert kept[0] == 0 and kept[-1] == 999
+    assert list(kept) == sorted(set(kept))
+    assert 400 in kept and 700 in kept
+
+
+def test_lttb_returns_everything_below_threshold():
+    x = np.arange(5, dtype="float64")
+    assert list(lttb(x, x, 10)) == [0, 1, 2, 3, 4]
+    assert list(lttb(x, x, 2)) == [0, 1, 2, 3, 4]
+
+
+def test_downsample_caps_rows_in_time_order():
+    frame = pd.DataFrame({
+        "time": pd.date_range("2024-01-01", periods=500, freq="h"),
+        "likes": np.sin(np.arange(500) / 10.0) * 100,
+        "comments": np.arange(500) % 7,
+    })
+    small = downsample(frame, ["likes", "comments"], 100)
+    assert len(small) <= 100
+    assert small["time"].is_monotonic_increasing
+    assert small["time"].iloc[0] == frame["time"].iloc[0]
+    assert small["time"].iloc[-1] == frame["time"].iloc[-1]
+    assert downsample(frame, ["likes"], 1000) is frame
@@ -0,0 +1,45 @@
+from apifyActors import dedup
+
+
+def test_dedupe_batch_keeps_newest_version_in_first_position():
+    items = [
+        {"id": "1", "createdAt": "Mon Oct 08 20:19:24 +0000 2018", "text": "old"},
+        {"id": "2", "createdAt": "Tue Oct 09 20:19:24 +0000 2018"},
+        # Newer, although it sorts before the first one as a string
+        {"id": "1", "createdAt": "Wed Oct 10 20:19:24 +0000 2018", "text": "new"},
+        {"text": "no id"},
+    ]
+    unique = dedup.dedupe_batch("twitter", items)
+    assert [item.get("id") for item in unique] == ["1", "2", None]
+    assert unique[0]["text"] == "new"
+
+
+def test_dedupe_batch_compares_epochs_with_iso_timestamps():
+    items = [
+        {"shortCode": "a", "timestamp": "2020-01-01T00:00:00Z", "likesCount": 1},
+        {"shortCode": "a", "timestamp": 1700000000000, "likesCount": 2},
+        {"shortCode": "a", "timestamp": "not a date", "likesCount": 3},
+    ]
+    assert dedup.dedupe_batch("instagram_hashtag", items) == [items[1]]
+
+
+def test_filter_seen_flags_items_of_earlier_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, "SEEN_DB", str(tmp_path / "seen.sqlite"))
+    monkeypatch.setattr(dedup, "active_replay", lambda: None)
+    first, flags = dedup.filter_seen("google_maps", [{"placeId": "p1"}, {"placeId": "p2"}])
+    assert flags == [True, True]
+
+    second, flags = dedup.filter_seen("google_maps", [{"placeId": "p2"}, {"placeId": "p3"}, {"name": "no id"}])
+    assert flags == [False, True, True]
+
+    hidden, flags = dedup.filter_seen("google_maps", [{"placeId": "p1"}, {"placeId": "p4"}], hide_seen=True)
+    assert hidden == [{"placeId": "p4"}]
+    assert flags == [True]
+
+
+def test_replays_do_not_count_as_sightings(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, "SEEN_DB", str(tmp_path / "seen.sqlite"))
+    monkeypatch.setattr(dedup, "active_replay", lambda: "archive.json")
+    dedup.filter_seen("twitter", [{"id": "1"}])
+    _, flags = dedup.filter_seen("twitter", [{"id": "1"}])
+    assert flags == [True]
@@ -0,0 +1,82 @@
+import io
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+from apifyActors import export
+
+ITEMS = [
+    {"id": 1, "text": "ünïcode — 東京 ☕ 🌍 / slash", "tags": ["a", "b"], "nested": {"likes": 3, "ratio": 0.5}},
+    {"id": 2, "posted": datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc), "day": date(2024, 5, 1), "none": None},
+    {"id": 3, "pair": (1, 2), "text": 'quotes " and \\ backslash\nnewline', "empty": {}},
+]
+EXPECTED = [
+    ITEMS[0],
+    {"id": 2, "posted": "2024-05-01T10:00:00+00:00", "day": "2024-05-01", "none": None},
+    {"id": 3, "pair": [1, 2], "text": 'quotes " and \\ backslash\nnewline', "empty": {}},
+]
+
+
+@pytest.fixture(params=["orjson", "ujson", "json"])
+def encoder(request, monkeypatch):
+    """Force one JSON library, skipping those that are not installed"""
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    if request.param != "orjson":
+        monkeypatch.setattr(export, "orjson", None)
+    if request.param == "json":
+        monkeypatch.setattr(export, "ujson", None)
+    assert export.encoder_name() == request.param
+    return request.param
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_json_array_round_trips(encoder, pretty):
+    data = b"".join(export.iter_json_array(iter(ITEMS), pretty=pretty))
+    assert json.loads(data.decode("utf-8")) == EXPECTED
+    assert "東京".encode("utf-8") in data
+
+
+def test_ndjson_round_trips_one_item_per_line(encoder):
+    data = b"".join(export.iter_ndjson(ITEMS))
+    lines = data.decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == EXPECTED
+
+
+def test_empty_exports(encoder):
+    assert json.loads(b"".join(export.iter_json_array([], pretty=True))) == []
+    assert json.loads(b"".join(export.iter_json_array([], pretty=False))) == []
+    assert b"".join(export.iter_ndjson([])) == b""
+
+
+def test_records_are_exported_as_objects(encoder):
+    from apifyActors.records import Hotel
+
+    hotel = Hotel.from_raw({"name": "Hôtel", "price": "€ 99,50", "checkIn": date(2024, 5, 1)}, 1, "EUR")
+    exported = json.loads(b"".join(export.iter_ndjson([hotel])))
+    assert exported == json.loads(json.dumps(dict(hotel), default=str))
+    assert (exported["name"], exported["price_value"], exported["check_in"]) == ("Hôtel", 99.5, "2024-05-01")
+
+
+def test_chunks_are_split_between_items(encoder, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_BYTES", 64)
+    items = [{"id": i, "text": "x" * 50} for i in range(20)]
+    chunks = list(export.iter_ndjson(items))
+    assert len(chunks) > 1
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert json.loads(b"".join(export.iter_json_array(items))) == items
+
+
+def test_write_export_and_buffer(encoder):
+    fh = io.BytesIO()
+    written = export.write_export(ITEMS, fh, "ndjson")
+    assert written == len(fh.getvalue())
+    assert json.load(export.export_buffer(ITEMS, "json")) == EXPECTED
+    with pytest.raises(ValueError):
+        export.write_export(ITEMS, fh, "csv")
+
+
+def test_unserializable_values_raise(encoder):
+    with pytest.raises(TypeError):
+        b"".join(export.iter_ndjson([{"value": object()}]))
@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from apifyActors.geo_index import EARTH_RADIUS_M, GridIndex, haversine_m
+
+
+def frame_of(points):
+    return pd.DataFrame({
+        "kind": ["place"] * len(points),
+        "id": [str(i) for i in range(len(points))],
+        "name": [f"p{i}" for i in range(len(points))],
+        "lat": [lat for lat, _ in points],
+        "lng": [lng for _, lng in points],
+    })
+
+
+def destination(lat, lng, bearing_deg, distance_m):
+    """Point distance_m from (lat, lng) along a great circle"""
+    phi, lam, theta = math.radians(lat), math.radians(lng), math.radians(bearing_deg)
+    delta = distance_m / EARTH_RADIUS_M
+    phi2 = math.asin(math.sin(phi) * math.cos(delta) + math.cos(phi) * math.sin(delta) * math.cos(theta))
+    lam2 = lam + math.atan2(math.sin(theta) * math.sin(delta) * math.cos(phi), math.cos(delta) - math.sin(phi) * math.sin(phi2))
+    return math.degrees(phi2), (math.degrees(lam2) + 540) % 360 - 180
+
+
+def brute_force(points, lat, lng, radius_m):
+    lats, lngs = np.array([p[0] for p in points]), np.array([p[1] for p in points])
+    return sorted(np.flatnonzero(haversine_m(lat, lng, lats, lngs) <= radius_m).tolist())
+
+
+@pytest.fixture(scope="module")
+def random_points():
+    rng = np.random.default_rng(7)
+    # Clusters around a city, the antimeridian and both poles, plus points anywhere
+    centers = [(48.85, 2.35), (0.0, 179.99), (-16.5, -179.9), (89.9, 0.0), (-89.95, 120.0)]
+    points = [(lat + dlat, lng + dlng) for lat, lng in centers
+              for dlat, dlng in rng.normal(0, 0.3, size=(300, 2))]
+    points += list(zip(rng.uniform(-90, 90, 500), rng.uniform(-180, 180, 500)))
+    return [(max(-90.0, min(90.0, lat)), (lng + 540) % 360 - 180) for lat, lng in points]
+
+
+@pytest.mark.parametrize("lat, lng, radius_m", [
+    (48.85, 2.35, 5000),
+    (48.85, 2.35, 50000),
+    (0.0, 179.99, 30000),
+    (0.0, -179.995, 30000),
+    (-16.5, 179.95, 80000),
+    (89.9, 0.0, 20000),
+    (89.95, 90.0, 40000),
+    (-89.95, 120.0, 30000),
+    (-90.0, 0.0, 60000),
+    (10.0, 20.0, 3000000),
+])
+def test_radius_query_matches_brute_force(random_points, lat, lng, radius_m):
+    index = GridIndex(frame_of(random_points), cell_deg=0.05)
+    idx, distances = index.within_radius(lat, lng, radius_m)
+    assert sorted(idx.tolist()) == brute_force(random_points, lat, lng, radius_m)
+    assert list(distances) == sorted(distances)
+
+
+@pytest.mark.parametrize("lat, lng", [(0.0, 0.0), (60.0, 25.0), (-45.0, 179.999), (89.0, -30.0)])
+def test_points_exactly_at_the_radius_are_included(lat, lng):
+    radius_m = 1000.0
+    points = [destination(lat, lng, bearing, radius_m) for bearing in range(0, 360, 15)]
+    index = GridIndex(frame_of(points))
+    distances = haversine_m(lat, lng, np.array([p[0] for p in points]), np.array([p[1] for p in points]))
+    idx, _ = index.within_radius(lat, lng, float(distances.max()))
+    assert len(idx) == len(points)
+    # Just outside the radius nothing is found
+    far = [destination(lat, lng, bearing, radius_m * 1.001) for bearing in range(0, 360, 15)]
+    assert len(GridIndex(frame_of(far)).within_radius(lat, lng, radius_m)[0]) == 0
+
+
+def test_bbox_query(random_points):
+    index = GridIndex(frame_of(random_points), cell_deg=0.05)
+    lats, lngs = np.array([p[0] for p in random_points]), np.array([p[1] for p in random_points])
+    expected = np.flatnonzero((lats >= 48) & (lats <= 49.5) & (lngs >= 2) & (lngs <= 3))
+    assert index.within_bbox(48, 2, 49.5, 3).tolist() == expected.tolist()
+    # A box whose west edge is east of its east edge crosses the antimeridian
+    expected = np.flatnonzero((lats >= -1) & (lats <= 1) & ((lngs >= 179.5) | (lngs <= -179.5)))
+    assert len(expected)
+    assert index.within_bbox(-1, 179.5, 1, -179.5).tolist() == expected.tolist()
+
+
+def test_cell_edges_and_empty_index():
+    points = [(0.0, 0.0), (0.01, 0.01), (-0.01, -0.01), (90.0, 180.0), (-90.0, -180.0)]
+    index = GridIndex(frame_of(points), cell_deg=0.01)
+    assert index.within_bbox(0, 0, 0.01, 0.01).tolist() == [0, 1]
+    assert index.within_bbox(89, 179, 90, 180).tolist() == [3]
+    empty = GridIndex(frame_of([]))
+    assert len(empty) == 0
+    assert empty.within_radius(0, 0, 1000)[0].tolist() == []
+    assert empty.within_bbox(-90, -180, 90, 180).tolist() == []
+
+
+def test_nearby_filters_kind_and_sorts_by_distance():
+    frame = frame_of([(48.8600, 2.35), (48.8510, 2.35), (48.9, 2.35)])
+    frame.loc[1, "kind"] = "hotel"
+    result = GridIndex(frame).nearby(48.85, 2.35, 2000)
+    assert result["name"].tolist() == ["p1", "p0"]
+    assert result["distance_m"].is_monotonic_increasing
+    assert GridIndex(frame).nearby(48.85, 2.35, 2000, kind="place")["name"].tolist() == ["p0"]
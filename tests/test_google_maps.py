@@ -0,0 +1,70 @@
+import pytest
+
+from apifyActors import dedup, google_maps
+from apifyActors.google_maps import grid_polygons, plan_maps_shards
+
+NYC = (40.4774, -74.2591, 40.9176, -73.7004)
+
+
+def _edges(cell):
+    ring = cell["geolocation"]["coordinates"][0]
+    lngs = [lng for lng, _ in ring]
+    lats = [lat for _, lat in ring]
+    return min(lats), min(lngs), max(lats), max(lngs)
+
+
+@pytest.mark.parametrize("rows,cols", [(1, 1), (2, 2), (3, 3), (3, 7)])
+def test_grid_tiles_the_bounding_box_without_gaps(rows, cols):
+    south, west, north, east = NYC
+    cells = grid_polygons(south, west, north, east, rows, cols)
+    assert len(cells) == rows * cols
+    grid = [[_edges(cells[row * cols + col]) for col in range(cols)] for row in range(rows)]
+    for row in range(rows):
+        assert grid[row][0][1] == west
+        assert grid[row][-1][3] == east
+        for left, right in zip(grid[row], grid[row][1:]):
+            assert left[3] == right[1]
+    for col in range(cols):
+        assert grid[0][col][0] == south
+        assert grid[-1][col][2] == north
+        for below, above in zip(grid, grid[1:]):
+            assert below[col][2] == above[col][0]
+
+
+def test_grid_cells_are_closed_rings():
+    for cell in grid_polygons(*NYC, 2, 2):
+        ring = cell["geolocation"]["coordinates"][0]
+        assert len(ring) == 5 and ring[0] == ring[-1]
+
+
+def test_plan_has_one_shard_per_search_string_and_area():
+    plan = plan_maps_shards(["cafe", "bar"], "New York, USA", sub_areas=["Brooklyn", "Queens"])
+    assert [(shard["search_string"], shard["location_query"]) for shard in plan] == [
+        ("cafe", "Brooklyn"), ("cafe", "Queens"), ("bar", "Brooklyn"), ("bar", "Queens")]
+
+    plan = plan_maps_shards(["cafe"], "New York, USA", bbox=NYC, grid_size=(2, 3))
+    assert len(plan) == 6 and all("geolocation" in shard for shard in plan)
+
+    plan = plan_maps_shards(None, "Paris, France")
+    assert [(shard["search_string"], shard["location_query"]) for shard in plan] == [("restaurant", "Paris, France")]
+
+
+def test_sharded_scrape_merges_overlapping_cells_by_place_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, "SEEN_DB", str(tmp_path / "seen.sqlite"))
+    monkeypatch.setattr(dedup, "active_replay", lambda: None)
+    by_area = {
+        "Brooklyn": [{"placeId": "p1", "title": "One"}, {"placeId": "p2", "title": "Two"}],
+        # A place on the border between the two areas is found by both shards
+        "Queens": [{"placeId": "p2", "title": "Two"}, {"placeId": "p3", "title": "Three"}],
+    }
+    monkeypatch.setattr(google_maps, "ApifyClient", lambda token: None)
+    monkeypatch.setattr(google_maps, "call_actor", lambda client, actor_id, run_input, source: {
+        "id": "run-" + run_input["locationQuery"], "area": run_input["locationQuery"]})
+    monkeypatch.setattr(google_maps, "download_items", lambda client, run, source: by_area[run["area"]])
+
+    results = google_maps.scrape_google_maps_sharded(["cafe"], sub_areas=["Brooklyn", "Queens"], api_token="token")
+
+    assert results["success"]
+    assert sorted(place["name"] for place in results["places"]) == ["One", "Three", "Two"]
+    assert results["summary"]["duplicates_removed"] == 1
+    assert len(results["summary"]["shards"]) == 2
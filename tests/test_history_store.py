@@ -0,0 +1,32 @@
+from apifyActors import history_store
+
+
+def ingest(scraper, items, params, db):
+    return history_store.ingest_results(scraper, {"success": True, "raw_results": items, "summary": {}}, params, db)
+
+
+def test_facebook_news_and_tripadvisor_results_are_stored(tmp_path):
+    db = str(tmp_path / "history.sqlite")
+    assert ingest("facebook", [{"postId": "p1", "pageName": "HONY", "text": "hi", "time": 1714557600, "likes": "1.2K", "comments": 3}], {}, db) == 1
+    assert ingest("google_news", [{"title": "Goa", "source": {"title": "BBC"}, "publishedAt": "Mon, 14 Oct 2024 10:00:00 GMT", "link": "https://n/1"}], {"query": "goa"}, db) == 1
+    assert ingest("tripadvisor", [{"locationId": 123, "name": "Hotel", "rating": "4.5", "numberOfReviews": "1,200"}], {"url": "https://ta"}, db) == 1
+
+    rows = history_store.run_query("SELECT post_id, posted_at, likes, comments, shares FROM facebook_posts", db_path=db)["rows"]
+    assert rows == [("p1", "2024-05-01 10:00:00", 1200, 3, None)]
+    rows = history_store.run_query("SELECT query, publisher, published_at, url FROM news_articles", db_path=db)["rows"]
+    assert rows == [("goa", "BBC", "2024-10-14 10:00:00", "https://n/1")]
+    rows = history_store.run_query("SELECT search_url, listing_id, rating, reviews FROM tripadvisor_listings", db_path=db)["rows"]
+    assert rows == [("https://ta", "123", 4.5, 1200)]
+
+
+def test_preset_queries_run_on_an_empty_history(tmp_path):
+    db = str(tmp_path / "history.sqlite")
+    history_store.connect(db).close()
+    for sql in history_store.PRESET_QUERIES.values():
+        assert "error" not in history_store.run_query(sql, db_path=db)
+
+
+def test_unknown_scrapers_and_failed_results_are_skipped(tmp_path):
+    db = str(tmp_path / "history.sqlite")
+    assert history_store.ingest_results("search_index", {"success": True, "raw_results": [{}]}, db_path=db) == 0
+    assert history_store.ingest_results("facebook", {"error": "boom"}, db_path=db) == 0
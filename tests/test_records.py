@@ -0,0 +1,55 @@
+import pytest
+
+from apifyActors.records import _parse_amount, parse_price, to_iso
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1,234", 1234.0),
+    ("99,50", 99.5),
+    ("1.299", 1299.0),
+    ("1,234.50", 1234.5),
+    ("1.234,50", 1234.5),
+    ("1 234", 1234.0),
+    ("1'234", 1234.0),
+    ("12.5", 12.5),
+    ("abc", None),
+])
+def test_parse_amount(text, expected):
+    assert _parse_amount(text) == expected
+
+
+@pytest.mark.parametrize("value, currency, expected", [
+    ("1.299 EUR", None, (1299.0, "EUR")),
+    ("US$1,234", None, (1234.0, "USD")),
+    ("€ 99,50", None, (99.5, "EUR")),
+    ("$ 12", "CAD", (12.0, "CAD")),
+    ("$ 12", None, (12.0, "USD")),
+    (120, "gbp", (120.0, "GBP")),
+    ({"value": "1,234", "currency": "CHF"}, None, (1234.0, "CHF")),
+    ("N/A", "EUR", (None, "EUR")),
+    (None, None, (None, None)),
+])
+def test_parse_price(value, currency, expected):
+    assert parse_price(value, currency) == expected
+
+
+@pytest.mark.parametrize("currency", ["DKK", "NOK", "SEK"])
+def test_kr_prices_keep_the_known_currency(currency):
+    assert parse_price("1 299 kr", currency) == (1299.0, currency)
+
+
+def test_kr_without_known_currency_defaults_to_sek():
+    assert parse_price("kr 1 299") == (1299.0, "SEK")
+
+
+@pytest.mark.parametrize("value, expected", [
+    (1700000000, "2023-11-14T22:13:20Z"),
+    (1700000000000, "2023-11-14T22:13:20Z"),
+    ("2024-01-02T03:04:05+02:00", "2024-01-02T01:04:05Z"),
+    ("2024-01-02 03:04:05", "2024-01-02T03:04:05Z"),
+    ("Mon, 14 Oct 2024 10:00:00 GMT", "2024-10-14T10:00:00Z"),
+    ("2 hours ago", None),
+    ("", None),
+])
+def test_to_iso(value, expected):
+    assert to_iso(value) == expected
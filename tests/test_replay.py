@@ -0,0 +1,87 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from apifyActors import replay
+
+
+def items_of(text, chunk_chars=8):
+    return list(replay.iter_json_items(io.StringIO(text), chunk_chars))
+
+
+ITEMS = [
+    {"id": 1, "caption": "a long caption that is much longer than one chunk", "likes": 12345},
+    {"id": 2, "text": 'brackets ] [ } { and "quotes" and \\" escapes\\\\', "nested": {"list": [1, [2, 3]]}},
+    {"id": 3, "unicode": "Zürich ☕ 🌍", "empty": [], "none": None},
+    12345678,
+    "a plain string with ]",
+]
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 3, 8, 64, 1 << 20])
+def test_json_array_items_spanning_chunks(chunk_chars):
+    assert items_of(json.dumps(ITEMS, indent=2), chunk_chars) == ITEMS
+    assert items_of(json.dumps(ITEMS, ensure_ascii=False), chunk_chars) == ITEMS
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 5, 1 << 20])
+def test_ndjson_and_concatenated_objects(chunk_chars):
+    ndjson = "\n".join(json.dumps(item) for item in ITEMS) + "\n"
+    assert items_of(ndjson, chunk_chars) == ITEMS
+    assert items_of("\ufeff" + "\r\n".join(json.dumps(item) for item in ITEMS), chunk_chars) == ITEMS
+    assert items_of('{"a": 1}{"a": 2} {"a": 3}', chunk_chars) == [{"a": 1}, {"a": 2}, {"a": 3}]
+
+
+def test_number_at_a_chunk_boundary_is_not_cut():
+    # "12" then "34": the first chunk alone would decode as 12
+    assert items_of("12345\n6", chunk_chars=2) == [12345, 6]
+
+
+@pytest.mark.parametrize("text", ["", "   \n", "[]", "[ \n ]"])
+def test_empty_files_and_arrays(text):
+    assert items_of(text) == []
+
+
+@pytest.mark.parametrize("text", ['[{"a": 1}, {"a": 2}', '[{"a": 1}, {"a":', '[', '{"a": 1}\n{"a": '])
+def test_truncated_files_raise(text):
+    with pytest.raises(ValueError):
+        items_of(text)
+
+
+def test_truncated_array_yields_complete_items_first():
+    items = replay.iter_json_items(io.StringIO('[{"a": 1}, {"a": 2}, {"a"'), 4)
+    assert next(items) == {"a": 1}
+    assert next(items) == {"a": 2}
+    with pytest.raises(ValueError):
+        next(items)
+
+
+def test_iter_file_items_reads_gzip_and_limits(tmp_path):
+    path = tmp_path / "items.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        fh.write("\n".join(json.dumps({"id": i}) for i in range(10)))
+    assert list(replay.iter_file_items(str(path), limit=3)) == [{"id": 0}, {"id": 1}, {"id": 2}]
+    assert len(list(replay.iter_file_items(str(path)))) == 10
+
+
+def test_only_the_first_run_serves_the_file(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps([{"id": 1}, {"id": 2}]), encoding="utf-8")
+    with replay.replay_from(str(path), limit=1) as session:
+        assert replay.active_replay() is session
+        first = session.start_run("actor")
+        second = session.start_run("actor")
+    assert replay.active_replay() is None
+    assert first["status"] == "SUCCEEDED" and first["id"] != second["id"]
+    assert list(replay.replay_items(first)) == [{"id": 1}]
+    assert list(replay.replay_items(second)) == []
+
+
+def test_replay_from_without_path_is_a_no_op(tmp_path):
+    with replay.replay_from(None) as session:
+        assert session is None and replay.active_replay() is None
+    with pytest.raises(FileNotFoundError):
+        with replay.replay_from(str(tmp_path / "missing.json")):
+            pass
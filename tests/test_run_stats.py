@@ -0,0 +1,105 @@
+import math
+
+import pytest
+
+from apifyActors import run_stats
+
+ACTOR = "apify/test-actor"
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_stats, "TUNING_ENABLED", True)
+    return str(tmp_path / "run_stats.sqlite")
+
+
+def record(db, duration, limit, memory=1024, status="SUCCEEDED"):
+    result_limit, input_lists, size = run_stats.input_size({"maxItems": limit})
+    plan = {"result_limit": result_limit, "input_lists": input_lists, "input_size": size,
+            "memory_mbytes": None, "timeout_secs": None, "predicted_s": None, "tuned": False}
+    run = {"id": "r", "status": status, "stats": {"runTimeSecs": duration}, "options": {"memoryMbytes": memory}}
+    run_stats.record_run(ACTOR, run, plan, duration, db_path=db)
+
+
+def test_input_size_multiplies_limit_by_list_lengths():
+    assert run_stats.input_size({"resultsLimit": 20, "hashtags": ["a", "b"], "startUrls": [{"url": "x"}]}) == (20, 3, 60)
+    assert run_stats.input_size({}) == (1, 1, 1)
+
+
+def test_fit_needs_enough_runs(monkeypatch):
+    monkeypatch.setattr(run_stats, "TUNING_MIN_RUNS", 3)
+    assert run_stats.fit_duration_model([(10, 1024, 5.0), (20, 1024, 10.0)]) is None
+    intercept, slope = run_stats.fit_duration_model([(10, 1024, 15.0), (20, 1024, 20.0), (30, 1024, 25.0), (None, 1024, 99.0)])
+    assert intercept == pytest.approx(10.0)
+    assert slope == pytest.approx(0.5)
+
+
+def test_fit_normalizes_memory_and_never_predicts_faster_runs_for_bigger_inputs(monkeypatch):
+    monkeypatch.setattr(run_stats, "TUNING_MIN_RUNS", 3)
+    # 40 s at 256 MB is 20 s at the 1024 MB reference
+    intercept, slope = run_stats.fit_duration_model([(10, 256, 40.0), (20, 1024, 20.0), (30, 4096, 10.0)])
+    assert slope == 0.0
+    assert intercept == pytest.approx(20.0)
+    intercept, slope = run_stats.fit_duration_model([(10, 1024, 30.0), (20, 1024, 20.0), (30, 1024, 10.0)])
+    assert (intercept, slope) == (pytest.approx(20.0), 0.0)
+
+
+def test_plan_falls_back_without_history(db):
+    plan = run_stats.plan_run(ACTOR, {"maxItems": 50, "startUrls": ["a", "b"]}, db_path=db)
+    assert plan == {"result_limit": 50, "input_lists": 2, "input_size": 100,
+                    "memory_mbytes": None, "timeout_secs": None, "predicted_s": None, "tuned": False}
+
+
+def test_plan_falls_back_with_short_history(db):
+    for limit in range(1, run_stats.TUNING_MIN_RUNS):
+        record(db, 10.0 + limit, limit)
+    assert not run_stats.plan_run(ACTOR, {"maxItems": 10}, db_path=db)["tuned"]
+    # Other actors' runs don't count
+    record(db, 10.0, 5)
+    assert run_stats.plan_run(ACTOR, {"maxItems": 10}, db_path=db)["tuned"]
+    assert not run_stats.plan_run("other/actor", {"maxItems": 10}, db_path=db)["tuned"]
+
+
+def test_plan_falls_back_when_disabled(db, monkeypatch):
+    for limit in range(10):
+        record(db, 10.0, limit + 1)
+    monkeypatch.setattr(run_stats, "TUNING_ENABLED", False)
+    assert not run_stats.plan_run(ACTOR, {"maxItems": 10}, db_path=db)["tuned"]
+
+
+def test_fast_actor_gets_the_lowest_memory_and_minimum_timeout(db):
+    for limit in range(1, 11):
+        record(db, 2.0 + 0.01 * limit, limit, memory=256)
+    plan = run_stats.plan_run(ACTOR, {"maxItems": 10}, db_path=db)
+    assert plan["tuned"]
+    assert plan["memory_mbytes"] == run_stats.MIN_MEMORY_MB
+    assert plan["timeout_secs"] == run_stats.MIN_TIMEOUT_S
+
+
+def test_slow_actor_is_clamped_to_the_maximum_memory(db):
+    for limit in range(1, 11):
+        record(db, 100.0 * limit, limit)
+    plan = run_stats.plan_run(ACTOR, {"maxItems": 1000}, db_path=db)
+    assert plan["memory_mbytes"] == run_stats.MAX_MEMORY_MB
+    assert plan["predicted_s"] > run_stats.TARGET_RUN_S
+    # The timeout leaves TIMEOUT_FACTOR x the predicted time
+    model = run_stats.fit_duration_model([(limit, 1024, 100.0 * limit) for limit in range(1, 11)])
+    predicted = run_stats.predict_duration(model, 1000, run_stats.MAX_MEMORY_MB)
+    assert plan["timeout_secs"] == math.ceil(predicted * run_stats.TIMEOUT_FACTOR)
+
+
+def test_smallest_memory_meeting_the_target_is_chosen(db):
+    # 60 s per run at 1024 MB: 512 MB would take ~85 s, 256 MB 120 s, 128 MB ~170 s
+    for limit in range(1, 11):
+        record(db, 60.0, limit)
+    plan = run_stats.plan_run(ACTOR, {"maxItems": 5}, db_path=db)
+    assert plan["memory_mbytes"] == 512
+    assert plan["predicted_s"] == pytest.approx(60.0 * 2 ** 0.5, abs=0.01)
+    assert plan["timeout_secs"] == run_stats.MIN_TIMEOUT_S
+
+
+def test_memory_that_failed_is_not_tried_again(db):
+    for limit in range(1, 11):
+        record(db, 2.0, limit, memory=2048)
+    record(db, 2.0, 5, memory=1024, status="FAILED")
+    assert run_stats.plan_run(ACTOR, {"maxItems": 5}, db_path=db)["memory_mbytes"] == 2048
@@ -0,0 +1,34 @@
+import pytest
+
+from apifyActors import search_index
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("goa beach", '"goa" "beach"'),
+    ('"north goa" OR baga', '"north goa" OR "baga"'),
+    ("hotel*", '"hotel"*'),
+    ("c++ AND", '"c++"'),
+    ("NOT OR", ""),
+    ('say "hi', '"say" "hi"'),
+    ("", ""),
+])
+def test_build_match_query(query, expected):
+    assert search_index.build_match_query(query) == expected
+
+
+def test_search_ranks_indexed_pages(tmp_path):
+    db = str(tmp_path / "search.sqlite")
+    results = {"success": True, "raw_results": [
+        {"url": "https://a", "metadata": {"title": "Beaches of Goa"}, "markdown": "Goa has many beaches."},
+        {"url": "https://b", "metadata": {"title": "Mountains"}, "markdown": "Hiking trails and a single mention of goa."},
+    ]}
+    assert search_index.index_results("website_content", results, db_path=db)["indexed"] == 2
+    # Unchanged pages are not indexed again
+    assert search_index.index_results("website_content", results, db_path=db)["unchanged"] == 2
+
+    found = search_index.search("goa", db_path=db)
+    assert found["total"] == 2
+    assert [hit["url"] for hit in found["hits"]] == ["https://a", "https://b"]
+    assert search_index.search("hik*", db_path=db)["total"] == 1
+    assert search_index.search("goa", sources=["twitter"], db_path=db)["total"] == 0
+    assert "error" in search_index.search("AND", db_path=db)
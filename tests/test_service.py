@@ -0,0 +1,125 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from apifyActors import service
+
+
+def fake_scraper(intent, api_token):
+    parameters = intent["parameters"]
+    if parameters.get("explode"):
+        raise RuntimeError("actor crashed")
+    if parameters.get("fail"):
+        return {"error": "No results found."}
+    hotels = [{"name": f"Hotel {i}", "price": 100 + i, "raw_data": {"id": i}} for i in range(parameters.get("max_items", 2))]
+    return {"success": True, "hotels": hotels, "summary": {"token": api_token}, "raw_results": [{"id": i} for i in range(len(hotels))]}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(service, "run_scraper_from_intent", fake_scraper)
+    monkeypatch.setattr(service, "SERVICE_API_KEY", "")
+    monkeypatch.setattr(service.ServiceHandler, "log_message", lambda *args: None)
+    server = service.make_server("127.0.0.1", 0, service.JobManager(workers=2, api_token="default-token"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.manager.shutdown()
+
+
+def request(server, method, path, body=None, headers=None, conn=None):
+    conn = conn or http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    payload = json.dumps(body).encode("utf-8") if body is not None else None
+    conn.request(method, path, body=payload, headers=dict({"Content-Type": "application/json"} if payload else {}, **(headers or {})))
+    response = conn.getresponse()
+    data = response.read()
+    return response, data
+
+
+def test_submit_poll_and_stream_results(server):
+    response, data = request(server, "POST", "/jobs", {"scraper": "booking", "parameters": {"max_items": 3}}, {"X-Apify-Token": "client-token"})
+    assert response.status == 202
+    job = json.loads(data)
+    assert job["status"] in ("queued", "running", "succeeded")
+
+    response, data = request(server, "GET", f"/jobs/{job['id']}?wait=10")
+    status = json.loads(data)
+    assert status["status"] == "succeeded"
+    assert status["records"] == 3
+    assert status["summary"] == {"token": "client-token"}
+
+    response, data = request(server, "GET", f"/jobs/{job['id']}/results")
+    assert response.status == 200
+    records = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+    assert [record["name"] for record in records] == ["Hotel 0", "Hotel 1", "Hotel 2"]
+    assert "raw_data" not in records[0]
+    response, data = request(server, "GET", f"/jobs/{job['id']}/results?raw=1")
+    assert [json.loads(line) for line in data.decode("utf-8").splitlines()] == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+    response, data = request(server, "GET", "/jobs")
+    assert [listed["id"] for listed in json.loads(data)["jobs"]] == [job["id"]]
+
+
+@pytest.mark.parametrize("parameters, error", [
+    ({"explode": True}, "An error occurred: actor crashed"),
+    ({"fail": True}, "No results found."),
+])
+def test_failing_jobs_report_their_error(server, parameters, error):
+    _, data = request(server, "POST", "/jobs", {"scraper": "booking", "parameters": parameters})
+    job_id = json.loads(data)["id"]
+    _, data = request(server, "GET", f"/jobs/{job_id}?wait=10")
+    status = json.loads(data)
+    assert status["status"] == "failed"
+    assert status["error"] == error
+    response, _ = request(server, "GET", f"/jobs/{job_id}/results")
+    assert response.status == 409
+    assert server.manager.counts()["failed"] == 1
+
+
+def test_bad_requests(server):
+    response, data = request(server, "POST", "/jobs", {"scraper": "myspace"})
+    assert response.status == 422
+    assert "Unknown scraper" in json.loads(data)["error"]
+    response, _ = request(server, "GET", "/jobs/nope")
+    assert response.status == 404
+    response, _ = request(server, "GET", "/jobs/nope?wait=soon")
+    assert response.status == 400
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    conn.request("POST", "/jobs", body=b"[1, 2", headers={"Content-Type": "application/json"})
+    assert conn.getresponse().status == 400
+
+
+def test_service_key_is_required_when_set(server, monkeypatch):
+    monkeypatch.setattr(service, "SERVICE_API_KEY", "sekret")
+    response, data = request(server, "GET", "/health")
+    assert response.status == 401
+    response, _ = request(server, "GET", "/health", headers={"Authorization": "Bearer wrong"})
+    assert response.status == 401
+    response, data = request(server, "GET", "/health", headers={"Authorization": "Bearer sekret"})
+    assert response.status == 200
+    assert json.loads(data)["status"] == "ok"
+
+
+def test_unauthorized_post_closes_the_connection(server, monkeypatch):
+    monkeypatch.setattr(service, "SERVICE_API_KEY", "sekret")
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    response, _ = request(server, "POST", "/jobs", {"scraper": "booking", "parameters": {}}, conn=conn)
+    assert response.status == 401
+    assert response.will_close
+    assert server.manager.list_jobs() == []
+
+
+def test_finished_jobs_are_evicted_first():
+    manager = service.JobManager(workers=1, max_jobs=2, api_token="t")
+    try:
+        manager.jobs.update({f"done{i}": {"status": "succeeded"} for i in range(3)})
+        manager.jobs["busy"] = {"status": "running"}
+        with manager._lock:
+            manager._evict()
+        assert list(manager.jobs) == ["done2", "busy"]
+    finally:
+        manager.shutdown()
@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+import pytest
+
+from apifyActors import thumbnails
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    # Keep thumbnails as fetched (no Pillow needed) and start without remembered failures
+    monkeypatch.setattr(thumbnails, "Image", None)
+    monkeypatch.setattr(thumbnails, "_failed", {})
+    monkeypatch.setattr(thumbnails, "THUMBNAILS_ENABLED", True)
+
+
+def fake_fetcher(calls):
+    def fetch(url, timeout):
+        calls.append(url)
+        return f"image of {url}".encode()
+    return fetch
+
+
+def test_fetches_missing_and_serves_cached(tmp_path):
+    calls = []
+    first = thumbnails.fetch_thumbnails(["https://x/a.jpg", "https://x/b.jpg", "https://x/a.jpg", ""], fake_fetcher(calls), thumb_dir=str(tmp_path))
+    assert first["success"]
+    assert sorted(calls) == ["https://x/a.jpg", "https://x/b.jpg"]
+    assert first["thumbnails"]["https://x/a.jpg"] == b"image of https://x/a.jpg"
+    assert first["summary"]["fetched"] == 2
+
+    second = thumbnails.fetch_thumbnails(["https://x/a.jpg", "https://x/b.jpg"], fake_fetcher(calls), thumb_dir=str(tmp_path))
+    assert len(calls) == 2
+    assert second["summary"]["cached"] == 2
+    assert second["thumbnails"] == first["thumbnails"]
+
+
+def test_prune_evicts_least_recently_used_first(tmp_path):
+    thumb_dir = str(tmp_path)
+    urls = [f"https://x/{i}.jpg" for i in range(4)]
+    for i, url in enumerate(urls):
+        thumbnails._store(url, b"x" * 1000, thumb_dir)
+        path = thumbnails._thumb_path(url, thumb_dir)
+        os.utime(path, (1000 + i, 1000 + i))
+    # Showing the oldest thumbnail again makes it the most recently used
+    assert thumbnails.cached_thumbnail(urls[0], thumb_dir) == b"x" * 1000
+
+    stats = thumbnails.prune_cache(max_mb=2500 / 2 ** 20, thumb_dir=thumb_dir)
+
+    assert stats["evicted"] == 2
+    kept = [url for url in urls if os.path.exists(thumbnails._thumb_path(url, thumb_dir))]
+    assert kept == [urls[0], urls[3]]
+    assert stats == {"thumbnails": 2, "bytes": 2000, "evicted": 2}
+
+
+def test_prune_keeps_cache_under_cap(tmp_path):
+    thumbnails._store("https://x/a.jpg", b"x" * 1000, str(tmp_path))
+    assert thumbnails.prune_cache(max_mb=1, thumb_dir=str(tmp_path))["evicted"] == 0
+
+
+def test_failed_urls_back_off_until_retry_window(tmp_path, monkeypatch):
+    calls = []
+
+    def failing(url, timeout):
+        calls.append(url)
+        raise OSError("unreachable")
+
+    clock = [5000.0]
+    monkeypatch.setattr(thumbnails.time, "monotonic", lambda: clock[0])
+    first = thumbnails.fetch_thumbnails(["https://x/a.jpg"], failing, thumb_dir=str(tmp_path))
+    assert first["summary"]["failed"] == 1
+    assert first["thumbnails"] == {}
+
+    clock[0] += thumbnails.RETRY_AFTER_S - 1
+    second = thumbnails.fetch_thumbnails(["https://x/a.jpg"], failing, thumb_dir=str(tmp_path))
+    assert calls == ["https://x/a.jpg"]
+    assert second["summary"]["skipped"] == 1
+
+    clock[0] += 1
+    third = thumbnails.fetch_thumbnails(["https://x/a.jpg"], fake_fetcher(calls), thumb_dir=str(tmp_path))
+    assert calls == ["https://x/a.jpg", "https://x/a.jpg"]
+    assert third["summary"]["fetched"] == 1
+
+
+def test_downloads_respect_concurrency_cap(tmp_path):
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+
+    def slow(url, timeout):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return b"img"
+
+    urls = [f"https://x/{i}.jpg" for i in range(10)]
+    result = thumbnails.fetch_thumbnails(urls, slow, max_concurrency=3, thumb_dir=str(tmp_path))
+
+    assert result["summary"]["fetched"] == 10
+    assert 1 < peak[0] <= 3
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from apifyActors import trip_advisor
+from apifyActors.trip_advisor import format_tripadvisor_listing, plan_tripadvisor_pages
+
+
+@pytest.mark.parametrize("count,offset,page_size", [(300, 0, 50), (120, 30, 50), (7, 5, 3), (10, 0, 100), (5, 0, 1)])
+def test_pages_cover_the_range_without_gaps_or_overlap(count, offset, page_size):
+    pages = plan_tripadvisor_pages(count, offset, page_size)
+    covered = [idx for page in pages for idx in range(page["offset"], page["offset"] + page["count"])]
+    assert covered == list(range(offset, offset + count))
+    assert all(0 < page["count"] <= page_size for page in pages)
+    assert pages[0]["label"].startswith(f"{offset + 1}-")
+    assert pages[-1]["label"].endswith(f"-{offset + count}")
+
+
+def test_no_pages_for_an_empty_pull():
+    assert plan_tripadvisor_pages(0, 10, 50) == []
+
+
+def test_paginated_scrape_merges_pages_in_order_by_url(monkeypatch):
+    listings_by_offset = {
+        0: [{"name": "A", "url": "/a"}, {"name": "B", "url": "/b"}],
+        # The site shifted while the pages ran, so B shows up again on the next page
+        2: [{"name": "B", "url": "/b"}, {"name": "C", "url": "/c"}],
+        4: [{"name": "D", "url": "/d"}],
+    }
+    monkeypatch.setattr(trip_advisor, "ApifyClient", lambda token: None)
+    monkeypatch.setattr(trip_advisor, "call_actor", lambda client, actor_id, run_input, source: {
+        "id": f"run-{run_input['offset']}", "offset": run_input["offset"]})
+
+    def stream(client, run, start_index):
+        # The first page finishes last; records must still come out in page order
+        if run["offset"] == 0:
+            time.sleep(0.05)
+        return (format_tripadvisor_listing(item, start_index + idx) for idx, item in enumerate(listings_by_offset[run["offset"]]))
+
+    monkeypatch.setattr(trip_advisor, "stream_tripadvisor", stream)
+    streamed = []
+
+    results = trip_advisor.scrape_tripadvisor_paginated(count=6, page_size=2, max_concurrency=3, api_token="token", on_record=streamed.append)
+
+    assert results["success"]
+    assert [listing["name"] for listing in results["listings"]] == ["A", "B", "C", "D"]
+    assert [listing["listing_number"] for listing in results["listings"]] == [1, 2, 3, 4]
+    assert streamed == results["listings"]
+    assert results["summary"]["duplicates_removed"] == 1
+    assert len(results["summary"]["shards"]) == 3
+
+
+def test_paginated_scrape_needs_at_least_one_listing():
+    assert "error" in trip_advisor.scrape_tripadvisor_paginated(count=0, api_token="token")
@@ -0,0 +1,65 @@
+from datetime import date
+
+import pytest
+
+from apifyActors import dedup, tweet
+from apifyActors.tweet import plan_time_windows
+
+
+@pytest.mark.parametrize("start,end,shards", [
+    ("2024-01-01", "2024-01-31", 4),
+    ("2024-01-01", "2024-12-31", 7),
+    ("2024-02-27T08:00:00", "2024-03-02", 3),
+    ("2024-01-01", "2024-01-03", 10),
+])
+def test_windows_cover_the_range_without_gaps(start, end, shards):
+    windows = plan_time_windows(start, end, shards)
+    days = (date.fromisoformat(end[:10]) - date.fromisoformat(start[:10])).days
+    assert len(windows) == min(shards, days)
+    assert windows[0][0] == start[:10]
+    assert windows[-1][1] == end[:10]
+    for (_, previous_end), (next_start, _) in zip(windows, windows[1:]):
+        # Neighbouring windows share their boundary day; the merge drops the doubles
+        assert previous_end == next_start
+    assert all(window_start < window_end for window_start, window_end in windows)
+
+
+def test_a_single_day_is_one_window():
+    assert plan_time_windows("2024-05-01", "2024-05-01", 4) == [("2024-05-01", "2024-05-01")]
+
+
+def _tweet(tweet_id, day):
+    return {"id": tweet_id, "createdAt": f"{day}T12:00:00Z", "fullText": tweet_id, "author": {"username": "apify"}}
+
+
+def test_sharded_scrape_merges_windows_by_tweet_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup, "SEEN_DB", str(tmp_path / "seen.sqlite"))
+    monkeypatch.setattr(dedup, "active_replay", lambda: None)
+    by_window = {
+        "2024-01-01": [_tweet("1", "2024-01-01"), _tweet("2", "2024-01-02")],
+        # The boundary day of the first window comes back from the second one too
+        "2024-01-02": [_tweet("2", "2024-01-02"), _tweet("3", "2024-01-03")],
+    }
+    inputs = []
+    monkeypatch.setattr(tweet, "ApifyClient", lambda token: None)
+
+    def call_actor(client, actor_id, run_input, source):
+        inputs.append(run_input)
+        return {"id": "run-" + run_input["start"], "start": run_input["start"]}
+
+    monkeypatch.setattr(tweet, "call_actor", call_actor)
+    monkeypatch.setattr(tweet, "download_items", lambda client, run, source: by_window[run["start"]])
+
+    results = tweet.scrape_tweets_sharded("2024-01-01", "2024-01-03", shards=2, search_terms=["apify"], max_items=10, api_token="token")
+
+    assert results["success"]
+    assert [t["id"] for t in results["tweets"]] == ["3", "2", "1"]
+    assert results["summary"]["duplicates_removed"] == 1
+    assert len(results["summary"]["shards"]) == 2
+    assert sorted((run_input["start"], run_input["end"]) for run_input in inputs) == [
+        ("2024-01-01", "2024-01-02"), ("2024-01-02", "2024-01-03")]
+    assert all(run_input["maxItems"] == 5 for run_input in inputs)
+
+
+def test_sharded_scrape_needs_both_dates():
+    assert "error" in tweet.scrape_tweets_sharded("2024-01-01", None)
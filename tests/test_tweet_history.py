@@ -0,0 +1,45 @@
+from apifyActors import tweet_history
+
+
+def tweet(tweet_id, created_at):
+    return {"id": tweet_id, "createdAt": created_at}
+
+
+def test_merge_history_advances_the_watermark(tmp_path):
+    db = str(tmp_path / "history.sqlite")
+    key = tweet_history.query_key("handle", "@Apify")
+    assert tweet_history.get_watermark(key, db) is None
+
+    inserted = tweet_history.merge_history(key, [
+        tweet("100", "Wed Oct 10 20:19:24 +0000 2018"),
+        tweet("90", "2018-10-09T08:00:00Z"),
+    ], db_path=db)
+    assert inserted == 2
+    watermark = tweet_history.get_watermark(key, db)
+    assert watermark == {"newest_created_at": "2018-10-10T20:19:24+00:00", "newest_id": "100"}
+    assert tweet_history.watermark_start_date(watermark) == "2018-10-10"
+
+    # Stored tweets are not inserted twice and an older batch never moves the watermark back
+    assert tweet_history.merge_history(key, [tweet("90", "2018-10-09T08:00:00Z")], db_path=db) == 0
+    assert tweet_history.get_watermark(key, db) == watermark
+    assert tweet_history.history_sizes([key], db) == {key: 2}
+
+
+def test_merge_history_can_keep_the_watermark(tmp_path):
+    db = str(tmp_path / "history.sqlite")
+    tweet_history.merge_history("q", [tweet("1", "2020-01-01T00:00:00Z")], db_path=db)
+    tweet_history.merge_history("q", [tweet("2", "2021-01-01T00:00:00Z")], advance_watermark=False, db_path=db)
+    assert tweet_history.get_watermark("q", db)["newest_id"] == "1"
+    assert tweet_history.history_sizes(["q"], db) == {"q": 2}
+
+
+def test_is_newer_breaks_ties_by_id():
+    watermark = {"newest_created_at": "2020-01-01T00:00:00+00:00", "newest_id": "50"}
+    assert tweet_history.is_newer(tweet("51", "2020-01-01T00:00:00Z"), watermark)
+    assert not tweet_history.is_newer(tweet("50", "2020-01-01T00:00:00Z"), watermark)
+    assert not tweet_history.is_newer(tweet("99", "2019-12-31T23:59:59Z"), watermark)
+    assert tweet_history.is_newer(tweet("1", "2019-01-01T00:00:00Z"), None)
+
+
+def test_query_key_is_normalized():
+    assert tweet_history.query_key("handle", "@Apify") == tweet_history.query_key("handle", "apify")